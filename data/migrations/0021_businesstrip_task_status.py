@@ -0,0 +1,17 @@
+# Generated by Django 2.2.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('data', '0020_auto_20200524_1422'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businesstrip',
+            name='task_status',
+            field=models.CharField(blank=True, max_length=10, null=True, verbose_name='stan zadania'),
+        ),
+    ]
@@ -1,10 +1,14 @@
+import threading
 from datetime import datetime
 
+from celery import current_app, states
 from celery.result import AsyncResult
 from django.contrib import auth
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils.functional import cached_property
@@ -106,6 +110,22 @@ class Department(CompanyMixin):
         verbose_name = "filia firmy"
         verbose_name_plural = "filie firmy"
 
+class BusinessTripQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Annotates business trips with estimated profit of their requisitions and distance of routes of their
+        current version, so the properties do not query them for each business trip.
+        """
+        requisitions = Requisition.objects.filter(business_trip=OuterRef('pk')).order_by() \
+            .values('business_trip').annotate(total=Sum('estimated_profit')).values('total')
+        routes = Route.objects.filter(business_trip=OuterRef('pk'), route_version=OuterRef('route_version')) \
+            .order_by().values('business_trip').annotate(total=Sum('distance')).values('total')
+
+        return self.annotate(
+            annotated_estimated_profit=Coalesce(Subquery(requisitions, output_field=models.FloatField()), 0.0),
+            annotated_distance=Coalesce(Subquery(routes, output_field=models.FloatField()), 0.0))
+
+
 class BusinessTrip(models.Model):
     start_date = models.DateTimeField(verbose_name="data rozpoczęcia")
     finish_date = models.DateTimeField(verbose_name="data zakończenia")
@@ -120,6 +140,35 @@ class BusinessTrip(models.Model):
     task_id = models.CharField(max_length=36, null=True, blank=True)
     task_created = models.DateTimeField(verbose_name="data stworzenia zadania", null=True, blank=True)
     task_finished = models.DateTimeField(verbose_name="data zakończenia zadania", null=True, blank=True)
+    # terminal state of task, states of tasks which are not ready are resolved from result backend
+    task_status = models.CharField(max_length=10, verbose_name="stan zadania", null=True, blank=True)
+
+    objects = BusinessTripQuerySet.as_manager()
+
+    # fields whose change may change status of business trip
+    TASK_FIELDS = ('route_version', 'task_id', 'task_created', 'task_finished')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.saved_task_state = instance.get_task_state()
+        return instance
+
+    def get_task_state(self):
+        """
+        Gives values of task fields, None if any of them is deferred.
+        """
+        if self.get_deferred_fields().intersection(self.TASK_FIELDS):
+            return None
+
+        return tuple(getattr(self, field) for field in self.TASK_FIELDS)
+
+    def has_task_changed(self):
+        """
+        Checks if task fields have changed since the business trip was loaded or saved.
+        """
+        saved_task_state = getattr(self, 'saved_task_state', None)
+        return saved_task_state is None or saved_task_state != self.get_task_state()
 
     @property
     def duration(self):
@@ -127,6 +176,9 @@ class BusinessTrip(models.Model):
 
     @property
     def estimated_profit(self):
+        if hasattr(self, 'annotated_estimated_profit'):
+            return self.annotated_estimated_profit
+
         profit = 0
         for requisition in self.requisitions.all():
             profit += requisition.estimated_profit
@@ -135,28 +187,33 @@ class BusinessTrip(models.Model):
 
     @property
     def distance(self):
+        if hasattr(self, 'annotated_distance'):
+            return self.annotated_distance
+
         distance = 0
         for route in self.get_routes_for_version():
             distance += route.distance
         return distance
 
-
     @property
     def is_processed(self):
         if self.task_id is None or self.task_created is None:
             return True
 
-        if self.task_finished:
+        if self.task_finished or self.task_status in states.READY_STATES:
             return True
 
-        task = AsyncResult(self.task_id)
+        # state resolved for a previous task, e.g. before the route has been processed again, is not used
+        if getattr(self, 'resolved_task_status', (None, None))[0] != self.task_id:
+            resolve_task_statuses([self])
+        status = self.resolved_task_status[1]
         time_diff = datetime.now(self.task_created.tzinfo) - self.task_created
 
         # If task is stuck for more than one minute, let be false positive
-        if task.status == 'PENDING' and time_diff.seconds >= 60:
+        if status == states.PENDING and time_diff.seconds >= 60:
             return True
 
-        return task.ready()
+        return status in states.READY_STATES
 
     def has_error(self):
         if not self.is_processed:
@@ -182,6 +239,48 @@ class BusinessTrip(models.Model):
         verbose_name_plural = 'delegacje'
 
 
+def get_task_statuses(task_ids):
+    """
+    Gives states of tasks from result backend. States of many tasks are read with one lookup if the backend
+    is a key-value store, e.g. redis.
+
+    @param task_ids: list of ids of tasks
+    @return: list of states in the same order
+    """
+    backend = current_app.backend
+    if len(task_ids) > 1 and hasattr(backend, 'mget') and hasattr(backend, 'get_key_for_task'):
+        values = backend.mget([backend.get_key_for_task(task_id) for task_id in task_ids])
+        return [backend.decode_result(value)['status'] if value else states.PENDING for value in values]
+
+    return [AsyncResult(task_id).status for task_id in task_ids]
+
+
+def resolve_task_statuses(business_trips):
+    """
+    Resolves states of unfinished tasks of given business trips, e.g. of one page of a list, at once.
+    Terminal states are saved, so result backend is not asked about them again. Other states are kept
+    in the instance together with id of the task they belong to.
+
+    @param business_trips: list of business trips
+    """
+    unresolved = [business_trip for business_trip in business_trips
+                  if business_trip.task_id is not None and not business_trip.task_finished and
+                  business_trip.task_status not in states.READY_STATES]
+    if not unresolved:
+        return
+
+    ready = dict()
+    for business_trip, status in zip(unresolved, get_task_statuses([business_trip.task_id
+                                                                    for business_trip in unresolved])):
+        business_trip.resolved_task_status = (business_trip.task_id, status)
+        if status in states.READY_STATES:
+            business_trip.task_status = status
+            ready.setdefault(status, list()).append(business_trip.pk)
+
+    for status, pks in ready.items():
+        BusinessTrip.objects.filter(pk__in=pks).update(task_status=status)
+
+
 class Requisition(models.Model):
     created_by = models.ForeignKey(auth.get_user_model(), verbose_name="stworzony przez",
                                    on_delete=models.SET_NULL, related_name="created_requisitions", default=None,
@@ -249,11 +348,72 @@ class Route(models.Model):
         return str(self.start_point.pk) + " -> " + str(self.end_point.pk)
 
 
+# Business trips saved in current transaction whose status has not been sent yet, by primary key.
+# Each thread has its own database connection, so the registry is kept per thread.
+_pending_statuses = threading.local()
+
+
+def get_pending_statuses():
+    if not hasattr(_pending_statuses, 'business_trips'):
+        _pending_statuses.business_trips = dict()
+
+    return _pending_statuses.business_trips
+
+
+class BusinessTripStatusMessage:
+    """
+    Sends status of the latest saved instance of business trip by websocket when it is called, i.e. after commit
+    of transaction. Only the first message called after the business trip has been saved sends its status.
+    """
+
+    def __init__(self, business_trip_pk: int):
+        self.business_trip_pk = business_trip_pk
+
+    def __call__(self):
+        # serializers import models
+        from data import serializers
+
+        business_trip = get_pending_statuses().pop(self.business_trip_pk, None)
+        if business_trip is None:
+            return
+
+        message_type, message = serializers.get_business_trip_status(business_trip)
+        utils.update_business_trip_by_ws(business_trip.pk, message_type, message)
+
+
+def _discard_rolled_back_statuses(pending_statuses: dict) -> None:
+    # messages of rolled back transactions are discarded without being called, so their business trips would
+    # stay in the registry forever
+    scheduled = set(function.business_trip_pk for savepoint_ids, function in transaction.get_connection().run_on_commit
+                    if isinstance(function, BusinessTripStatusMessage))
+    for business_trip_pk in set(pending_statuses) - scheduled:
+        del pending_statuses[business_trip_pk]
+
+
+def send_status_on_commit(business_trip: BusinessTrip) -> None:
+    """
+    Sends status of business trip after commit of current transaction, or at once outside of transaction.
+    Many saves of the same business trip in one transaction send one message with its latest state.
+    Business trips left in the registry by rolled back transactions are dropped on the next save.
+
+    @param business_trip: instance of business trip
+    """
+    pending_statuses = get_pending_statuses()
+    _discard_rolled_back_statuses(pending_statuses)
+    pending_statuses[business_trip.pk] = business_trip
+    # Every save registers its own message, because messages registered in a savepoint which is rolled back
+    # are discarded. Messages called after the first one find nothing to send.
+    transaction.on_commit(BusinessTripStatusMessage(business_trip.pk))
+
+
 @receiver(post_save, sender=BusinessTrip)
 def update_websocket(sender, instance: BusinessTrip, created, **kwargs):
-    message_type, message = utils.check_business_trip_status(instance)
-    # if message_type == FAILED
-    utils.update_business_trip_by_ws(instance.pk, message_type, message)
+    # status depends only on task fields, e.g. edits in admin do not change it
+    if not created and not instance.has_task_changed():
+        return
+
+    instance.saved_task_state = instance.get_task_state()
+    send_status_on_commit(instance)
 
 @receiver(post_delete, sender=BusinessTrip)
 def delete_websocket(sender, instance, **kwargs):
@@ -1,11 +1,12 @@
 import datetime
 
+from django.conf import settings
 from django.contrib import auth
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 from rest_framework.reverse import reverse
 
-from data import models, utils
+from data import models, renderers, utils
 from genetic import tasks
 
 
@@ -171,6 +172,21 @@ class BusinessTripReadOnlySerializer(BusinessTripSerializerMixin):
         pass
 
 
+def get_business_trip_status(business_trip: 'models.BusinessTrip') -> tuple:
+    """
+    Gives type and message of websocket message with status of business trip. Message of processed business trip
+    is its camelized representation, so it is serialized once for all connected clients.
+
+    @param business_trip: instance of business trip
+    @return: tuple of message type and message
+    """
+    message_type, message = utils.check_business_trip_status(business_trip)
+    if message_type == "SUCCEEDED":
+        message = renderers.camelize(BusinessTripReadOnlySerializer(business_trip).data)
+
+    return message_type, message
+
+
 class BusinessTripSerializer(BusinessTripSerializerMixin):
 
     def validate(self, attrs):
@@ -216,23 +232,30 @@ class BusinessTripSerializer(BusinessTripSerializerMixin):
                 requisition.business_trip = instance
                 requisition.save()
 
-    def __process_route(self, instance: 'models.BusinessTrip') -> None:
+    def __process_route(self, instance: 'models.BusinessTrip', warm_start_version: int = None) -> None:
         """
         Generate data for route and then starts a task responsible for processing route. Updates instance of business trip
         with task related data to keep track on progress.
 
         @param instance: instance of business trip
+        @param warm_start_version: version of route to start optimization from (default: None)
         """
-        requisitions = instance.requisitions.all()
-        hotels = models.Hotel.objects.all()
+        requisitions = instance.requisitions.select_related('company')
         department = instance.department
-
-        data = utils.generate_data_for_route(instance, requisitions, department, hotels, iterations=1000)
+        hotels = utils.get_candidate_hotels(models.Hotel.objects.all(), department, requisitions,
+                                            instance.distance_constraint,
+                                            per_company=settings.ROUTE_OPTIMIZER_HOTELS_PER_COMPANY)
+
+        data = utils.generate_data_for_route(instance, requisitions, department, hotels,
+                                             iterations=settings.ROUTE_OPTIMIZER_ITERATIONS,
+                                             time_budget=settings.ROUTE_OPTIMIZER_TIME_BUDGET,
+                                             warm_start_version=warm_start_version)
         task = tasks.do_generate_route.delay(data)
 
         instance.task_id = task.task_id
         instance.task_created = datetime.datetime.now(tz=instance.start_date.tzinfo)
         instance.task_finished = None
+        instance.task_status = None
 
     def create(self, validated_data: dict) -> 'models.BusinessTrip':
         """
@@ -293,7 +316,7 @@ class BusinessTripSerializer(BusinessTripSerializerMixin):
         # Increment route version if new route will be generated
         if process_route:
             instance.route_version += 1
-            self.__process_route(instance)
+            self.__process_route(instance, instance.route_version - 1 if settings.ROUTE_OPTIMIZER_WARM_START else None)
 
         instance.save()
         return instance
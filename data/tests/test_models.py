@@ -3,6 +3,7 @@ import random
 from unittest import mock
 
 import pytest
+from django.db import transaction
 
 from data import models
 from data.tests import factories
@@ -194,11 +195,35 @@ class TestModels:
         expected_distance = 20
         assert business_trip.distance == expected_distance
 
+    def test_business_trips_with_totals_give_estimated_profit_and_distance_without_queries(
+            self, django_assert_num_queries):
+        with_requisitions = self.__prepare_business_trip_with_requisitions(3)
+        with_routes = self.prepare_business_trip_with_route()
+        for route_version, distance in ((1, 15), (2, 100)):
+            route = factories.RouteFactory()
+            route.business_trip = with_routes
+            route.route_version = route_version
+            route.distance = distance
+            route.save()
+        requisition = factories.RequisitionFactory()
+        requisition.business_trip = with_routes
+        requisition.estimated_profit = 5
+        requisition.save()
+
+        business_trips = list(models.BusinessTrip.objects.filter(pk__in=[with_requisitions.pk, with_routes.pk])
+                              .with_totals().order_by('pk'))
+
+        with django_assert_num_queries(0):
+            totals = [(business_trip.estimated_profit, business_trip.distance) for business_trip in business_trips]
+        assert totals == [(30, 0), (5, 35)]
+        assert totals == [(business_trip.estimated_profit, business_trip.distance)
+                          for business_trip in (with_requisitions, with_routes)]
+
     @pytest.mark.parametrize("model_properties, async_properties, expected", [
         ((('task_id', None),), None, False),
         ((('task_created', None),), None, False),
         ((('task_id', 'whatever'), ('task_created', datetime.datetime.now())), (('status', 'PENDING'), ('ready', lambda: False)), False),
-        ((('task_id', 'whatever'), ('task_created', datetime.datetime.now())), (('status', 'PENDING'), ('ready', lambda: True)), True),
+        ((('task_id', 'whatever'), ('task_created', datetime.datetime.now())), (('status', 'SUCCESS'), ('ready', lambda: True)), True),
         ((('task_id', 'whatever'), ('task_created', datetime.datetime.now() - datetime.timedelta(minutes=2))), (('status', 'PENDING'),), True),
     ])
     @mock.patch('data.models.AsyncResult')
@@ -242,3 +267,152 @@ class TestModels:
         business_trip.save()
 
         assert business_trip.has_error() == expected
+
+
+@pytest.mark.django_db(transaction=True)
+@mock.patch('data.models.utils.update_business_trip_by_ws')
+class TestBusinessTripStatusMessages:
+    def __prepare_business_trip(self):
+        business_trip = factories.BusinessTripFactory()
+        return models.BusinessTrip.objects.get(pk=business_trip.pk)
+
+    def test_saving_business_trip_without_changed_task_does_not_send_status(self, update_business_trip_by_ws):
+        business_trip = self.__prepare_business_trip()
+        update_business_trip_by_ws.reset_mock()
+
+        business_trip.distance_constraint += 1
+        business_trip.save()
+
+        update_business_trip_by_ws.assert_not_called()
+
+    def test_saving_business_trip_with_finished_task_sends_status(self, update_business_trip_by_ws):
+        business_trip = self.__prepare_business_trip()
+        update_business_trip_by_ws.reset_mock()
+
+        business_trip.task_id = 'whatever'
+        business_trip.task_created = datetime.datetime.now()
+        business_trip.task_finished = datetime.datetime.now()
+        business_trip.save()
+        business_trip.save()
+
+        update_business_trip_by_ws.assert_called_once()
+
+    def test_saves_in_transaction_send_the_latest_status_once_after_commit(self, update_business_trip_by_ws):
+        business_trip = self.__prepare_business_trip()
+        update_business_trip_by_ws.reset_mock()
+
+        with transaction.atomic():
+            business_trip.task_id = 'whatever'
+            business_trip.task_created = datetime.datetime.now()
+            business_trip.save()
+            business_trip.task_finished = datetime.datetime.now()
+            business_trip.save()
+            update_business_trip_by_ws.assert_not_called()
+
+        update_business_trip_by_ws.assert_called_once()
+        assert update_business_trip_by_ws.call_args[0][1] == 'FAILED'
+
+    def test_save_after_rolled_back_savepoint_sends_status_after_commit(self, update_business_trip_by_ws):
+        business_trip = self.__prepare_business_trip()
+        update_business_trip_by_ws.reset_mock()
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    business_trip.task_id = 'whatever'
+                    business_trip.task_created = datetime.datetime.now()
+                    business_trip.save()
+                    raise ValueError()
+            except ValueError:
+                pass
+
+            business_trip.task_finished = datetime.datetime.now()
+            business_trip.save()
+
+        update_business_trip_by_ws.assert_called_once()
+        assert business_trip.pk not in models.get_pending_statuses()
+
+    def test_rolled_back_saves_do_not_send_status(self, update_business_trip_by_ws):
+        business_trip = self.__prepare_business_trip()
+        update_business_trip_by_ws.reset_mock()
+
+        try:
+            with transaction.atomic():
+                business_trip.task_finished = datetime.datetime.now()
+                business_trip.save()
+                raise ValueError()
+        except ValueError:
+            pass
+
+        update_business_trip_by_ws.assert_not_called()
+
+    def test_save_after_rolled_back_transaction_drops_its_pending_status(self, update_business_trip_by_ws):
+        business_trip = self.__prepare_business_trip()
+        another_business_trip = self.__prepare_business_trip()
+
+        try:
+            with transaction.atomic():
+                business_trip.task_finished = datetime.datetime.now()
+                business_trip.save()
+                raise ValueError()
+        except ValueError:
+            pass
+        another_business_trip.task_finished = datetime.datetime.now()
+        another_business_trip.save()
+
+        assert business_trip.pk not in models.get_pending_statuses()
+
+
+@pytest.mark.django_db
+class TestTaskStatuses:
+    def __prepare_business_trip_with_task(self, task_id, task_status=None):
+        business_trip = factories.BusinessTripFactory()
+        business_trip.task_id = task_id
+        business_trip.task_created = datetime.datetime.now()
+        business_trip.task_status = task_status
+        business_trip.save()
+
+        return business_trip
+
+    @mock.patch('data.models.AsyncResult')
+    def test_is_processed_with_saved_terminal_state_does_not_ask_backend(self, async_result):
+        business_trip = self.__prepare_business_trip_with_task('whatever', 'SUCCESS')
+
+        assert business_trip.is_processed
+        async_result.assert_not_called()
+
+    @mock.patch('data.models.get_task_statuses')
+    def test_resolve_task_statuses_saves_only_terminal_states(self, get_task_statuses):
+        get_task_statuses.return_value = ['FAILURE', 'STARTED']
+        finished = self.__prepare_business_trip_with_task('first')
+        running = self.__prepare_business_trip_with_task('second')
+        cached = self.__prepare_business_trip_with_task('third', 'SUCCESS')
+
+        models.resolve_task_statuses([finished, running, cached])
+
+        get_task_statuses.assert_called_once_with(['first', 'second'])
+        assert models.BusinessTrip.objects.get(pk=finished.pk).task_status == 'FAILURE'
+        assert models.BusinessTrip.objects.get(pk=running.pk).task_status is None
+        assert finished.is_processed
+        assert not running.is_processed
+
+    @mock.patch('data.models.get_task_statuses')
+    def test_is_processed_with_new_task_resolves_its_state_again(self, get_task_statuses):
+        get_task_statuses.return_value = ['STARTED']
+        business_trip = self.__prepare_business_trip_with_task('first')
+        assert not business_trip.is_processed
+
+        business_trip.task_id = 'second'
+        get_task_statuses.return_value = ['SUCCESS']
+
+        assert business_trip.is_processed
+        get_task_statuses.assert_called_with(['second'])
+
+    @mock.patch('data.models.current_app')
+    def test_get_task_statuses_reads_many_tasks_with_one_lookup(self, app):
+        app.backend.get_key_for_task.side_effect = lambda task_id: 'key-' + task_id
+        app.backend.mget.return_value = ['SUCCESS', None]
+        app.backend.decode_result.side_effect = lambda value: {'status': value}
+
+        assert models.get_task_statuses(['first', 'second']) == ['SUCCESS', 'PENDING']
+        app.backend.mget.assert_called_once_with(['key-first', 'key-second'])
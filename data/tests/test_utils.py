@@ -0,0 +1,51 @@
+import json
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels import layers
+
+from data import models, utils
+from data.tests import factories
+
+
+@pytest.mark.django_db
+class TestUtils:
+    def __prepare_requisitions(self, coords):
+        return [factories.RequisitionFactory(company=factories.CompanyFactory(latitude=lat, longitude=lng))
+                for lat, lng in coords]
+
+    def test_get_candidate_hotels_skips_hotels_out_of_reach(self):
+        depot = factories.CompanyFactory(latitude=53.13, longitude=23.16)
+        requisitions = self.__prepare_requisitions([(53.2, 23.3), (53.8, 22.9)])
+        near = factories.HotelFactory(latitude=53.25, longitude=23.25)
+        factories.HotelFactory(latitude=50.06, longitude=19.94)
+
+        hotels = utils.get_candidate_hotels(models.Hotel.objects.all(), depot, requisitions, 100)
+
+        assert [hotel.pk for hotel in hotels] == [near.pk]
+
+    def test_get_candidate_hotels_keeps_nearest_hotels_of_each_company(self):
+        depot = factories.CompanyFactory(latitude=53.13, longitude=23.16)
+        requisitions = self.__prepare_requisitions([(53.8, 22.9)])
+        nearest = factories.HotelFactory(latitude=53.81, longitude=22.91)
+        farther = factories.HotelFactory(latitude=53.7, longitude=22.8)
+        near_depot = factories.HotelFactory(latitude=53.14, longitude=23.17)
+        factories.HotelFactory(latitude=53.5, longitude=23.0)
+
+        hotels = utils.get_candidate_hotels(models.Hotel.objects.all(), depot, requisitions, 400, per_company=1)
+
+        assert set(hotel.pk for hotel in hotels) == {nearest.pk, near_depot.pk}
+        assert farther.pk not in [hotel.pk for hotel in hotels]
+
+    def test_update_business_trip_by_ws_sends_rendered_message(self):
+        channel_layer = layers.InMemoryChannelLayer()
+        async_to_sync(channel_layer.group_add)('business_trip_1', 'client')
+
+        with mock.patch('data.utils.channels.layers.get_channel_layer', return_value=channel_layer):
+            utils.update_business_trip_by_ws(1, 'SUCCEEDED', {'estimatedProfit': 10})
+
+        event = async_to_sync(channel_layer.receive)('client')
+        assert event['type'] == 'update_business_trip_message'
+        assert json.loads(event['text']) == {'type': 'business_trip_message', 'messageType': 'SUCCEEDED',
+                                             'message': {'estimatedProfit': 10}}
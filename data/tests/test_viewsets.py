@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from data.tests import factories
@@ -36,6 +38,21 @@ class TestViewSets:
             datetime.now() + timedelta(days=2)
         )
 
+    def __prepare_business_trip_with_totals(self, user=None):
+        business_trip = self.__prepare_business_trip_without_assignment()
+        if user:
+            business_trip.assignee = user.profile
+            business_trip.save()
+        requisition = factories.RequisitionFactory()
+        requisition.business_trip = business_trip
+        requisition.save()
+        factories.RouteFactory(business_trip=business_trip)
+
+        return business_trip
+
+    def __reverse_business_trips_url(self):
+        return reverse('businesstrip-list') + '?format=json'
+
     def __reverse_employees_url(self):
         return reverse("employee-list") + "?format=json"
 
@@ -66,6 +83,15 @@ class TestViewSets:
                                                HTTP_CONTENT_TYPE="application/json")
             return response, response.json()
 
+    def __count_queries(self, client, token, url):
+        # the first request caches e.g. content types, so queries are counted in the second one
+        self.__get_response(client, token, url, 'get')
+        with CaptureQueriesContext(connection) as context:
+            response, response_json = self.__get_response(client, token, url, 'get')
+
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
     '''
     Tests related to employee business trips view sets /api/employees/<employee_pk>/business-trips/
     
@@ -162,6 +188,36 @@ class TestViewSets:
         expected_business_trip_count = 1
         assert response_json['count'] == expected_business_trip_count
 
+    def test_employee_business_trips_viewset_queries_do_not_depend_on_number_of_business_trips(
+            self, client, django_assert_num_queries):
+        user, token = factories.get_user_with_token()
+        self.__prepare_business_trip_with_totals(user)
+        url = self.__reverse_employee_business_trips_url(user.id)
+        expected_queries = self.__count_queries(client, token, url)
+        for _ in range(4):
+            self.__prepare_business_trip_with_totals(user)
+
+        with django_assert_num_queries(expected_queries):
+            response, response_json = self.__get_response(client, token, url, 'get')
+
+        expected_business_trip_count = 5
+        assert response_json['count'] == expected_business_trip_count
+
+    def test_business_trip_viewset_list_queries_do_not_depend_on_number_of_business_trips(
+            self, client, django_assert_num_queries):
+        user, token = factories.get_admin_user_with_token()
+        self.__prepare_business_trip_with_totals()
+        url = self.__reverse_business_trips_url()
+        expected_queries = self.__count_queries(client, token, url)
+        for _ in range(4):
+            self.__prepare_business_trip_with_totals()
+
+        with django_assert_num_queries(expected_queries):
+            response, response_json = self.__get_response(client, token, url, 'get')
+
+        expected_status_code = 200
+        assert response.status_code == expected_status_code
+
     '''
     Test related to employee view set /api/employees/ - without query params returns active standard users
     
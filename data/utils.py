@@ -1,8 +1,19 @@
+import json
+
 import channels.layers
+import numpy as np
 from asgiref.sync import async_to_sync
+from rest_framework.utils import encoders
+
+from genetic import spatial
 
 
 def check_business_trip_status(business_trip):
+    # task result backend is asked once, has_error of processed business trip asks it again only for tasks
+    # which are not finished
+    if not business_trip.is_processed:
+        return "PROCESSING", "Route is being processed"
+
     error = business_trip.has_error()
 
     if error == 1:
@@ -11,13 +22,29 @@ def check_business_trip_status(business_trip):
     if error == 2:
         return "FAILED", "No possible route found for parameters"
 
-    if not business_trip.is_processed:
-        return "PROCESSING", "Route is being processed"
-
     return "SUCCEEDED", business_trip.pk
 
 
+def render_business_trip_message(message_type, message):
+    """
+    Renders websocket message sent to clients of business trip.
+
+    @param message_type: type of message, e.g. PROCESSING
+    @param message: message which can be serialized to JSON
+    @return: JSON text
+    """
+    return json.dumps({
+        "type": "business_trip_message",
+        "messageType": message_type,
+        "message": message
+    }, cls=encoders.JSONEncoder)
+
+
 def update_business_trip_by_ws(business_trip_id, message_type, message):
+    """
+    Sends message to all clients of business trip. The message is rendered once here, consumers only pass
+    the rendered text to their clients.
+    """
     channel_layer = channels.layers.get_channel_layer()
     group_name = 'business_trip_%s' % business_trip_id
 
@@ -26,14 +53,41 @@ def update_business_trip_by_ws(business_trip_id, message_type, message):
         {
             "type": "update_business_trip_message",
             "messageType": message_type,
-            "message": message
+            "text": render_business_trip_message(message_type, message)
         }
     )
 
 
+def get_candidate_hotels(hotel_queryset, depot, requisitions, max_distance, per_company=10):
+    """
+    Selects hotels which may end a day of the route. Only hotels within the bounding box of max_distance around
+    the depot and companies are loaded, of them only per_company nearest hotels of every company (and the depot)
+    not farther than max_distance in a straight line are kept.
+
+    @param hotel_queryset: queryset of hotels
+    @param depot: department where the route starts and ends
+    @param requisitions: requisitions of business trip
+    @param max_distance: distance limit of a day in kilometres
+    @param per_company: number of the nearest hotels kept for each company (default: 10)
+    @return: list of hotels
+    """
+    origins = np.array([(depot.latitude, depot.longitude)] +
+                       [(requisition.company.latitude, requisition.company.longitude)
+                        for requisition in requisitions], dtype=np.float64)
+    min_lat, max_lat, min_lng, max_lng = spatial.get_bounding_box(origins, max_distance)
+
+    hotels = list(hotel_queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat,
+                                        longitude__gte=min_lng, longitude__lte=max_lng)
+                  .only('latitude', 'longitude'))
+    selected = spatial.get_nearest_within(origins, [(hotel.latitude, hotel.longitude) for hotel in hotels],
+                                          max_distance, per_company)
+
+    return [hotels[index] for index in selected]
+
+
 def generate_data_for_route(business_trip, requisitions, depot, hotel_queryset, crossover_probability=0.7,
                             mutation_probability=0.4, elitism_rate=0.1,
-                            population_size=40, iterations=1000):
+                            population_size=40, iterations=1000, time_budget=None, warm_start_version=None):
     depot = dict(name=str(depot.pk), coords=(depot.latitude, depot.longitude))
     companies = list()
     hotels = list()
@@ -51,7 +105,8 @@ def generate_data_for_route(business_trip, requisitions, depot, hotel_queryset,
     return dict(business_trip_id=business_trip.id, depots=depot,
                 companies=companies, hotels=hotels, tmax=business_trip.distance_constraint, days=business_trip.duration,
                 crossover_probability=crossover_probability, mutation_probability=mutation_probability,
-                elitism_rate=elitism_rate, population_size=population_size, iterations=iterations)
+                elitism_rate=elitism_rate, population_size=population_size, iterations=iterations,
+                time_budget=time_budget, warm_start_version=warm_start_version)
 
 # def generate_data_for_route(business_trip, data, crossover_probability=0.7, mutation_probability=0.4, elitism_rate=0.1,
 #                             population_size=40, iterations=1000):
@@ -37,6 +37,21 @@ class ReadOnlySerializerMixin(viewsets.ModelViewSet):
         return self.serializer_class
 
 
+class BusinessTripListMixin:
+    """
+    Mixin resolving states of tasks of all listed business trips at once, so serializing is_processed of each
+    of them does not ask result backend.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            business_trips = list(args[0])
+            models.resolve_task_statuses(business_trips)
+            args = (business_trips,) + args[1:]
+
+        return super().get_serializer(*args, **kwargs)
+
+
 class CurrentUserView(APIView):
     def get(self, request):
         serializer = serializers.UserSerializer(
@@ -136,14 +151,14 @@ class ProfileViewSet(viewsets.ModelViewSet):
     serializer_class = serializers.ProfileSerializer
 
 
-class EmployeeBusinessTrips(mixins.ListModelMixin, viewsets.GenericViewSet):
+class EmployeeBusinessTrips(BusinessTripListMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     serializer_class = serializers.BusinessTripSerializer
     filterset_class = data_filters.EmployeeBusinessTripsFilterSet
     pagination_class = StandardResultsSetPagination
     http_method_names = ['get', 'options']
 
     def get_queryset(self):
-        return models.BusinessTrip.objects.filter(assignee_id=self.kwargs.get('pk'))
+        return models.BusinessTrip.objects.filter(assignee_id=self.kwargs.get('pk')).with_totals()
 
 
 class EmployeeRequisitionsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
@@ -186,12 +201,20 @@ class EmployeeCompanyHistoryViewSet(mixins.ListModelMixin, viewsets.GenericViewS
         return result
 
 
-class BusinessTripViewSet(ReadOnlySerializerMixin, viewsets.ModelViewSet):
+class BusinessTripViewSet(BusinessTripListMixin, ReadOnlySerializerMixin, viewsets.ModelViewSet):
     queryset = models.BusinessTrip.objects.all()
     serializer_class = serializers.BusinessTripSerializer
     read_only_serializer_class = serializers.BusinessTripReadOnlySerializer
     permission_classes = [IsAdminUser]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # totals of updated business trip change while it is saved
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.with_totals()
+
+        return queryset
+
     def get_permissions(self):
         if self.action == 'retrieve':
             permission_classes = [permissions.IsOwner]
@@ -0,0 +1,80 @@
+import random
+from typing import Iterable, Iterator
+
+
+class AvailableVertices:
+    """
+    Set of ids of vertices which may still be added to a route. Ids are in range [0, size).
+
+    Members are kept in an indexable free-list together with a dictionary of their positions in it. Membership
+    tests, adding, discarding and choosing a random member take O(1), and memory depends only on the number
+    of members, so creating a route with few available companies does not cost O(size).
+    """
+    __slots__ = ('size', 'items', 'positions')
+
+    def __init__(self, size: int, ids: Iterable[int] = ()) -> None:
+        self.size = size
+        self.items = list()
+        self.positions = dict()
+
+        for id in ids:
+            self.add(id)
+
+    def __contains__(self, id) -> bool:
+        return id in self.positions
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self.items))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, AvailableVertices):
+            return set(self.items) == set(other.items)
+        if isinstance(other, (set, frozenset)):
+            return set(self.items) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return 'AvailableVertices(%r)' % sorted(self.items)
+
+    def add(self, id: int) -> None:
+        id = int(id)
+        if id in self.positions:
+            return
+        if not 0 <= id < self.size:
+            raise IndexError('Id %d is out of range of available vertices' % id)
+
+        self.positions[id] = len(self.items)
+        self.items.append(id)
+
+    def discard(self, id: int) -> None:
+        if id not in self:
+            return
+
+        # Move the last member into the place of the discarded one
+        position = self.positions.pop(int(id))
+        last = self.items.pop()
+        if last != id:
+            self.items[position] = last
+            self.positions[last] = position
+
+    def choice(self, rng: random.Random = random) -> int:
+        """
+        Chooses a random member.
+
+        @param rng: source of randomness (default: random module)
+        @return: id of vertex
+        """
+        if not self.items:
+            raise IndexError('Cannot choose from empty available vertices')
+
+        return self.items[int(rng.random() * len(self.items))]
+
+    def copy(self) -> 'AvailableVertices':
+        available_vertices = AvailableVertices.__new__(AvailableVertices)
+        available_vertices.size = self.size
+        available_vertices.items = list(self.items)
+        available_vertices.positions = dict(self.positions)
+        return available_vertices
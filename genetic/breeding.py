@@ -0,0 +1,191 @@
+import ctypes
+import multiprocessing
+import random
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from genetic import encoding, routes, utils, vertices
+from genetic.distances import DistanceMatrix
+
+SharedArray = Tuple[multiprocessing.RawArray, Tuple[int, ...], str]
+
+MATRIX_FIELDS = ('distances', 'profits_by_distances', 'nearest', 'most_profitable')
+
+# state of breeding worker process, set once by the pool initializer
+_worker = dict()
+
+
+def share_array(array: np.ndarray) -> SharedArray:
+    """
+    Copies given array into shared memory which can be passed to worker processes on their start.
+
+    @param array: NumPy array
+    @return: shared buffer, shape and dtype of array
+    """
+    array = np.ascontiguousarray(array)
+    buffer = multiprocessing.RawArray(ctypes.c_byte, max(array.nbytes, 1))
+    attach_array(buffer, array.shape, array.dtype.str)[...] = array
+
+    return buffer, array.shape, array.dtype.str
+
+
+def attach_array(buffer: multiprocessing.RawArray, shape: Tuple[int, ...], dtype: str) -> np.ndarray:
+    """
+    Gives NumPy view of shared buffer, no data is copied.
+    """
+    count = int(np.prod(shape))
+    return np.frombuffer(buffer, dtype=dtype, count=count).reshape(shape)
+
+
+def share_distance_matrix(matrix: DistanceMatrix) -> Dict[str, SharedArray]:
+    return {field: share_array(getattr(matrix, field)) for field in MATRIX_FIELDS}
+
+
+def attach_distance_matrix(shared: Dict[str, SharedArray]) -> DistanceMatrix:
+    arrays = {field: attach_array(*shared[field]) for field in MATRIX_FIELDS}
+    return DistanceMatrix(arrays['distances'], arrays['profits_by_distances'], dtype=arrays['distances'].dtype,
+                          nearest=arrays['nearest'], most_profitable=arrays['most_profitable'])
+
+
+def get_couple_seed(seed: int, generation: int, index: int) -> int:
+    """
+    Gives seed of random generator for breeding of given couple. It depends only on its arguments, so results
+    of breeding do not depend on the number of workers and on the order in which couples are processed.
+
+    @param seed: seed of the whole run
+    @param generation: number of generation
+    @param index: index of couple in generation
+    @return: seed
+    """
+    return int(np.random.SeedSequence([seed, generation, index]).generate_state(1)[0])
+
+
+def breed_compact_couple(couple: List[encoding.CompactRoute], crossover_probability: float,
+                         mutation_probability: float, seed: int, generation: int, index: int,
+                         vertex_ids: Dict[int, vertices.Vertex], distances: DistanceMatrix,
+                         company_ids: List[int]) -> List[encoding.CompactRoute]:
+    """
+    Crossovers and mutates decoded copies of given couple with random generator seeded for this couple.
+
+    @return: compact children
+    """
+    random.seed(get_couple_seed(seed, generation, index))
+
+    parents = [encoding.decode_route(route, vertex_ids, distances, company_ids) for route in couple]
+    children = utils.crossover([parents, crossover_probability, mutation_probability])
+
+    return [encoding.encode_route(child) for child in children]
+
+
+def _init_worker(shared_matrix: Dict[str, SharedArray], vertex_ids: Dict[int, vertices.Vertex],
+                 company_ids: List[int], seed: int) -> None:
+    _worker['distances'] = attach_distance_matrix(shared_matrix)
+    _worker['vertex_ids'] = vertex_ids
+    _worker['company_ids'] = company_ids
+    _worker['seed'] = seed
+
+
+def _breed_couple(task) -> List[encoding.CompactRoute]:
+    index, generation, couple, crossover_probability, mutation_probability = task
+
+    return breed_compact_couple(couple, crossover_probability, mutation_probability, _worker['seed'], generation,
+                                index, _worker['vertex_ids'], _worker['distances'], _worker['company_ids'])
+
+
+class SerialBreeder:
+    """
+    Breeds couples one after another in the current process. Parents are changed in place.
+
+    If seed is given, couples are bred like in ParallelBreeder instead: random generator is seeded for every couple
+    and decoded copies of parents are bred, so both breeders give the same children for the same seed. State of
+    random generator of the process is restored after breeding, as workers of ParallelBreeder do not change it.
+    """
+
+    def __init__(self, distances: DistanceMatrix = None, vertex_ids: Dict[int, vertices.Vertex] = None,
+                 company_ids: Iterable[int] = (), seed: int = None) -> None:
+        self.distances = distances
+        self.vertex_ids = vertex_ids
+        self.company_ids = list(company_ids)
+        self.seed = seed
+
+    def __enter__(self) -> 'SerialBreeder':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+    def breed(self, packed_couples: List[List], generation: int) -> List[routes.Route]:
+        """
+        Crossovers and mutates given couples.
+
+        @param packed_couples: list of [couple, crossover probability, mutation probability]
+        @param generation: number of generation
+        @return: list of children, two for each couple
+        """
+        children = list()
+        if self.seed is None:
+            for packed in packed_couples:
+                children += utils.crossover(packed)
+
+            return children
+
+        state = random.getstate()
+        for index, (couple, crossover_probability, mutation_probability) in enumerate(packed_couples):
+            compact_children = breed_compact_couple([encoding.encode_route(route) for route in couple],
+                                                    crossover_probability, mutation_probability, self.seed,
+                                                    generation, index, self.vertex_ids, self.distances,
+                                                    self.company_ids)
+            children += [encoding.decode_route(child, self.vertex_ids, self.distances, self.company_ids)
+                         for child in compact_children]
+        random.setstate(state)
+
+        return children
+
+
+class ParallelBreeder(SerialBreeder):
+    """
+    Breeds couples in a pool of worker processes. The distance matrix is copied into shared memory once and
+    attached by workers on their start, only compact encodings of couples and children are sent per task.
+    Random generator is seeded for every couple from seed, number of generation and index of couple.
+    """
+
+    def __init__(self, distances: DistanceMatrix, vertex_ids: Dict[int, vertices.Vertex],
+                 company_ids: Iterable[int], workers: int, seed: int = None) -> None:
+        super().__init__(distances, vertex_ids, company_ids, random.randrange(2 ** 32) if seed is None else seed)
+        self.workers = workers
+        self.pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                         initargs=(share_distance_matrix(distances), vertex_ids, self.company_ids,
+                                                   self.seed))
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+    def breed(self, packed_couples: List[List], generation: int) -> List[routes.Route]:
+        tasks = [(index, generation, [encoding.encode_route(route) for route in couple], crossover_probability,
+                  mutation_probability)
+                 for index, (couple, crossover_probability, mutation_probability) in enumerate(packed_couples)]
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+
+        children = list()
+        for compact_children in self.pool.imap(_breed_couple, tasks, chunksize):
+            children += [encoding.decode_route(child, self.vertex_ids, self.distances, self.company_ids)
+                         for child in compact_children]
+
+        return children
+
+
+def get_breeder(distances: DistanceMatrix, vertex_ids: Dict[int, vertices.Vertex], company_ids: Iterable[int],
+                workers: int = 0, seed: int = None) -> SerialBreeder:
+    """
+    Gives serial breeder when workers is 0, otherwise parallel breeder with given number of worker processes.
+    Both give the same children if seed is given.
+    """
+    if workers:
+        return ParallelBreeder(distances, vertex_ids, company_ids, workers, seed)
+
+    return SerialBreeder(distances, vertex_ids, company_ids, seed)
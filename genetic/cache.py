@@ -0,0 +1,328 @@
+import abc
+import logging
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import redis
+from django.conf import settings
+
+logger = logging.getLogger('data')
+
+# Cached row of distances from one vertex, keyed by coordinates of destination vertices
+Row = Dict[str, float]
+
+# Maximal number of parameters of one SQLite query in its default build
+SQLITE_MAX_PARAMETERS = 999
+
+
+def get_coords_key(coords: Sequence[float]) -> str:
+    """
+    Creates a content address of vertex based on its coordinates. Coordinates are rounded to 6 decimal places
+    which is around 0.1 m, so the same building always gets the same key.
+
+    @param coords: latitude and longitude of vertex
+    @return: key of vertex
+    """
+    return '%.6f:%.6f' % (coords[0], coords[1])
+
+
+class DistanceCache(abc.ABC):
+    """
+    Bounded cache of rows of distance matrix shared between route optimizations. Rows are keyed by coordinates
+    of the origin vertex and hold distances to every destination vertex the row has been counted for.
+    Least recently used rows are evicted when the cache exceeds its size.
+    """
+
+    def __init__(self, max_rows: int = 10000) -> None:
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+
+    @abc.abstractmethod
+    def get_rows(self, keys: List[str], columns: List[str]) -> List[List[Optional[float]]]:
+        """
+        Gets cached distances from every vertex of keys to every vertex of columns.
+
+        @param keys: keys of origin vertices
+        @param columns: keys of destination vertices
+        @return: list of rows with None for not cached distances
+        """
+
+    @abc.abstractmethod
+    def set_rows(self, rows: Dict[str, Row]) -> None:
+        """
+        Merges given distances into cached rows and evicts least recently used rows if the cache is full.
+
+        @param rows: dictionary of origin vertex key and its distances to destination vertices
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Removes all cached rows.
+        """
+
+    def get_matrix(self, keys: List[str]) -> np.ndarray:
+        """
+        Builds the distance matrix between given vertices from cached rows.
+
+        @param keys: keys of vertices
+        @return: array of shape (n, n) with np.nan for not cached distances
+        """
+        rows = self.get_rows(keys, keys)
+        return np.array([[np.nan if distance is None else distance for distance in row] for row in rows],
+                        dtype=np.float64).reshape(len(keys), len(keys))
+
+    def get_distances(self, coords: np.ndarray,
+                      count_function: Callable[[np.ndarray, np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Gets the distance matrix between given vertices. Only distances missing in the cache are counted with
+        count_function, first for vertices which have not been cached at all and then for pairs of cached vertices
+        which have never been counted together.
+
+        @param coords: array of shape (n, 2) with coordinates of vertices
+        @param count_function: function counting distances between origins and destinations coordinates
+        @return: array of shape (n, n) with distances
+        """
+        keys = [get_coords_key(vertex_coords) for vertex_coords in coords]
+        matrix = self.get_matrix(keys)
+        missing = np.isnan(matrix)
+        incomplete_rows = np.flatnonzero(missing.any(axis=1))
+
+        self.misses += len(incomplete_rows)
+        self.hits += len(keys) - len(incomplete_rows)
+
+        if not len(incomplete_rows):
+            return matrix
+
+        not_cached = missing.all(axis=1)
+        if not_cached.any():
+            matrix[not_cached] = count_function(coords[not_cached], coords)
+            matrix[:, not_cached] = count_function(coords, coords[not_cached])
+
+        missing = np.isnan(matrix)
+        rows = np.flatnonzero(missing.any(axis=1))
+        if len(rows):
+            columns = np.flatnonzero(missing.any(axis=0))
+            block = np.ix_(rows, columns)
+            matrix[block] = np.where(missing[block], count_function(coords[rows], coords[columns]), matrix[block])
+
+        self.set_rows({keys[i]: dict(zip(keys, matrix[i].tolist())) for i in incomplete_rows})
+        logger.info('Counted %d of %d rows of distances missing in cache' % (len(incomplete_rows), len(keys)))
+
+        return matrix
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses, hit_rate=self.hits / total if total else 0)
+
+
+class LocalDistanceCache(DistanceCache):
+    """
+    Distance cache kept in memory of the process. If path is given, rows are also stored in an SQLite database
+    on local disk, one record per row, so the cache may be shared by many workers of the same host. Rows missing
+    in memory are read from the database and only rows given to set_rows are written, so a write does not depend
+    on the size of the cache. Rows of the database are evicted by the time of their last save.
+    """
+
+    def __init__(self, path: str = None, max_rows: int = 10000) -> None:
+        super().__init__(max_rows)
+        self.path = path
+        self.rows: 'OrderedDict[str, Row]' = OrderedDict()
+        self.connection = None
+
+        if self.path:
+            # Writers of other workers are waited for instead of failing with locked database
+            self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self.connection.execute('CREATE TABLE IF NOT EXISTS rows (key TEXT PRIMARY KEY, row BLOB NOT NULL, '
+                                    'used REAL NOT NULL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS rows_used ON rows (used)')
+
+    def __load(self, keys: List[str]) -> Dict[str, Row]:
+        loaded = dict()
+
+        # SQLite limits the number of parameters of a query
+        for i in range(0, len(keys), SQLITE_MAX_PARAMETERS):
+            chunk = keys[i:i + SQLITE_MAX_PARAMETERS]
+            query = 'SELECT key, row FROM rows WHERE key IN (%s)' % ', '.join('?' * len(chunk))
+            for key, row in self.connection.execute(query, chunk):
+                try:
+                    loaded[key] = pickle.loads(row)
+                except (EOFError, pickle.UnpicklingError):
+                    logger.warning('Could not load row %s of distance cache from %s' % (key, self.path))
+
+        return loaded
+
+    def __save(self, rows: Dict[str, Row]) -> None:
+        keys = list(rows)
+        now = time.time()
+
+        # Rows saved by other workers in the meantime are merged in one transaction
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            saved_rows = self.__load(keys)
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO rows (key, row, used) VALUES (?, ?, ?)',
+                [(key, pickle.dumps({**saved_rows.get(key, dict()), **rows[key]}, protocol=pickle.HIGHEST_PROTOCOL),
+                  now) for key in keys])
+            size = self.connection.execute('SELECT COUNT(*) FROM rows').fetchone()[0]
+            if size > self.max_rows:
+                self.connection.execute('DELETE FROM rows WHERE key IN (SELECT key FROM rows ORDER BY used LIMIT ?)',
+                                        (size - self.max_rows,))
+            self.connection.execute('COMMIT')
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+
+    def __evict(self, rows: 'OrderedDict[str, Row]') -> None:
+        while len(rows) > self.max_rows:
+            rows.popitem(last=False)
+
+    def get_rows(self, keys: List[str], columns: List[str]) -> List[List[Optional[float]]]:
+        if self.connection is not None:
+            missing = [key for key in set(keys) if key not in self.rows]
+            if missing:
+                self.rows.update(self.__load(missing))
+                self.__evict(self.rows)
+
+        result = list()
+
+        for key in keys:
+            row = self.rows.get(key)
+            if row is None:
+                result.append([None] * len(columns))
+                continue
+
+            self.rows.move_to_end(key)
+            result.append([row.get(column) for column in columns])
+
+        return result
+
+    def set_rows(self, rows: Dict[str, Row]) -> None:
+        for key, row in rows.items():
+            self.rows.setdefault(key, dict()).update(row)
+            self.rows.move_to_end(key)
+        self.__evict(self.rows)
+
+        if self.connection is not None:
+            self.__save(rows)
+
+    def clear(self) -> None:
+        self.rows.clear()
+
+        if self.connection is not None:
+            self.connection.execute('DELETE FROM rows')
+
+
+class RedisDistanceCache(DistanceCache):
+    """
+    Distance cache stored in Redis and shared by all workers. Each row is a hash of destination keys and distances,
+    the time of last use of rows is tracked in a sorted set to evict least recently used rows. A row gains a field
+    for every new destination, so rows with more than max_columns fields are dropped and counted again, and rows
+    not used for ttl seconds expire. Errors of Redis are logged and treated as cache misses, so an outage
+    of the cache never stops route optimization.
+    """
+
+    def __init__(self, client: redis.Redis, max_rows: int = 10000, prefix: str = 'distances',
+                 max_columns: int = 10000, ttl: int = 30 * 24 * 3600) -> None:
+        super().__init__(max_rows)
+        self.client = client
+        self.prefix = prefix
+        self.lru_key = '%s:lru' % prefix
+        self.max_columns = max_columns
+        self.ttl = ttl
+
+    def __get_row_key(self, key: str) -> str:
+        return '%s:row:%s' % (self.prefix, key)
+
+    def get_rows(self, keys: List[str], columns: List[str]) -> List[List[Optional[float]]]:
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.hmget(self.__get_row_key(key), columns)
+            rows = pipeline.execute()
+
+            touched = {key: time.time() for key, row in zip(keys, rows) if any(value is not None for value in row)}
+            if touched:
+                pipeline = self.client.pipeline(transaction=False)
+                pipeline.zadd(self.lru_key, touched)
+                for key in touched:
+                    pipeline.expire(self.__get_row_key(key), self.ttl)
+                pipeline.execute()
+        except redis.RedisError as e:
+            # Distances are counted without the cache while Redis is not available
+            logger.warning('Could not get distances from cache %s: %s' % (self.prefix, e))
+            return [[None] * len(columns) for _ in keys]
+
+        return [[None if value is None else float(value) for value in row] for row in rows]
+
+    def set_rows(self, rows: Dict[str, Row]) -> None:
+        try:
+            keys = list(rows)
+            pipeline = self.client.pipeline(transaction=False)
+            now = time.time()
+            for key in keys:
+                pipeline.hset(self.__get_row_key(key), mapping=rows[key])
+                pipeline.expire(self.__get_row_key(key), self.ttl)
+                pipeline.hlen(self.__get_row_key(key))
+            pipeline.zadd(self.lru_key, {key: now for key in keys})
+            pipeline.zcard(self.lru_key)
+            results = pipeline.execute()
+
+            size = results[-1]
+            evicted = [key.encode() for key, length in zip(keys, results[2:3 * len(keys):3])
+                       if length > self.max_columns]
+            if size - len(evicted) > self.max_rows:
+                evicted += self.client.zrange(self.lru_key, 0, size - len(evicted) - self.max_rows - 1)
+
+            if evicted:
+                pipeline = self.client.pipeline(transaction=False)
+                pipeline.delete(*[self.__get_row_key(key.decode()) for key in evicted])
+                pipeline.zrem(self.lru_key, *evicted)
+                pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning('Could not save distances to cache %s: %s' % (self.prefix, e))
+
+    def clear(self) -> None:
+        keys = [self.__get_row_key(key.decode()) for key in self.client.zrange(self.lru_key, 0, -1)]
+        self.client.delete(self.lru_key, *keys)
+
+
+_distance_caches: Dict[str, DistanceCache] = dict()
+
+# Location used if DISTANCE_CACHE setting has no LOCATION, the local cache is kept only in memory without a path
+DEFAULT_LOCATIONS = {
+    'redis': 'redis://localhost:6379/1',
+    'local': None,
+}
+
+
+def get_distance_cache(namespace: str = 'haversine') -> Optional[DistanceCache]:
+    """
+    Creates the distance cache configured in DISTANCE_CACHE setting once per process and namespace.
+    Each kind of distance (e.g. straight-line or road distances, travel times) has to be kept in its own namespace.
+
+    @param namespace: name of the kind of cached distances (default: 'haversine')
+    @return: distance cache or None if the cache is disabled
+    """
+    config = getattr(settings, 'DISTANCE_CACHE', None)
+    if not config or not config.get('BACKEND'):
+        return None
+
+    if namespace not in _distance_caches:
+        max_rows = config.get('MAX_ROWS', 10000)
+        location = config.get('LOCATION', DEFAULT_LOCATIONS.get(config['BACKEND']))
+        if config['BACKEND'] == 'redis':
+            _distance_caches[namespace] = RedisDistanceCache(redis.Redis.from_url(location), max_rows=max_rows,
+                                                             prefix='distances:%s' % namespace,
+                                                             max_columns=config.get('MAX_COLUMNS', 10000),
+                                                             ttl=config.get('TTL', 30 * 24 * 3600))
+        else:
+            path = '%s.%s' % (location, namespace) if location else None
+            _distance_caches[namespace] = LocalDistanceCache(path, max_rows=max_rows)
+
+    return _distance_caches[namespace]
@@ -0,0 +1,133 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from genetic import vertices
+
+# The same mean Earth radius (in kilometres) as used by mpu.haversine_distance
+EARTH_RADIUS = 6371
+
+
+def get_coords_array(all_vertices: List[vertices.Vertex]) -> np.ndarray:
+    """
+    Packs coordinates of given vertices into an array of shape (n, 2).
+
+    @param all_vertices: list of vertices
+    @return: array of latitudes and longitudes in degrees
+    """
+    return np.array([vertex.get_coords() for vertex in all_vertices], dtype=np.float64).reshape(-1, 2)
+
+
+def count_haversine_distances(origins: np.ndarray, destinations: np.ndarray = None) -> np.ndarray:
+    """
+    Counts great-circle distances between every origin and every destination in one batched pass.
+
+    @param origins: array of shape (n, 2) with latitudes and longitudes in degrees
+    @param destinations: array of shape (m, 2), origins are used if not given
+    @return: array of shape (n, m) with distances in kilometres
+    """
+    if destinations is None:
+        destinations = origins
+
+    origins = np.radians(np.asarray(origins, dtype=np.float64))
+    destinations = np.radians(np.asarray(destinations, dtype=np.float64))
+
+    lat_from = origins[:, 0, np.newaxis]
+    lng_from = origins[:, 1, np.newaxis]
+    lat_to = destinations[np.newaxis, :, 0]
+    lng_to = destinations[np.newaxis, :, 1]
+
+    a = np.sin((lat_to - lat_from) / 2) ** 2 + \
+        np.cos(lat_from) * np.cos(lat_to) * np.sin((lng_to - lng_from) / 2) ** 2
+    # Rounding errors may push a slightly out of [0, 1] for identical or antipodal points
+    np.clip(a, 0, 1, out=a)
+
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def count_profits_by_distances(distances: np.ndarray, profits: np.ndarray) -> np.ndarray:
+    """
+    Counts profit of reaching the destination vertex per kilometre for every pair of vertices.
+    Pairs with zero distance between them have zero profit.
+
+    @param distances: array of shape (n, n) with distances between vertices
+    @param profits: array of shape (n,) with profits of vertices
+    @return: array of shape (n, n) where cell [i, j] is profit of j divided by distance from i to j
+    """
+    profits = np.broadcast_to(np.asarray(profits, dtype=np.float64), distances.shape)
+    profits_by_distances = np.zeros(distances.shape, dtype=np.float64)
+    np.divide(profits, distances, out=profits_by_distances, where=distances != 0)
+
+    return profits_by_distances
+
+
+def count_distances(all_vertices: List[vertices.Vertex], provider=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts the distance matrix and the profit by distance matrix for given vertices.
+    Rows and columns follow the order of given vertices.
+
+    @param all_vertices: list of vertices
+    @param provider: distance provider, straight-line distances are counted if not given
+    @return: tuple of distances and profits by distances arrays of shape (n, n)
+    """
+    coords = get_coords_array(all_vertices)
+    if provider is None:
+        distances = count_haversine_distances(coords)
+    else:
+        distances = provider.get_distances(coords)
+    profits = np.array([vertex.profit for vertex in all_vertices], dtype=np.float64)
+
+    return distances, count_profits_by_distances(distances, profits)
+
+
+class DistanceMatrix:
+    """
+    Distances and profits by distances between all vertices of the route stored as contiguous float matrices.
+    Rows and columns are indexed by vertex ids. Neighbours of every vertex are ordered once on creation,
+    so insertion heuristics do not need to sort whole rows for each insertion.
+    """
+
+    def __init__(self, distances: np.ndarray, profits_by_distances: np.ndarray, dtype=np.float64,
+                 nearest: np.ndarray = None, most_profitable: np.ndarray = None) -> None:
+        self.distances = np.ascontiguousarray(distances, dtype=dtype)
+        self.profits_by_distances = np.ascontiguousarray(profits_by_distances, dtype=dtype)
+        # ids of vertices ordered by ascending distance from vertex of given row
+        self.nearest = self.__argsort(self.distances) if nearest is None else nearest
+        # ids of vertices ordered by descending profit by distance from vertex of given row
+        self.most_profitable = self.__argsort(-self.profits_by_distances) if most_profitable is None \
+            else most_profitable
+
+    @classmethod
+    def from_vertices(cls, all_vertices: List[vertices.Vertex], dtype=np.float64, provider=None) -> 'DistanceMatrix':
+        """
+        Creates a distance matrix for given vertices. Id of each vertex has to be equal to its index in the list.
+
+        @param all_vertices: list of vertices
+        @param dtype: float type of stored matrices (default: np.float64)
+        @param provider: distance provider, straight-line distances are counted if not given (default: None)
+        @return: distance matrix
+        """
+        return cls(*count_distances(all_vertices, provider), dtype=dtype)
+
+    @staticmethod
+    def __argsort(matrix: np.ndarray) -> np.ndarray:
+        return np.argsort(matrix, axis=1, kind='stable').astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self.distances)
+
+    def __getitem__(self, key):
+        return self.distances[key]
+
+    def get_nearest_among(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Orders given subset of vertices by ascending distance from every vertex.
+
+        @param ids: ids of vertices to be ordered
+        @return: array of shape (n, len(ids)) where each row contains given ids sorted by distance from vertex of that row
+        """
+        ids = np.asarray(ids, dtype=np.int32)
+        if not len(ids):
+            return np.empty((len(self), 0), dtype=np.int32)
+
+        return ids[self.__argsort(self.distances[:, ids])]
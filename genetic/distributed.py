@@ -0,0 +1,120 @@
+import logging
+import math
+import os
+
+from genetic import encoding, islands
+from genetic.distances import DistanceMatrix
+
+logger = logging.getLogger('data')
+
+# actor class of island, created when ray is imported for the first time
+_island_actor = None
+
+
+def _setup_django(worker_info=None) -> None:
+    # vertices refer to Django models, so apps have to be loaded in every ray worker before islands are unpickled
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'route_optimizer.settings')
+    django.setup()
+
+
+def _import_ray():
+    try:
+        import ray
+    except ImportError:
+        raise islands.IslandException('Ray is not installed, islands cannot be run on a ray cluster')
+
+    return ray
+
+
+class _RayIsland(islands.Island):
+    def __init__(self, island: int, options: dict, distances, profits_by_distances, nearest, most_profitable):
+        # arrays are read-only views of the object store, they are not copied
+        matrix = DistanceMatrix(distances, profits_by_distances, dtype=distances.dtype, nearest=nearest,
+                                most_profitable=most_profitable)
+        super().__init__(island, options, matrix)
+
+
+def get_island_actor():
+    global _island_actor
+
+    if _island_actor is None:
+        _island_actor = _import_ray().remote(_RayIsland)
+
+    return _island_actor
+
+
+def init_ray(address: str = None, **options) -> None:
+    """
+    Connects to a ray cluster at given address or starts a local one if address is not given. Does nothing
+    if ray is already initialized.
+
+    @param address: address of ray cluster, e.g. 'auto' or '127.0.0.1:6379' (default: None)
+    @param options: other arguments of ray.init
+    """
+    ray = _import_ray()
+    if ray.is_initialized():
+        return
+
+    ray.init(address=address, **options)
+    ray.worker.global_worker.run_function_on_all_workers(_setup_django)
+
+
+class RayIslandModel(islands.IslandModel):
+    """
+    Island model with islands kept by ray actors, so they may be spread over nodes of a ray cluster.
+    The distance matrix is put into the object store once and read by all actors on a node without copying.
+    """
+
+    def __init__(self, *args, address: str = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.address = address
+        self.actors = list()
+
+    def generate_random_routes(self) -> None:
+        init_ray(self.address)
+        ray = _import_ray()
+
+        logger.info('Starting %d ray islands for route' % self.islands)
+        matrix = self.optimizer.distances
+        arrays = [ray.put(array) for array in (matrix.distances, matrix.profits_by_distances, matrix.nearest,
+                                               matrix.most_profitable)]
+        actor = get_island_actor()
+        self.actors = [actor.remote(island, self.options, *arrays) for island in range(self.islands)]
+
+        self.optimizer.observer.increment(
+            self.optimizer.population_size * self.optimizer.complexity_vector["generating_routes"])
+
+    def run(self) -> None:
+        ray = _import_ray()
+        epochs = math.ceil(self.optimizer.iterations / self.migration_interval)
+
+        try:
+            for epoch in range(1, epochs + 1):
+                messages = ray.get([actor.evolve.remote(self.migration_interval) for actor in self.actors])
+                self.optimizer.observer.increment(
+                    self.migration_interval * self.optimizer.complexity_vector["iterations"])
+
+                self.publish_best_migrant(messages)
+
+                if epoch == epochs or all(converged for message, converged in messages) or \
+                        self.optimizer.is_out_of_time():
+                    break
+
+                # calls of one actor are processed in order, so immigrants are received before the next evolve
+                for island, actor in enumerate(self.actors):
+                    actor.immigrate.remote(messages[island - 1][0])
+
+            best_routes = [encoding.decode_route(message, self.optimizer.vertex_ids, self.optimizer.distances,
+                                                 self.company_ids)
+                           for message in ray.get([actor.get_best_route.remote() for actor in self.actors])]
+        finally:
+            self.terminate()
+
+        self.best_route = max(best_routes, key=lambda x: x.profit)
+
+    def terminate(self) -> None:
+        # actors are stopped by ray when there are no handles to them
+        self.actors = list()
+        self.optimizer.close()
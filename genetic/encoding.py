@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from genetic import routes, vertices
+from genetic.distances import DistanceMatrix
+
+
+class CompactRoute:
+    """
+    Transport encoding of a route, used to send routes to breeding workers and between islands. Vertex ids of all
+    days are kept in one int32 array, stops of day d are ids[offsets[d]:offsets[d + 1]]. Distance and profit
+    of each day are cached next to them.
+
+    It is not a representation routes are optimized in: operators of Route work on lists of vertices, so a route
+    is decoded before it is changed and encoded again to be sent back.
+    """
+    __slots__ = ('max_distance', 'ids', 'offsets', 'distances', 'profits')
+
+    def __init__(self, max_distance: float, ids: np.ndarray, offsets: np.ndarray, distances: np.ndarray,
+                 profits: np.ndarray) -> None:
+        self.max_distance = max_distance
+        self.ids = ids
+        self.offsets = offsets
+        self.distances = distances
+        self.profits = profits
+
+    @property
+    def days(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def distance(self) -> float:
+        return float(self.distances.sum())
+
+    @property
+    def profit(self) -> float:
+        return float(self.profits.sum())
+
+    def get_day(self, day: int) -> np.ndarray:
+        return self.ids[self.offsets[day]:self.offsets[day + 1]]
+
+
+class GenerationBlock:
+    """
+    Transport encoding of a whole generation, e.g. of migrants sent between islands. Vertex ids of route r are
+    kept in row r of one 2-D int32 array padded with -1, offsets of days of route r are in row r of the offsets
+    array.
+    """
+    __slots__ = ('max_distances', 'ids', 'offsets', 'distances', 'profits')
+
+    def __init__(self, max_distances: np.ndarray, ids: np.ndarray, offsets: np.ndarray, distances: np.ndarray,
+                 profits: np.ndarray) -> None:
+        self.max_distances = max_distances
+        self.ids = ids
+        self.offsets = offsets
+        self.distances = distances
+        self.profits = profits
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get_route(self, index: int) -> CompactRoute:
+        offsets = self.offsets[index]
+        return CompactRoute(float(self.max_distances[index]), self.ids[index, :offsets[-1]], offsets,
+                            self.distances[index], self.profits[index])
+
+
+def encode_route(route: routes.Route) -> CompactRoute:
+    """
+    Encodes given route to be sent to another process.
+
+    @param route: route to be encoded
+    @return: compact route
+    """
+    lengths = [route_part.length for route_part in route.routes]
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+
+    ids = np.fromiter((vertex.id for route_part in route.routes for vertex in route_part.route), dtype=np.int32,
+                      count=int(offsets[-1]))
+    distances = np.array([route_part.distance for route_part in route.routes], dtype=np.float64)
+    profits = np.array([sum(vertex.profit for vertex in set(route_part.route)) for route_part in route.routes],
+                       dtype=np.float64)
+
+    return CompactRoute(route.max_distance, ids, offsets, distances, profits)
+
+
+def decode_route(compact_route: CompactRoute, vertex_ids: Dict[int, vertices.Vertex], distances: DistanceMatrix,
+                 company_ids: Iterable[int]) -> routes.Route:
+    """
+    Decodes given compact route into a new route, which can be changed by all methods of route.
+
+    @param compact_route: compact route to be decoded
+    @param vertex_ids: dictionary of vertex id and vertex
+    @param distances: distance matrix of vertices
+    @param company_ids: ids of all companies which may be added to the route
+    @return: route
+    """
+    route = routes.Route(compact_route.days, compact_route.max_distance, distances)
+    route.available_vertices = set(company_ids)
+    route.vertices_ids = vertex_ids
+
+    for day in range(compact_route.days):
+        route.add_route_part(routes.RoutePart([vertex_ids[int(id)] for id in compact_route.get_day(day)]))
+
+    return route
+
+
+def encode_generation(population: List[routes.Route]) -> GenerationBlock:
+    """
+    Encodes given routes into one block. All routes have to have the same number of days.
+
+    @param population: list of routes
+    @return: generation block
+    """
+    compact_routes = [encode_route(route) for route in population]
+    width = max((len(compact_route.ids) for compact_route in compact_routes), default=0)
+    days = compact_routes[0].days if compact_routes else 0
+
+    ids = np.full((len(compact_routes), width), -1, dtype=np.int32)
+    offsets = np.zeros((len(compact_routes), days + 1), dtype=np.int32)
+    distances = np.zeros((len(compact_routes), days), dtype=np.float64)
+    profits = np.zeros((len(compact_routes), days), dtype=np.float64)
+    max_distances = np.array([compact_route.max_distance for compact_route in compact_routes], dtype=np.float64)
+
+    for i, compact_route in enumerate(compact_routes):
+        ids[i, :len(compact_route.ids)] = compact_route.ids
+        offsets[i] = compact_route.offsets
+        distances[i] = compact_route.distances
+        profits[i] = compact_route.profits
+
+    return GenerationBlock(max_distances, ids, offsets, distances, profits)
+
+
+def decode_generation(block: GenerationBlock, vertex_ids: Dict[int, vertices.Vertex], distances: DistanceMatrix,
+                      company_ids: Iterable[int]) -> List[routes.Route]:
+    """
+    Decodes all routes of given generation block.
+
+    @param block: generation block
+    @param vertex_ids: dictionary of vertex id and vertex
+    @param distances: distance matrix of vertices
+    @param company_ids: ids of all companies which may be added to routes
+    @return: list of routes
+    """
+    company_ids = list(company_ids)
+    return [decode_route(block.get_route(i), vertex_ids, distances, company_ids) for i in range(len(block))]
@@ -0,0 +1,78 @@
+from collections import deque, namedtuple
+from typing import List, Optional
+
+from genetic import routes
+
+GenerationSummary = namedtuple('GenerationSummary', ['generation', 'best', 'mean', 'diversity'])
+
+
+class GenerationStore:
+    """
+    Keeps only the current generation of routes and the next one being bred. Instead of full routes of older
+    generations, summaries of at most history_size last generations may be kept.
+    """
+
+    def __init__(self, history_size: int = 0) -> None:
+        self.generation = 0
+        self.current: List[routes.Route] = list()
+        self.next: List[routes.Route] = list()
+        self.history = deque(maxlen=history_size) if history_size else None
+
+    def set_initial(self, population: List[routes.Route]) -> None:
+        """
+        Sets the initial generation sorted by descending profit.
+
+        @param population: list of routes
+        """
+        self.generation = 0
+        self.current = sorted(population, key=lambda x: x.profit, reverse=True)
+        self.next = list()
+        self.__summarize()
+
+    def advance(self) -> None:
+        """
+        Replaces the current generation with the next one, which gets sorted by descending profit.
+        """
+        self.next.sort(key=lambda x: x.profit, reverse=True)
+        self.current = self.next
+        self.next = list()
+        self.generation += 1
+        self.__summarize()
+
+    def replace_worst(self, population: List[routes.Route]) -> None:
+        """
+        Replaces the least profitable routes of the current generation with given routes, size of generation
+        does not change.
+
+        @param population: list of routes
+        """
+        if not population:
+            return
+
+        kept = self.current[:max(len(self.current) - len(population), 0)]
+        self.current = sorted(kept + population[:len(self.current)], key=lambda x: x.profit, reverse=True)
+
+    def get_best(self) -> Optional[routes.Route]:
+        return self.current[0] if self.current else None
+
+    def get_mean_profit(self) -> float:
+        return sum(route.profit for route in self.current) / len(self.current) if self.current else 0
+
+    def get_diversity(self) -> float:
+        """
+        Counts the share of distinct routes in the current generation, routes with the same profit and distance
+        are considered the same.
+
+        @return: value in range (0, 1]
+        """
+        if not self.current:
+            return 0
+
+        return len(set((route.profit, round(route.distance, 6)) for route in self.current)) / len(self.current)
+
+    def __summarize(self) -> None:
+        if self.history is None or not self.current:
+            return
+
+        self.history.append(GenerationSummary(self.generation, self.current[0].profit, self.get_mean_profit(),
+                                              self.get_diversity()))
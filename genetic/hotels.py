@@ -0,0 +1,98 @@
+from typing import List
+
+import numpy as np
+
+from genetic import routes, vertices
+
+
+def _get_day_costs(matrix: np.ndarray, route_part: routes.RoutePart, starts: np.ndarray,
+                   ends: np.ndarray) -> np.ndarray:
+    """
+    Counts distance of the day for every pair of its start and end.
+
+    @return: array of shape (len(starts), len(ends))
+    """
+    if route_part.length <= 2:
+        return matrix[np.ix_(starts, ends)]
+
+    first = route_part.route[1].id
+    last = route_part.route[-2].id
+    inner = route_part.get_segment_distance(1, route_part.length - 2)
+
+    return matrix[starts, first][:, np.newaxis] + inner + matrix[last, ends][np.newaxis, :]
+
+
+def get_boundary_candidates(route: routes.Route, candidates: np.ndarray, depot: vertices.Vertex) -> List[np.ndarray]:
+    """
+    Gives candidate hotels of every boundary between two days, these are the nearest hotels of the last company
+    of the evening and of the first company of the morning.
+
+    @param route: route
+    @param candidates: array of shape (n, k) with ids of k nearest hotels of every vertex
+    @param depot: depot, its nearest hotels are candidates of boundaries between days without companies
+    @return: list of arrays of hotel ids
+    """
+    boundaries = list()
+
+    for evening, morning in zip(route.routes[:-1], route.routes[1:]):
+        ids = list()
+        if evening.length > 2:
+            ids.append(candidates[evening.route[-2].id])
+        if morning.length > 2:
+            ids.append(candidates[morning.route[1].id])
+        if not ids:
+            ids.append(candidates[depot.id])
+        boundaries.append(np.unique(np.concatenate(ids)))
+
+    return boundaries
+
+
+def assign_hotels(route: routes.Route, candidates: np.ndarray, depot: vertices.Vertex) -> bool:
+    """
+    Chooses the hotel of every boundary between days so the total distance of the route is minimal and every day
+    keeps distance limit. One hotel ends a day and starts the next one, days are chained by the hotels, so
+    the choice is made by dynamic programming (Viterbi) over boundaries. Only candidate hotels are considered.
+
+    @param route: route whose days start and end at the depot or hotels, it is changed only if assignment exists
+    @param candidates: array of shape (n, k) with ids of k nearest hotels of every vertex
+    @param depot: depot where the first day starts and the last day ends
+    @return: False if no assignment keeps distance limits
+    """
+    if route.days < 2:
+        return True
+
+    matrix = route.distances.distances
+    boundaries = get_boundary_candidates(route, candidates, depot)
+    depot_ids = np.array([depot.id], dtype=boundaries[0].dtype)
+    starts = [depot_ids] + boundaries
+    ends = boundaries + [depot_ids]
+
+    # best[j] is the minimal distance of days so far ending at j-th candidate of the last boundary
+    best = np.zeros(1)
+    back = list()
+    day_costs = list()
+    for route_part, day_starts, day_ends in zip(route.routes, starts, ends):
+        costs = _get_day_costs(matrix, route_part, day_starts, day_ends)
+        costs = np.where(costs <= route.max_distance, costs, np.inf)
+        totals = best[:, np.newaxis] + costs
+        back.append(totals.argmin(axis=0))
+        best = totals.min(axis=0)
+        day_costs.append(costs)
+
+    if not np.isfinite(best[0]):
+        return False
+
+    # walk back from the depot at the end of the last day
+    end = 0
+    chosen = list()
+    for day in range(route.days - 1, -1, -1):
+        start = int(back[day][end])
+        chosen.append((int(starts[day][start]), int(ends[day][end]), float(day_costs[day][start, end])))
+        end = start
+    chosen.reverse()
+
+    for route_part, (start, end, distance) in zip(route.routes, chosen):
+        stops = [route.vertices_ids[start]] + route_part.route[1:-1] + [route.vertices_ids[end]]
+        route.change_route_part(route_part, stops, distance)
+
+    return True
@@ -0,0 +1,211 @@
+import logging
+import math
+import multiprocessing
+import queue
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from genetic import breeding, encoding, route_optimizer, routes
+from genetic.distances import DistanceMatrix
+
+logger = logging.getLogger('data')
+
+MIGRATE = 'migrate'
+STOP = 'stop'
+
+
+class IslandException(Exception):
+    pass
+
+
+def get_island_seed(seed: int, island: int) -> int:
+    return int(np.random.SeedSequence([seed, island]).generate_state(1)[0])
+
+
+class Island:
+    """
+    One population of the island model, it is kept by a worker process or by an actor.
+    """
+
+    def __init__(self, island: int, options: dict, distances: DistanceMatrix) -> None:
+        random.seed(get_island_seed(options['seed'], island))
+
+        self.optimizer = route_optimizer.RouteOptimizer(
+            options['business_trip_id'], options['data'], options['max_distance'], options['days'],
+            distance_matrix=distances, observer_class=route_optimizer.SilentRouteObserver, **options['options'])
+        self.company_ids = [company.id for company in self.optimizer.companies]
+        self.migrants = options['migrants']
+        self.breeder = breeding.SerialBreeder()
+        self.generation = 0
+
+        self.optimizer.generate_random_routes()
+
+    def evolve(self, generations: int) -> Tuple[encoding.GenerationBlock, bool]:
+        """
+        Breeds given number of generations, stops earlier if population converges.
+
+        @param generations: number of generations
+        @return: the best routes to migrate and whether population converged
+        """
+        converged = False
+        for i in range(generations):
+            self.generation += 1
+            converged = self.optimizer.step(self.breeder, self.generation)
+            if converged:
+                break
+
+        return encoding.encode_generation(self.optimizer.population.current[:self.migrants]), converged
+
+    def immigrate(self, immigrants: encoding.GenerationBlock) -> None:
+        self.optimizer.immigrate(encoding.decode_generation(immigrants, self.optimizer.vertex_ids,
+                                                            self.optimizer.distances, self.company_ids))
+
+    def get_best_route(self) -> encoding.CompactRoute:
+        return encoding.encode_route(self.optimizer.get_best_route())
+
+
+def _run_island(island: int, options: dict, shared_matrix: Dict[str, breeding.SharedArray],
+                inbox: multiprocessing.Queue, outbox: multiprocessing.Queue) -> None:
+    """
+    Optimizes one population in a worker process. After every migration interval the best routes are sent
+    to the coordinator, which answers with immigrants from the previous island of the ring or with a stop.
+    """
+    population = Island(island, options, breeding.attach_distance_matrix(shared_matrix))
+
+    while True:
+        migrants, converged = population.evolve(options['migration_interval'])
+        outbox.put((island, migrants, converged))
+
+        command, immigrants = inbox.get()
+        if command == STOP:
+            break
+
+        population.immigrate(immigrants)
+
+    outbox.put((island, population.get_best_route(), True))
+
+
+class IslandModel:
+    """
+    Optimizes several independent populations (islands) in separate worker processes. Every migration_interval
+    generations the best routes of each island migrate to the next island of the ring, where they replace
+    the least profitable routes. Routes are sent between processes in their compact encoding and the distance
+    matrix is shared by all islands.
+
+    It has the same interface as RouteOptimizer: generate_random_routes starts islands, run coordinates
+    migrations until all islands converge or the number of iterations is reached and get_best_route gives
+    the best route of all islands.
+    """
+
+    def __init__(self, business_trip_id: int, data: dict, max_distance: int, days: int, islands: int = None,
+                 migration_interval: int = 10, migrants: int = 2, seed: int = None, distance_provider=None,
+                 **options) -> None:
+        self.islands = islands or multiprocessing.cpu_count()
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.options = dict(business_trip_id=business_trip_id, data=data, max_distance=max_distance, days=days,
+                            options=options, seed=self.seed, migration_interval=migration_interval,
+                            migrants=migrants)
+        # distances are counted and progress is reported only by the coordinator
+        self.optimizer = route_optimizer.RouteOptimizer(business_trip_id, data, max_distance, days,
+                                                        distance_provider=distance_provider, **options)
+        self.company_ids = [company.id for company in self.optimizer.companies]
+        self.best_route = None
+        self.processes: List[multiprocessing.Process] = list()
+        self.inboxes: List[multiprocessing.Queue] = list()
+        self.outbox = None
+
+    def generate_random_routes(self) -> None:
+        logger.info('Starting %d islands for route' % self.islands)
+        shared_matrix = breeding.share_distance_matrix(self.optimizer.distances)
+        self.outbox = multiprocessing.Queue()
+        self.inboxes = [multiprocessing.Queue() for i in range(self.islands)]
+        self.processes = [multiprocessing.Process(target=_run_island,
+                                                  args=(island, self.options, shared_matrix, self.inboxes[island],
+                                                        self.outbox),
+                                                  daemon=True)
+                          for island in range(self.islands)]
+
+        for process in self.processes:
+            process.start()
+
+        self.optimizer.observer.increment(
+            self.optimizer.population_size * self.optimizer.complexity_vector["generating_routes"])
+
+    def __receive(self) -> list:
+        messages = [None] * self.islands
+        received = 0
+
+        while received < self.islands:
+            try:
+                island, message, converged = self.outbox.get(timeout=1)
+            except queue.Empty:
+                if any(process.exitcode for process in self.processes):
+                    self.terminate()
+                    raise IslandException('Island process exited unexpectedly')
+                continue
+
+            messages[island] = (message, converged)
+            received += 1
+
+        return messages
+
+    def run(self) -> None:
+        epochs = math.ceil(self.optimizer.iterations / self.migration_interval)
+
+        try:
+            for epoch in range(1, epochs + 1):
+                messages = self.__receive()
+                self.optimizer.observer.increment(
+                    self.migration_interval * self.optimizer.complexity_vector["iterations"])
+
+                self.publish_best_migrant(messages)
+
+                if epoch == epochs or all(converged for message, converged in messages) or \
+                        self.optimizer.is_out_of_time():
+                    break
+
+                for island, inbox in enumerate(self.inboxes):
+                    inbox.put((MIGRATE, messages[island - 1][0]))
+
+            for inbox in self.inboxes:
+                inbox.put((STOP, None))
+
+            best_routes = [encoding.decode_route(message, self.optimizer.vertex_ids, self.optimizer.distances,
+                                                 self.company_ids)
+                           for message, converged in self.__receive()]
+        finally:
+            self.terminate()
+
+        self.best_route = max(best_routes, key=lambda x: x.profit)
+
+    def publish_best_migrant(self, messages: list) -> None:
+        """
+        Publishes the best of routes migrating after an interval if it improves the best route found so far.
+
+        @param messages: list of migrants and convergence flag of each island
+        """
+        best = max((migrants.get_route(0) for migrants, converged in messages if len(migrants)),
+                   key=lambda x: x.profit, default=None)
+        if best is not None:
+            self.optimizer.publish_best_route(encoding.decode_route(best, self.optimizer.vertex_ids,
+                                                                    self.optimizer.distances, self.company_ids))
+
+    def __enter__(self) -> 'IslandModel':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.terminate()
+
+    def terminate(self) -> None:
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.optimizer.close()
+
+    def get_best_route(self) -> routes.Route:
+        return self.best_route
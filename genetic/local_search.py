@@ -0,0 +1,217 @@
+import time
+from typing import Iterable, List
+
+import numpy as np
+
+from genetic import routes, vertices
+
+# Changes improving distance by less than epsilon are not applied, so rounding errors cannot cause endless loops
+EPSILON = 1e-9
+
+
+def _get_deadline(time_cap: float = None) -> float:
+    return time.monotonic() + time_cap if time_cap is not None else None
+
+
+def _is_out_of_time(deadline: float = None) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def two_opt(route: routes.Route, route_part: routes.RoutePart, deadline: float = None) -> bool:
+    """
+    Reverses segments of companies of given route part while it shortens it. The first and the last stop
+    are never moved. Deltas are counted from cumulative distances in both directions of the route part,
+    so distance matrix does not have to be symmetric.
+
+    @param route: route which route part belongs to
+    @param route_part: route part to be shortened
+    @param deadline: value of time.monotonic after which no more moves are tried (default: None)
+    @return: True if route part has been changed
+    """
+    matrix = route.distances.distances
+    changed = False
+    improved = True
+
+    while improved and not _is_out_of_time(deadline):
+        improved = False
+        stops = route_part.route
+        ids = [vertex.id for vertex in stops]
+        cumulative = route_part.cumulative
+        # reversed_cumulative[k] - reversed_cumulative[i] is the distance of stops k, k - 1, ..., i
+        reversed_cumulative = [0]
+        for k in range(1, len(ids)):
+            reversed_cumulative.append(reversed_cumulative[-1] + matrix[ids[k], ids[k - 1]])
+
+        for i in range(1, len(ids) - 2):
+            for j in range(i + 1, len(ids) - 1):
+                delta = matrix[ids[i - 1], ids[j]] + matrix[ids[i], ids[j + 1]] + \
+                    reversed_cumulative[j] - reversed_cumulative[i] - (cumulative[j + 1] - cumulative[i - 1])
+
+                if delta < -EPSILON:
+                    new_stops = stops[:i] + stops[i:j + 1][::-1] + stops[j + 1:]
+                    route.change_route_part(route_part, new_stops, route_part.distance + delta)
+                    changed = improved = True
+                    break
+            if improved:
+                break
+
+    return changed
+
+
+def _get_insertion_delta(matrix: np.ndarray, stops: List[vertices.Vertex], index: int,
+                          segment: List[vertices.Vertex], segment_distance: float) -> float:
+    return matrix[stops[index - 1].id, segment[0].id] + segment_distance + \
+        matrix[segment[-1].id, stops[index].id] - matrix[stops[index - 1].id, stops[index].id]
+
+
+def or_opt(route: routes.Route, max_segment: int = 3, deadline: float = None) -> bool:
+    """
+    Relocates segments of up to max_segment consecutive companies to the cheapest position in another day
+    while it shortens the route and both days keep their distance limit.
+
+    @param route: route to be shortened
+    @param max_segment: maximal number of relocated companies (default: 3)
+    @param deadline: value of time.monotonic after which no more moves are tried (default: None)
+    @return: True if route has been changed
+    """
+    matrix = route.distances.distances
+    changed = False
+    improved = True
+
+    while improved and not _is_out_of_time(deadline):
+        improved = False
+
+        for source in route.routes:
+            for length in range(1, max_segment + 1):
+                for i in range(1, source.length - length):
+                    j = i + length - 1
+                    stops = source.route
+                    segment = stops[i:j + 1]
+                    segment_distance = source.get_segment_distance(i, j)
+                    removal_delta = matrix[stops[i - 1].id, stops[j + 1].id] - \
+                        source.get_segment_distance(i - 1, j + 1)
+
+                    best = None
+                    for target in route.routes:
+                        if target is source:
+                            continue
+
+                        for index in range(1, target.length):
+                            insertion_delta = _get_insertion_delta(matrix, target.route, index, segment,
+                                                                   segment_distance)
+                            if target.distance + insertion_delta > route.max_distance:
+                                continue
+                            if removal_delta + insertion_delta < -EPSILON and \
+                                    (best is None or insertion_delta < best[2]):
+                                best = (target, index, insertion_delta)
+
+                    if best is not None:
+                        target, index, insertion_delta = best
+                        route.change_route_part(source, stops[:i] + stops[j + 1:], source.distance + removal_delta)
+                        route.change_route_part(target, target.route[:index] + segment + target.route[index:],
+                                                target.distance + insertion_delta)
+                        changed = improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+
+    return changed
+
+
+def greedy_insertion(route: routes.Route, deadline: float = None, route_parts: List[routes.RoutePart] = None,
+                     candidates: Iterable[int] = None) -> bool:
+    """
+    Inserts available companies into the route while any of them fits into distance limit of a day.
+    Each time the company with the highest ratio of profit and insertion distance is inserted at its cheapest
+    position. Insertion distances of all available companies into a day are counted at once.
+
+    @param route: route to be extended
+    @param deadline: value of time.monotonic after which no more companies are inserted (default: None)
+    @param route_parts: route parts to insert companies into (default: all route parts)
+    @param candidates: ids of companies which may be inserted (default: all available companies)
+    @return: True if any company has been inserted
+    """
+    matrix = route.distances.distances
+    route_parts = route.routes if route_parts is None else route_parts
+    candidates = None if candidates is None else list(candidates)
+    changed = False
+
+    while route.available_vertices and not _is_out_of_time(deadline):
+        if candidates is None:
+            ids = np.fromiter(route.available_vertices, dtype=np.int32)
+        else:
+            ids = np.array([id for id in candidates if id in route.available_vertices], dtype=np.int32)
+        if not len(ids):
+            break
+
+        profits = np.array([route.vertices_ids[int(id)].profit for id in ids], dtype=np.float64)
+        best = None
+
+        for route_part in route_parts:
+            if route_part.length < 2:
+                continue
+
+            stops = np.array([vertex.id for vertex in route_part.route], dtype=np.int32)
+            # costs[p, c] is the distance added by inserting candidate c before stop p + 1
+            costs = matrix[np.ix_(stops[:-1], ids)] + matrix[np.ix_(ids, stops[1:])].T - \
+                matrix[stops[:-1], stops[1:]][:, np.newaxis]
+            positions = costs.argmin(axis=0)
+            cheapest = costs[positions, np.arange(len(ids))]
+            feasible = route_part.distance + cheapest <= route.max_distance
+            if not feasible.any():
+                continue
+
+            ratios = np.where(feasible, profits / np.maximum(cheapest, EPSILON), -np.inf)
+            c = int(ratios.argmax())
+            if best is None or ratios[c] > best[0]:
+                best = (ratios[c], route_part, int(positions[c]) + 1, int(ids[c]))
+
+        if best is None:
+            break
+
+        ratio, route_part, index, id = best
+        if not route.add_stop(route_part, index, route.vertices_ids[id]):
+            break
+        changed = True
+
+    return changed
+
+
+def improve(route: routes.Route, deadline: float = None) -> bool:
+    """
+    Shortens days of the route by 2-opt and or-opt and fills the saved distance by greedy insertion.
+
+    @param route: route to be improved
+    @param deadline: value of time.monotonic after which improving stops (default: None)
+    @return: True if route has been changed
+    """
+    changed = False
+    for route_part in route.routes:
+        changed |= two_opt(route, route_part, deadline)
+    if route.days > 1:
+        changed |= or_opt(route, deadline=deadline)
+    if route.vertices_ids is not None:
+        changed |= greedy_insertion(route, deadline)
+
+    return changed
+
+
+def improve_population(population: List[routes.Route], time_cap: float = None) -> int:
+    """
+    Improves given routes one after another until time cap is exceeded.
+
+    @param population: list of routes, e.g. elite of generation
+    @param time_cap: time in seconds after which no more routes are improved (default: None)
+    @return: number of changed routes
+    """
+    deadline = _get_deadline(time_cap)
+    changed = 0
+
+    for route in population:
+        if _is_out_of_time(deadline):
+            break
+        changed += improve(route, deadline)
+
+    return changed
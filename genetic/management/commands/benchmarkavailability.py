@@ -0,0 +1,55 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from genetic.availability import AvailableVertices
+
+
+class Command(BaseCommand):
+    help = 'Compares available vertices of a route with the set they have replaced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--available', nargs='+', type=int, default=[50, 500],
+                            help='Numbers of available vertices out of each size')
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+
+    @staticmethod
+    def __choose_from_set(available_vertices, rng):
+        # The way a random company was chosen before AvailableVertices
+        available_list = list(available_vertices)
+        return available_list[int(round(rng.random() * (len(available_list) - 1)))]
+
+    def __measure(self, size, ids, repeat, rng):
+        def fill_set():
+            available_vertices = set(ids)
+            while available_vertices:
+                available_vertices.discard(self.__choose_from_set(available_vertices, rng))
+
+        def fill_available_vertices():
+            available_vertices = AvailableVertices(size, ids)
+            while available_vertices:
+                available_vertices.discard(available_vertices.choice(rng))
+
+        return dict(
+            create=(timeit.timeit(lambda: set(ids), number=repeat) / repeat,
+                    timeit.timeit(lambda: AvailableVertices(size, ids), number=repeat) / repeat),
+            empty=(timeit.timeit(fill_set, number=repeat) / repeat,
+                   timeit.timeit(fill_available_vertices, number=repeat) / repeat),
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        self.stdout.write('%8s %10s %10s %14s %14s %10s' % ('size', 'available', 'operation', 'set [ms]',
+                                                           'available [ms]', 'speedup'))
+        for size in options['sizes']:
+            for available in options['available']:
+                ids = rng.sample(range(size), min(available, size))
+                for operation, (set_time, available_time) in self.__measure(size, ids, options['repeat'],
+                                                                            rng).items():
+                    self.stdout.write('%8d %10d %10s %14.4f %14.4f %10.1f' % (
+                        size, len(ids), operation, set_time * 1000, available_time * 1000,
+                        set_time / available_time))
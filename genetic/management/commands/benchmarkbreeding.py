@@ -0,0 +1,63 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from genetic import breeding, encoding, route_optimizer, vertices
+
+
+class Command(BaseCommand):
+    help = 'Compares throughput of breeding couples of routes for different numbers of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=1000)
+        parser.add_argument('--hotels', type=int, default=100)
+        parser.add_argument('--days', type=int, default=5)
+        parser.add_argument('--max-distance', type=int, default=400)
+        parser.add_argument('--population-size', type=int, default=200)
+        parser.add_argument('--generations', type=int, default=5)
+        parser.add_argument('--workers', nargs='+', type=int, default=[0, 1, 2, 4, 8])
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+
+        def get_coords():
+            return random.uniform(49.0, 54.8), random.uniform(14.1, 24.1)
+
+        data = dict(depot=vertices.Depot('0', get_coords()),
+                    companies=[vertices.Company(str(i), get_coords(), random.randint(10, 200))
+                               for i in range(options['companies'])],
+                    hotels=[vertices.Hotel(str(i), get_coords()) for i in range(options['hotels'])])
+        ro = route_optimizer.RouteOptimizer(0, data, options['max_distance'], options['days'],
+                                            population_size=options['population_size'])
+        ro.generate_random_routes()
+        initial = encoding.encode_generation(ro.population.current)
+        company_ids = [company.id for company in ro.companies]
+
+        self.stdout.write('%8s %12s %12s %14s %10s' % ('workers', 'startup [s]', 'breed [s]', 'couples / s',
+                                                       'speedup'))
+        serial_time = None
+
+        for workers in options['workers']:
+            population = encoding.decode_generation(initial, ro.vertex_ids, ro.distances, company_ids)
+            couples = 0
+
+            start = time.perf_counter()
+            with breeding.get_breeder(ro.distances, ro.vertex_ids, company_ids, workers,
+                                      options['seed']) as breeder:
+                startup_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for generation in range(1, options['generations'] + 1):
+                    packed = [[[population[i], population[i + 1]], ro.crossover_probability, ro.mutation_probability]
+                              for i in range(0, len(population) - 1, 2)]
+                    population = breeder.breed(packed, generation)
+                    couples += len(packed)
+                breed_time = time.perf_counter() - start
+
+            if serial_time is None:
+                serial_time = breed_time
+
+            self.stdout.write('%8d %12.4f %12.4f %14.1f %9.2fx' % (
+                workers, startup_time, breed_time, couples / breed_time, serial_time / breed_time))
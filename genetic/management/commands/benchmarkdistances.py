@@ -0,0 +1,50 @@
+import random
+import time
+
+import mpu
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from genetic import distances, vertices
+
+
+def count_distances_in_loop(all_vertices):
+    length = len(all_vertices)
+    distances_array = np.zeros((length, length), dtype=np.float64)
+
+    for i, vertex in enumerate(all_vertices):
+        for j, another_vertex in enumerate(all_vertices):
+            distances_array[i, j] = mpu.haversine_distance(vertex.get_coords(), another_vertex.get_coords())
+
+    return distances_array
+
+
+class Command(BaseCommand):
+    help = 'Compares time of counting distance matrix in pure Python loop and in vectorized NumPy pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[50, 100, 250, 500, 1000])
+        parser.add_argument('--loop-limit', type=int, default=1000,
+                            help='Skips the pure Python loop for bigger number of vertices')
+
+    def handle(self, *args, **options):
+        self.stdout.write('%8s %12s %12s %10s %14s' % ('N', 'loop [s]', 'numpy [s]', 'speedup', 'max abs diff'))
+
+        for size in options['sizes']:
+            all_vertices = [vertices.Company(str(i), (random.uniform(49.0, 54.8), random.uniform(14.1, 24.1)),
+                                             random.randint(10, 200)) for i in range(size)]
+
+            start = time.perf_counter()
+            vectorized = distances.count_distances(all_vertices)[0]
+            vectorized_time = time.perf_counter() - start
+
+            if size > options['loop_limit']:
+                self.stdout.write('%8d %12s %12.4f %10s %14s' % (size, '-', vectorized_time, '-', '-'))
+                continue
+
+            start = time.perf_counter()
+            looped = count_distances_in_loop(all_vertices)
+            loop_time = time.perf_counter() - start
+
+            self.stdout.write('%8d %12.4f %12.4f %9.1fx %14.2e' % (
+                size, loop_time, vectorized_time, loop_time / vectorized_time, np.abs(looped - vectorized).max()))
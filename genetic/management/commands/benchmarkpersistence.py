@@ -0,0 +1,108 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from data import models
+from genetic import distances, routes, tasks, vertices
+
+
+def save_route_in_loop(route, business_trip):
+    for day, route_part in enumerate(route.routes):
+        for index in range(1, route_part.length):
+            start_point_vertex = route_part.route[index - 1]
+            start_point = start_point_vertex.model.objects.get(pk=int(start_point_vertex.name))
+            end_point_vertex = route_part.route[index]
+            end_point = end_point_vertex.model.objects.get(pk=int(end_point_vertex.name))
+
+            models.Route.objects.create(start_point=start_point,
+                                        end_point=end_point,
+                                        distance=route.distances[end_point_vertex.id, start_point_vertex.id],
+                                        day=day,
+                                        segment_order=index - 1,
+                                        route_version=business_trip.route_version,
+                                        business_trip=business_trip,
+                                        route_type=tasks.get_route_type(day, route.days, start_point_vertex,
+                                                                        end_point_vertex))
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compares time of saving an optimized route segment by segment and with a single bulk insert. ' \
+           'All created rows are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=5)
+        parser.add_argument('--stops', nargs='+', type=int, default=[10, 30, 60, 120],
+                            help='Numbers of companies of the route')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def __get_coords(self):
+        return random.uniform(49.0, 54.8), random.uniform(14.1, 24.1)
+
+    def __create_place(self, model, i):
+        lat, lng = self.__get_coords()
+        return model.objects.create(name='Benchmark %d' % i, nip=str(90000000000 + i), house_no='1',
+                                    postcode='00-000', city='Benchmark', voivodeship='benchmark',
+                                    latitude=lat, longitude=lng)
+
+    def __prepare(self, days, stops):
+        department = self.__create_place(models.Department, 0)
+        business_trip = models.BusinessTrip.objects.create(
+            start_date=datetime.datetime.now(), finish_date=datetime.datetime.now() + datetime.timedelta(days=days - 1),
+            distance_constraint=100000, department=department)
+
+        depot = vertices.Depot(str(department.pk), (department.latitude, department.longitude))
+        companies = [vertices.Company(str(company.pk), (company.latitude, company.longitude), 10)
+                     for company in [self.__create_place(models.Company, i + 1) for i in range(stops)]]
+        hotels = [vertices.Hotel(str(hotel.pk), (hotel.latitude, hotel.longitude))
+                  for hotel in [self.__create_place(models.Hotel, stops + i + 1) for i in range(days - 1)]]
+
+        all_vertices = [depot] + companies + hotels
+        for i, vertex in enumerate(all_vertices):
+            vertex.id = i
+
+        route = routes.Route(days, 1e9, distances.DistanceMatrix.from_vertices(all_vertices))
+        route.available_vertices = set()
+        ends = [depot] + hotels + [depot]
+        for day, day_companies in enumerate([companies[day::days] for day in range(days)]):
+            route.add_route_part(routes.RoutePart([ends[day]] + day_companies + [ends[day + 1]]))
+
+        return route, business_trip
+
+    def __measure(self, save, days, stops, repeat):
+        times = list()
+        queries = 0
+
+        for _ in range(repeat):
+            try:
+                with transaction.atomic():
+                    route, business_trip = self.__prepare(days, stops)
+                    with CaptureQueriesContext(connection) as context:
+                        start = time.perf_counter()
+                        save(route, business_trip)
+                        times.append(time.perf_counter() - start)
+                    queries = len(context.captured_queries)
+                    raise Rollback()
+            except Rollback:
+                pass
+
+        return min(times), queries
+
+    def handle(self, *args, **options):
+        self.stdout.write('%8s %10s %12s %10s %12s %10s %10s' % ('stops', 'segments', 'loop [s]', 'queries',
+                                                                'bulk [s]', 'queries', 'speedup'))
+
+        for stops in options['stops']:
+            loop_time, loop_queries = self.__measure(save_route_in_loop, options['days'], stops, options['repeat'])
+            bulk_time, bulk_queries = self.__measure(tasks.save_route, options['days'], stops, options['repeat'])
+
+            self.stdout.write('%8d %10d %12.4f %10d %12.4f %10d %9.1fx' % (
+                stops, stops + options['days'], loop_time, loop_queries, bulk_time, bulk_queries,
+                loop_time / bulk_time))
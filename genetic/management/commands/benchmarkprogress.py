@@ -0,0 +1,83 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from genetic import publishers, route_optimizer, vertices
+
+
+class SynchronousPublisher:
+    """
+    Sends every message in the publishing thread, like the observer did before the progress publisher.
+    """
+
+    def __init__(self, send) -> None:
+        self.send = send
+        self.published = 0
+        self.sent = 0
+        self.publish_time = 0.0
+
+    def publish(self, message_type: str, message) -> None:
+        start = time.perf_counter()
+        self.send(0, message_type, message)
+        self.published += 1
+        self.sent += 1
+        self.publish_time += time.perf_counter() - start
+
+    def close(self) -> None:
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Compares time spent by route optimization on publishing progress synchronously and by the progress ' \
+           'publisher thread. Sending is simulated by sleeping for given latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=100)
+        parser.add_argument('--hotels', type=int, default=20)
+        parser.add_argument('--days', type=int, default=3)
+        parser.add_argument('--max-distance', type=int, default=400)
+        parser.add_argument('--population-size', type=int, default=60)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--latency', type=float, default=0.002, help='Time of one send in seconds')
+        parser.add_argument('--interval', type=float, default=0.5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def __run(self, data, publisher, options):
+        random.seed(options['seed'])
+
+        def observer_class(business_trip_id, total):
+            return route_optimizer.RouteObserver(business_trip_id, total, publisher=publisher)
+
+        ro = route_optimizer.RouteOptimizer(0, data, options['max_distance'], options['days'],
+                                            population_size=options['population_size'],
+                                            iterations=options['iterations'], observer_class=observer_class,
+                                            publish_interval=0)
+
+        start = time.perf_counter()
+        ro.generate_random_routes()
+        ro.run()
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+
+        def get_coords():
+            return random.uniform(49.0, 54.8), random.uniform(14.1, 24.1)
+
+        def send(business_trip_id, message_type, message):
+            time.sleep(options['latency'])
+
+        depot = vertices.Depot('0', get_coords())
+        companies = [vertices.Company(str(i), get_coords(), random.randint(10, 200))
+                     for i in range(options['companies'])]
+        hotels = [vertices.Hotel(str(i), get_coords()) for i in range(options['hotels'])]
+
+        self.stdout.write('%12s %10s %12s %10s %8s' % ('publisher', 'run [s]', 'publish [s]', 'published', 'sent'))
+        for name, publisher in (('synchronous', SynchronousPublisher(send)),
+                                ('thread', publishers.ProgressPublisher(0, interval=options['interval'],
+                                                                        send=send))):
+            data = dict(depot=depot, companies=list(companies), hotels=list(hotels))
+            elapsed = self.__run(data, publisher, options)
+            self.stdout.write('%12s %10.4f %12.4f %10d %8d' % (name, elapsed, publisher.publish_time,
+                                                              publisher.published, publisher.sent))
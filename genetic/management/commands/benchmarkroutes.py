@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from genetic import distances, vertices
+from genetic.routes import RoutePart
+
+
+def count_segment_distance_in_loop(route_part, distance_matrix, start_index, stop_index):
+    route = route_part.route
+    return sum(distance_matrix.distances[route[i].id, route[i + 1].id] for i in range(start_index, stop_index))
+
+
+class Command(BaseCommand):
+    help = 'Compares changes of stops followed by a segment distance with and without cumulative distances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lengths', nargs='+', type=int, default=[10, 25, 50, 100, 250])
+        parser.add_argument('--operations', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def __run(self, route_part, distance_matrix, all_vertices, segment_distance, options):
+        rng = random.Random(options['seed'])
+
+        start = time.perf_counter()
+        for _ in range(options['operations']):
+            # Insert and remove a stop, so the length of the route part stays the same
+            index = rng.randint(1, route_part.length - 1)
+            route_part.add_stop(index, rng.choice(all_vertices))
+            start_index = rng.randint(0, route_part.length - 2)
+            segment_distance(route_part, distance_matrix, start_index, rng.randint(start_index + 1,
+                                                                                  route_part.length - 1))
+            route_part.remove_stop(rng.randint(1, route_part.length - 2))
+
+        return (time.perf_counter() - start) / options['operations']
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        all_vertices = [vertices.Company(str(i), (random.uniform(49.0, 54.8), random.uniform(14.1, 24.1)),
+                                         random.randint(10, 200)) for i in range(max(options['lengths']) * 2)]
+        for i, vertex in enumerate(all_vertices):
+            vertex.id = i
+        distance_matrix = distances.DistanceMatrix.from_vertices(all_vertices)
+
+        self.stdout.write('%8s %14s %18s %10s' % ('length', 'loop [us]', 'cumulative [us]', 'speedup'))
+        for length in options['lengths']:
+            stops = random.sample(all_vertices, length)
+
+            # Distances are not counted, so cumulative distances are not kept, as before they were added
+            looped = self.__run(RoutePart(list(stops)), distance_matrix, all_vertices,
+                                count_segment_distance_in_loop, options)
+
+            route_part = RoutePart(list(stops))
+            route_part.recount_route(distance_matrix)
+            cumulative = self.__run(route_part, distance_matrix, all_vertices,
+                                    lambda route_part, distance_matrix, start_index, stop_index:
+                                    route_part.get_segment_distance(start_index, stop_index), options)
+
+            self.stdout.write('%8d %14.2f %18.2f %9.1fx' % (length, looped * 1e6, cumulative * 1e6,
+                                                             looped / cumulative))
@@ -0,0 +1,70 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from genetic import breeding, route_optimizer, vertices
+
+
+class Command(BaseCommand):
+    help = 'Compares time to reach a target profit for different shares of greedily seeded initial population'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=300)
+        parser.add_argument('--hotels', type=int, default=50)
+        parser.add_argument('--days', type=int, default=3)
+        parser.add_argument('--max-distance', type=int, default=400)
+        parser.add_argument('--population-size', type=int, default=60)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--seeding-rates', nargs='+', type=float, default=[0, 0.1, 0.2, 0.5])
+        parser.add_argument('--target', type=float, default=0.95,
+                            help='Target profit as a share of the best profit found by any seeding rate')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def __run(self, data, seeding_rate, options):
+        random.seed(options['seed'])
+        ro = route_optimizer.RouteOptimizer(0, data, options['max_distance'], options['days'],
+                                            population_size=options['population_size'],
+                                            iterations=options['iterations'], seeding_rate=seeding_rate,
+                                            observer_class=route_optimizer.SilentRouteObserver)
+
+        start = time.perf_counter()
+        ro.generate_random_routes()
+        generating_time = time.perf_counter() - start
+        history = [(generating_time, ro.get_best_route().profit)]
+
+        breeder = breeding.SerialBreeder()
+        for i in range(1, options['iterations'] + 1):
+            converged = ro.step(breeder, i)
+            history.append((time.perf_counter() - start, ro.get_best_route().profit))
+            if converged:
+                break
+
+        return generating_time, history
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+
+        def get_coords():
+            return random.uniform(49.0, 54.8), random.uniform(14.1, 24.1)
+
+        depot = vertices.Depot('0', get_coords())
+        companies = [vertices.Company(str(i), get_coords(), random.randint(10, 200))
+                     for i in range(options['companies'])]
+        hotels = [vertices.Hotel(str(i), get_coords()) for i in range(options['hotels'])]
+
+        results = dict()
+        for seeding_rate in options['seeding_rates']:
+            data = dict(depot=depot, companies=list(companies), hotels=list(hotels))
+            results[seeding_rate] = self.__run(data, seeding_rate, options)
+
+        target = options['target'] * max(history[-1][1] for generating_time, history in results.values())
+
+        self.stdout.write('Target profit: %.1f' % target)
+        self.stdout.write('%8s %14s %14s %12s %18s' % ('seeding', 'generate [s]', 'initial best', 'final best',
+                                                      'time to target [s]'))
+        for seeding_rate, (generating_time, history) in results.items():
+            time_to_target = next((elapsed for elapsed, profit in history if profit >= target), None)
+            self.stdout.write('%8.2f %14.4f %14.1f %12.1f %18s' % (
+                seeding_rate, generating_time, history[0][1], history[-1][1],
+                '%.4f' % time_to_target if time_to_target is not None else '-'))
@@ -0,0 +1,69 @@
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import async_to_sync
+from channels import layers
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from data import utils
+from genetic import routing
+
+
+class Command(BaseCommand):
+    help = 'Connects growing numbers of websocket subscribers of one business trip to route consumers in this ' \
+           'process and measures connect time and fan-out time of broadcasts through the in-memory channel layer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('business_trip', type=int, help='Id of existing business trip')
+        parser.add_argument('--subscribers', nargs='+', type=int, default=[100, 500, 1000, 2000])
+        parser.add_argument('--messages', type=int, default=20, help='Number of broadcasts to each subscriber')
+        parser.add_argument('--timeout', type=float, default=10, help='Time in seconds to wait for each message')
+
+    async def __measure(self, business_trip_id, subscribers, options):
+        application = URLRouter(routing.websocket_urlpatterns)
+        communicators = [WebsocketCommunicator(application, '/ws/business_trip/%d/' % business_trip_id)
+                         for _ in range(subscribers)]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[communicator.connect(options['timeout']) for communicator in communicators])
+        if not all(connected for connected, subprotocol in results):
+            raise ValueError('Business trip %d does not exist' % business_trip_id)
+        # status of business trip is the first message of each subscriber
+        await asyncio.gather(*[communicator.receive_from(options['timeout']) for communicator in communicators])
+        connect_time = time.perf_counter() - start
+
+        channel_layer = layers.get_channel_layer()
+        fan_out_times = list()
+        for i in range(options['messages']):
+            text = utils.render_business_trip_message('PROCESSING', {'value': round(i / options['messages'], 2)})
+
+            start = time.perf_counter()
+            await channel_layer.group_send('business_trip_%d' % business_trip_id, {
+                'type': 'update_business_trip_message',
+                'messageType': 'PROCESSING',
+                'text': text
+            })
+            await asyncio.gather(*[communicator.receive_from(options['timeout']) for communicator in communicators])
+            fan_out_times.append(time.perf_counter() - start)
+
+        await asyncio.gather(*[communicator.disconnect() for communicator in communicators])
+
+        return connect_time, fan_out_times
+
+    def handle(self, *args, **options):
+        in_memory = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+        self.stdout.write('%12s %12s %16s %16s %18s' % ('subscribers', 'connect [s]', 'fan-out avg [s]',
+                                                        'fan-out max [s]', 'messages per [s]'))
+        with override_settings(CHANNEL_LAYERS=in_memory):
+            for subscribers in options['subscribers']:
+                connect_time, fan_out_times = async_to_sync(self.__measure)(options['business_trip'], subscribers,
+                                                                            options)
+                average = statistics.mean(fan_out_times)
+
+                self.stdout.write('%12d %12.4f %16.4f %16.4f %18.0f' % (
+                    subscribers, connect_time, average, max(fan_out_times), subscribers / average))
@@ -0,0 +1,208 @@
+import abc
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from genetic import cache, distances
+from genetic.cache import DistanceCache
+
+logger = logging.getLogger('data')
+
+
+class DistanceProviderException(Exception):
+    pass
+
+
+class DistanceProvider(abc.ABC):
+    """
+    Source of distances between vertices used by RouteOptimizer. If a cache is given, only distances missing
+    in the cache are counted, so repeated optimizations of the same vertices cost nothing.
+    """
+
+    def __init__(self, distance_cache: DistanceCache = None) -> None:
+        self.cache = distance_cache
+
+    @abc.abstractmethod
+    def count_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """
+        Counts distances in kilometres from every origin to every destination.
+
+        @param origins: array of shape (n, 2) with latitudes and longitudes in degrees
+        @param destinations: array of shape (m, 2) with latitudes and longitudes in degrees
+        @return: array of shape (n, m) with distances
+        """
+
+    def get_distances(self, coords: np.ndarray) -> np.ndarray:
+        """
+        Gets the distance matrix between given vertices, from the cache if possible.
+
+        @param coords: array of shape (n, 2) with latitudes and longitudes in degrees
+        @return: array of shape (n, n) with distances in kilometres
+        """
+        if self.cache is None:
+            return self.count_distances(coords, coords)
+
+        return self.cache.get_distances(coords, self.count_distances)
+
+
+class HaversineDistanceProvider(DistanceProvider):
+    """
+    Straight-line distances on the sphere.
+    """
+
+    def count_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        return distances.count_haversine_distances(origins, destinations)
+
+
+class OSRMDistanceProvider(DistanceProvider):
+    """
+    Road distances and travel times fetched from the /table service of an OSRM compatible server.
+    Matrices are split into tiles of at most max_table_size // 2 sources and as many destinations, so that no
+    request has more coordinates than the server accepts (its --max-table-size, 100 by default). Tiles are
+    requested in parallel over a pooled HTTP session. Only answers of the server are cached, pairs it has not found
+    a route for are cached as np.inf. Distances of such pairs (or all of them if the server does not respond) are
+    counted by the fallback provider after reading the cache, so they never get into it. Travel times are
+    counted from fallback distances at fallback_speed.
+    """
+
+    def __init__(self, url: str, distance_cache: DistanceCache = None, durations_cache: DistanceCache = None,
+                 profile: str = 'driving', max_table_size: int = 100, pool_size: int = 4, timeout: float = 30,
+                 fallback: DistanceProvider = None, fallback_speed: float = 60) -> None:
+        super().__init__(distance_cache)
+        self.url = url.rstrip('/')
+        self.durations_cache = durations_cache
+        self.profile = profile
+        # sources and destinations of one request are counted together against the limit of the server
+        self.tile_size = max(max_table_size // 2, 1)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.fallback = fallback or HaversineDistanceProvider()
+        # speed in km/h of travel times of pairs without road distances
+        self.fallback_speed = fallback_speed
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504)))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __get_tiles(self, origins_length: int, destinations_length: int) -> List[Tuple[slice, slice]]:
+        return [(slice(i, i + self.tile_size), slice(j, j + self.tile_size))
+                for i in range(0, origins_length, self.tile_size)
+                for j in range(0, destinations_length, self.tile_size)]
+
+    def __fetch_tile(self, origins: np.ndarray, destinations: np.ndarray, annotation: str) -> np.ndarray:
+        coords = ';'.join('%.6f,%.6f' % (lng, lat) for lat, lng in np.concatenate((origins, destinations)))
+        params = dict(
+            sources=';'.join(str(i) for i in range(len(origins))),
+            destinations=';'.join(str(i) for i in range(len(origins), len(origins) + len(destinations))),
+            annotations=annotation,
+        )
+
+        response = self.session.get('%s/table/v1/%s/%s' % (self.url, self.profile, coords), params=params,
+                                    timeout=self.timeout)
+        response.raise_for_status()
+        result = response.json()
+
+        if result.get('code') != 'Ok':
+            raise DistanceProviderException(result.get('message', result.get('code')))
+
+        # Unreachable pairs are returned as null
+        return np.array([[np.inf if value is None else value for value in row] for row in result[annotation + 's']],
+                        dtype=np.float64).reshape(len(origins), len(destinations))
+
+    def __fetch_table(self, origins: np.ndarray, destinations: np.ndarray, annotation: str) -> np.ndarray:
+        table = np.empty((len(origins), len(destinations)), dtype=np.float64)
+        tiles = self.__get_tiles(len(origins), len(destinations))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+                results = executor.map(
+                    lambda tile: self.__fetch_tile(origins[tile[0]], destinations[tile[1]], annotation), tiles)
+                for tile, result in zip(tiles, results):
+                    table[tile] = result
+        except (requests.RequestException, ValueError, KeyError) as e:
+            raise DistanceProviderException(e) from e
+
+        return table
+
+    def count_distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """
+        Fetches road distances in kilometres from every origin to every destination.
+
+        @param origins: array of shape (n, 2) with latitudes and longitudes in degrees
+        @param destinations: array of shape (m, 2) with latitudes and longitudes in degrees
+        @return: array of shape (n, m) with distances, np.inf for unreachable pairs
+        @raise DistanceProviderException: if the server does not give distances
+        """
+        return self.__fetch_table(origins, destinations, 'distance') / 1000
+
+    def __get_table(self, coords: np.ndarray, distance_cache: DistanceCache, count_function, get_fallback,
+                    annotation: str) -> np.ndarray:
+        try:
+            if distance_cache is None:
+                table = count_function(coords, coords)
+            else:
+                table = distance_cache.get_distances(coords, count_function)
+        except DistanceProviderException as e:
+            logger.warning('Could not fetch %ss from %s, using fallback %ss: %s' % (annotation, self.url,
+                                                                                    annotation, e))
+            return get_fallback(coords)
+
+        unreachable = np.isinf(table)
+        if unreachable.any():
+            logger.warning('%d pairs of vertices are not reachable in %s, using fallback %ss' % (
+                unreachable.sum(), self.url, annotation))
+            table[unreachable] = get_fallback(coords)[unreachable]
+
+        return table
+
+    def get_distances(self, coords: np.ndarray) -> np.ndarray:
+        return self.__get_table(coords, self.cache, self.count_distances, self.fallback.get_distances, 'distance')
+
+    def count_durations(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """
+        Fetches travel times in seconds from every origin to every destination.
+
+        @param origins: array of shape (n, 2) with latitudes and longitudes in degrees
+        @param destinations: array of shape (m, 2) with latitudes and longitudes in degrees
+        @return: array of shape (n, m) with travel times, np.inf for unreachable pairs
+        @raise DistanceProviderException: if the server does not give travel times
+        """
+        return self.__fetch_table(origins, destinations, 'duration')
+
+    def get_durations(self, coords: np.ndarray) -> np.ndarray:
+        """
+        Gets the travel time matrix between given vertices, from the cache if possible.
+
+        @param coords: array of shape (n, 2) with latitudes and longitudes in degrees
+        @return: array of shape (n, n) with travel times in seconds
+        """
+        return self.__get_table(coords, self.durations_cache, self.count_durations,
+                                lambda coords: self.fallback.get_distances(coords) / self.fallback_speed * 3600,
+                                'duration')
+
+
+def get_distance_provider() -> DistanceProvider:
+    """
+    Creates the distance provider configured in DISTANCE_PROVIDER setting. Falls back to straight-line distances
+    if the setting is missing.
+
+    @return: distance provider
+    """
+    config = getattr(settings, 'DISTANCE_PROVIDER', None) or dict()
+
+    if config.get('BACKEND') == 'osrm':
+        return OSRMDistanceProvider(config['URL'], distance_cache=cache.get_distance_cache('osrm'),
+                                    durations_cache=cache.get_distance_cache('osrm-durations'),
+                                    profile=config.get('PROFILE', 'driving'),
+                                    max_table_size=config.get('MAX_TABLE_SIZE', 100),
+                                    pool_size=config.get('POOL_SIZE', 4))
+
+    return HaversineDistanceProvider(cache.get_distance_cache('haversine'))
@@ -0,0 +1,112 @@
+import collections
+import logging
+import threading
+import time
+
+import data.utils
+
+logger = logging.getLogger('data')
+
+
+class ProgressPublisher:
+    """
+    Sends websocket messages of business trip from a background thread, so the optimizer never waits for
+    the channel layer. Published messages wait in a bounded queue keyed by message type: a message replaces
+    the waiting message of the same type and the oldest type is dropped when the queue is full. Waiting messages
+    are sent at most once per interval of wall time.
+    """
+
+    def __init__(self, business_trip_id: int, interval: float = 0.5, queue_size: int = 8, send=None) -> None:
+        """
+        @param business_trip_id: id of business trip
+        @param interval: minimal time in seconds between two sends (default: 0.5)
+        @param queue_size: maximal number of message types waiting for the thread (default: 8)
+        @param send: function of business trip id, message type and message (default: websocket group send)
+        """
+        self.business_trip_id = business_trip_id
+        self.interval = interval
+        self.queue_size = queue_size
+        self.send = send if send is not None else data.utils.update_business_trip_by_ws
+        self.pending = collections.OrderedDict()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = None
+        # overhead counters, publish_time is time spent in publish by the optimizer thread
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.sent = 0
+        self.publish_time = 0.0
+
+    def publish(self, message_type: str, message) -> None:
+        """
+        Queues message without waiting for it to be sent.
+
+        @param message_type: type of message, e.g. PROCESSING
+        @param message: message
+        """
+        start = time.perf_counter()
+
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.__run, name='progress-%s' % self.business_trip_id,
+                                               daemon=True)
+                self.thread.start()
+
+            if self.pending.pop(message_type, None) is not None:
+                self.coalesced += 1
+            elif len(self.pending) >= self.queue_size:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+            self.pending[message_type] = message
+            self.condition.notify()
+
+        self.published += 1
+        self.publish_time += time.perf_counter() - start
+
+    def __send(self, messages: list) -> None:
+        for message_type, message in messages:
+            try:
+                self.send(self.business_trip_id, message_type, message)
+                self.sent += 1
+            except Exception:
+                logger.exception('Sending %s message of business trip %s failed' %
+                                 (message_type, self.business_trip_id))
+
+    def __run(self) -> None:
+        last_sent = None
+
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed)
+                if last_sent is not None and not self.closed:
+                    # messages published until the end of interval replace the waiting ones
+                    self.condition.wait_for(lambda: self.closed, last_sent + self.interval - time.monotonic())
+
+                messages = list(self.pending.items())
+                self.pending.clear()
+                closed = self.closed
+
+            self.__send(messages)
+            last_sent = time.monotonic()
+
+            if closed:
+                return
+
+    def close(self, timeout: float = None) -> None:
+        """
+        Sends waiting messages immediately and stops the thread.
+
+        @param timeout: maximal time in seconds to wait for the thread (default: None)
+        """
+        with self.condition:
+            if self.thread is None or self.closed:
+                return
+
+            self.closed = True
+            self.condition.notify()
+
+        self.thread.join(timeout)
+        logger.info('Progress of business trip %s: %d messages published in %.4f s, %d sent, %d coalesced, '
+                    '%d dropped' % (self.business_trip_id, self.published, self.publish_time, self.sent,
+                                    self.coalesced, self.dropped))
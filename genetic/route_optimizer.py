@@ -1,13 +1,14 @@
 import logging
 import math
 import random
+import time
 from typing import List
 
-import mpu
 import numpy as np
+from django.conf import settings
 
-import data.utils
-from genetic import routes, utils, vertices
+from genetic import (availability, breeding, distances, generations, hotels, local_search, publishers, routes,
+                     seeding, serializers, utils, vertices, warm_start)
 
 logger = logging.getLogger('data')
 
@@ -17,45 +18,72 @@ class NotEnoughCompaniesException(Exception):
 
 
 class RouteObserver:
-    def __init__(self, business_trip_id: int, total: int) -> None:
+    def __init__(self, business_trip_id: int, total: int, publisher: publishers.ProgressPublisher = None) -> None:
         self.business_trip_id = business_trip_id
         self.progress = 0
         self.total = total
-        self.last_progress = 0
+        self.last_value = None
+        self.publisher = publisher if publisher is not None else publishers.ProgressPublisher(
+            business_trip_id, interval=getattr(settings, 'PROGRESS_PUBLISH_INTERVAL', 0.5))
 
     def increment(self, value: int = 1) -> None:
         """
-        Incremenents of progress for actual processing route. Updates only if delta is bigger than one percent.
+        Increments of progress for actual processing route. Publishes only if rounded progress has changed,
+        messages are sent at most once per publish interval of the publisher.
         @param value: incrementation value (default: 1)
         """
-        """
-        Increments of progress for actual processing route.
-
-        Keyword Arguments:
-            value {int} -- incrementation value (default: {1})
-        """
         self.progress += value
 
-        # Notify only if more than one % difference between updates
-        if ((self.progress - self.last_progress) / self.total * 100) >= 1:
-            self.last_progress = self.progress
+        if round(self.progress / self.total, 2) != self.last_value:
+            self.last_value = round(self.progress / self.total, 2)
             self.update()
 
     def update(self) -> None:
         """
-        Sending websocket message with current progress
+        Publishing websocket message with current progress
         """
         message = {
             "value": round(self.progress/self.total, 2),
         }
 
-        data.utils.update_business_trip_by_ws(self.business_trip_id, "PROCESSING", message)
+        self.publisher.publish("PROCESSING", message)
+
+    def improve(self, route: dict) -> None:
+        """
+        Publishing websocket message with the best route found so far
+        @param route: serialized route
+        """
+        self.publisher.publish("IMPROVED", route)
+
+    def close(self) -> None:
+        """
+        Sends messages which have not been sent yet and stops publishing.
+        """
+        self.publisher.close()
+
+
+class SilentRouteObserver(RouteObserver):
+    """
+    Observer which counts progress without sending it, e.g. for populations optimized in worker processes.
+    """
+
+    def update(self) -> None:
+        pass
+
+    def improve(self, route: dict) -> None:
+        pass
+
 
 class RouteOptimizer:
     def __init__(self, business_trip_id: int, data: dict,
                  max_distance: int, days: int, crossover_probability: float = 0.7, mutation_probability: float = 0.4,
-                 elitsm_rate: float = 0.1, population_size: int = 60, iterations: int = 1000):
-        self.population: List[List[routes.Route]] = list()
+                 elitsm_rate: float = 0.1, population_size: int = 60, iterations: int = 1000, dtype=np.float64,
+                 distance_provider=None, history_size: int = 0, workers: int = 0, seed: int = None,
+                 distance_matrix: distances.DistanceMatrix = None, observer_class=RouteObserver,
+                 time_budget: float = None, publish_interval: float = 1.0, local_search_time: float = 0,
+                 seeding_rate: float = 0, previous_days: List[List[vertices.Vertex]] = None,
+                 warm_start_rate: float = 0.2, hotel_candidates: int = 5):
+        self.population = generations.GenerationStore(history_size)
         self.depot = data['depot']
         self.companies = data['companies']
         self.hotels = data['hotels']
@@ -68,12 +96,40 @@ class RouteOptimizer:
         self.elitsm_rate = elitsm_rate
         self.population_size = population_size
         self.iterations = iterations
+        self.dtype = dtype
+        self.distance_provider = distance_provider
+        # number of processes breeding couples in parallel, couples are bred in this process if 0
+        self.workers = workers
+        self.seed = seed
+        # time budget in seconds covers counting of distances, generating initial population and iterations,
+        # run stops after it and keeps the best route found so far, no limit if None
+        self.time_budget = time_budget
+        self.deadline = None
+        # improved best routes are published at most once per publish interval in seconds
+        self.publish_interval = publish_interval
+        self.published_profit = None
+        self.last_published = None
+        # time in seconds spent by local search of elite routes in each generation, disabled if 0
+        self.local_search_time = local_search_time
+        # share of initial population built by deterministic heuristics instead of random insertions
+        self.seeding_rate = seeding_rate
+        # stops of each day of previous version of route, its repaired copy and warm_start_rate of population
+        # perturbed from it are put into initial population
+        self.previous_days = previous_days
+        self.warm_start_rate = warm_start_rate
+        # number of the nearest hotels of each company considered when hotels between days are assigned
+        self.hotel_candidates = hotel_candidates
         self.complexity_vector = dict()
-        self.observer = RouteObserver(business_trip_id, self.__get_total_progress())
+        self.observer = observer_class(business_trip_id, self.__get_total_progress())
 
         logger.info('Started generating route for business trip id %d' %
                     business_trip_id)
-        self.__count_distances()
+        self.start_timer()
+        try:
+            self.__count_distances(distance_matrix)
+        except BaseException:
+            self.close()
+            raise
 
     def __get_total_progress(self):
         vertices = len(self.companies + self.hotels) + 1
@@ -86,71 +142,50 @@ class RouteOptimizer:
         self.complexity_vector["iterations"] = (total_complexity * 0.5) / complexity[2]
         return total_complexity
 
-    def __count_distances(self) -> dict:
+    def __count_distances(self, distance_matrix: distances.DistanceMatrix = None) -> None:
         logger.info('Started counting distances for route.')
-        all_vertices_length = len([self.depot] + self.companies + self.hotels)
-        distances_array = np.zeros((all_vertices_length, all_vertices_length), dtype=[
-                                   ('id', int), ('distance', float)])
-        profits_by_distances_array = np.zeros(
-            (all_vertices_length, all_vertices_length), dtype=[('id', int), ('profit', float)])
+        all_vertices = [self.depot] + self.companies + self.hotels
+        all_vertices_length = len(all_vertices)
         self.vertex_uuids = dict()
         self.vertex_ids = dict()
 
-        all_vertices = [self.depot] + self.companies + self.hotels
-
         for i, vertex in enumerate(all_vertices):
             vertex.id = i
-
-        for i, vertex in enumerate(all_vertices):
             self.vertex_ids[i] = vertex
-            for j, another_vertex in enumerate(all_vertices):
-                distance = mpu.haversine_distance(
-                    vertex.get_coords(), another_vertex.get_coords())
-                profits_by_distances_array[i, j] = (
-                    another_vertex.id, another_vertex.profit / distance if distance != 0 else 0)
-                profits_by_distances_array[j, i] = (
-                    vertex.id, vertex.profit / distance if distance != 0 else 0)
-                distances_array[i, j] = (another_vertex.id, distance)
-                distances_array[j, i] = (vertex.id, distance)
-            self.observer.increment(all_vertices_length * self.complexity_vector["counting_distance"])
-
-        self.distances = distances_array
-        self.profits_by_distances = profits_by_distances_array
+
+        # matrix counted for the same vertices in the same order may be reused, e.g. by islands
+        self.distances = distance_matrix if distance_matrix is not None else distances.DistanceMatrix.from_vertices(
+            all_vertices, dtype=self.dtype, provider=self.distance_provider)
+        self.nearest_hotels = self.distances.get_nearest_among([hotel.id for hotel in self.hotels])
+        self.candidate_hotels = self.nearest_hotels[:, :self.hotel_candidates]
+
+        self.observer.increment(all_vertices_length ** 2 * self.complexity_vector["counting_distance"])
         logger.info('Finished counting distances for route')
 
-    def __add_random_profitable_company_to_route(self, route: routes.Route, route_part: routes.RoutePart, index: int, top: int) -> None:
-        profitable = np.sort(
-            self.profits_by_distances[route_part.route[index].id], order='profit')[::-1]
+    def __get_available_neighbours(self, route: routes.Route, neighbours: np.ndarray, top: int) -> List[vertices.Vertex]:
         result = list()
 
-        for id in profitable:
-            if id[0] in route.available_vertices:
-                company = self.vertex_ids[id[0]]
-                result.append(company)
+        for id in neighbours:
+            if id in route.available_vertices:
+                result.append(self.vertex_ids[int(id)])
 
-            if len(result) == top:
-                break
+                if len(result) == top:
+                    break
+
+        return result
 
+    def __add_random_profitable_company_to_route(self, route: routes.Route, route_part: routes.RoutePart, index: int, top: int) -> None:
+        result = self.__get_available_neighbours(
+            route, self.distances.most_profitable[route_part.route[index].id], top)
         top = len(result)
 
         if top:
-            # random_company = result[random.randint(0, top - 1)]
             random_company = result[int(round(random.random() * (top - 1)))]
             route.add_stop(route_part, index, random_company)
 
     def __add_random_nearest_company_to_route(self, route: routes.Route, route_part: routes.RoutePart, index: int, top: int):
-        nereast = np.sort(
-            self.distances[route_part.route[index].id], order='distance')
-        result = list()
-
-        for id in nereast:
-            if id[0] in route.available_vertices:
-                company = self.vertex_ids[id[0]]
-                result.append(company)
-
-            if len(result) == top:
-                break
-
+        result = self.__get_available_neighbours(
+            route, self.distances.nearest[route_part.route[index].id], top)
         top = len(result)
 
         if top:
@@ -158,65 +193,120 @@ class RouteOptimizer:
             route.add_stop(route_part, index, random_company)
 
     def __add_random_company_to_route(self, route: routes.Route, route_part: routes.RoutePart, index: int):
-        random_index_company = int(
-            round(random.random() * (len(route.available_vertices) - 1)))
-        availabe_list = list(route.available_vertices)
-        random_company = self.vertex_ids[availabe_list[random_index_company]]
+        random_company = self.vertex_ids[route.available_vertices.choice()]
 
         route.add_stop(route_part, index, random_company)
 
-    def __add_nearest_hotel_to_route(self, route: routes.Route):
-        if self.days > 1:
-            for day, route_part in enumerate(route.routes):
-                indexes = (0, route_part.length - 1)
-                nearest = (
-                    np.sort(
-                        self.distances[route_part.route[1].id], order='distance'),
-                    np.sort(
-                        self.distances[route_part.route[-2].id], order='distance'),
-                )
-                if day == 0:
-                    indexes = (route_part.length - 1,)
-                    nearest = (
-                        np.sort(self.distances[route_part.route[-2].id], order='distance'),)
-                elif day == self.days - 1:
-                    indexes = (0,)
-                    nearest = (
-                        np.sort(self.distances[route_part.route[1].id], order='distance'),)
-
-                for i, index in enumerate(indexes):
-                    for id in nearest[i]:
-                        vertex = self.vertex_ids[id[0]]
-
-                        if isinstance(vertex, vertices.Hotel):
-                            replaced = route.replace_stop(
-                                route_part, index, vertex)
-                            if not replaced:
-                                raise Exception("No possible hotels dude")
-                            break
+    def __assign_hotels_to_route(self, route: routes.Route) -> None:
+        """
+        Assigns hotels between days of the route. If no hotels keep distance limits of all days, the last company
+        of the longest day is removed until they do.
+        """
+        if self.days < 2 or not self.hotels:
+            return
+
+        while not hotels.assign_hotels(route, self.candidate_hotels, self.depot):
+            route_parts = [route_part for route_part in route.routes if route_part.length > 2]
+            if not route_parts:
+                raise Exception("No possible hotels dude")
+
+            longest = max(route_parts, key=lambda route_part: route_part.distance)
+            route.remove_stop(longest, longest.length - 2)
+
+    def __create_empty_route(self) -> routes.Route:
+        route = routes.Route(
+            self.days, self.max_distance * 0.7, self.distances)
+        route.available_vertices = availability.AvailableVertices(
+            len(self.distances), [company.id for company in self.companies])
+        route.vertices_ids = self.vertex_ids
+
+        for j in range(self.days):
+            route.add_route_part(routes.RoutePart([self.depot, self.depot]))
+
+        return route
+
+    def __generate_warm_started_routes(self) -> List[routes.Route]:
+        """
+        Repairs the previous version of route for current constraints. The first route is the repaired one,
+        the others are its mutated copies.
+
+        @return: list of routes, empty if there is no previous version
+        """
+        if not self.previous_days:
+            return list()
+
+        default_hotel = self.vertex_ids[int(self.nearest_hotels[self.depot.id][0])] if self.hotels else self.depot
+        size = min(max(int(round(self.warm_start_rate * self.population_size)), 1), self.population_size)
+        population = list()
+
+        for i in range(size):
+            # the repaired route is always kept, its perturbed copies only while there is time left
+            if i and self.is_out_of_time():
+                break
+
+            route = routes.Route(self.days, self.max_distance, self.distances)
+            route.available_vertices = availability.AvailableVertices(
+                len(self.distances), [company.id for company in self.companies])
+            route.vertices_ids = self.vertex_ids
+            warm_start.repair_route(route, self.previous_days, self.depot, default_hotel)
+            # even the default hotel may be out of distance limit, then hotels are chosen again
+            if any(route_part.distance > self.max_distance for route_part in route.routes):
+                self.__assign_hotels_to_route(route)
+            if i:
+                utils.mutate([route, self.mutation_probability])
+
+            population.append(route)
+            self.observer.increment(self.complexity_vector["generating_routes"])
+
+        return population
+
+    def __generate_seeded_routes(self) -> List[routes.Route]:
+        """
+        Builds seeding_rate of population by deterministic heuristics. The first route is built by insertion
+        of companies with the best ratio of profit and distance to all days, the others are built by the same
+        insertion into days limited to sectors of companies swept around the depot from different angles.
+
+        @return: list of routes
+        """
+        size = seeding.get_seeding_size(self.days, int(round(self.seeding_rate * self.population_size)))
+        population = list()
+
+        for i in range(size):
+            if self.is_out_of_time():
+                break
+
+            route = self.__create_empty_route()
+            if i == 0:
+                seeding.insert_by_ratio(route)
+            else:
+                start_angle = 2 * math.pi * (i - 1) / (size - 1)
+                seeding.insert_by_sweep(route, seeding.get_sweep_sectors(self.depot, self.companies, self.days,
+                                                                         start_angle))
+            route.max_distance = self.max_distance
+            self.__assign_hotels_to_route(route)
+
+            population.append(route)
+            self.observer.increment(self.complexity_vector["generating_routes"])
+
+        return population
 
     def generate_random_routes(self):
+        """
+        Generates initial population. When time budget is exceeded, no more heuristic routes are built and
+        the remaining random routes are left without companies, so population keeps its size.
+        """
         logger.info('Started generating random routes. Population size = %d, number of days = %d' % (
             self.population_size, self.days))
-        population: List[routes.Route] = list()
-        for i in range(self.population_size):
-            route = routes.Route(
-                self.days, self.max_distance * 0.7, self.distances)
-            route.available_vertices = set(
-                [company.id for company in self.companies])
-            route.vertices_ids = self.vertex_ids
-
-            to_process = list()
-            tries = list()
+        population: List[routes.Route] = self.__generate_warm_started_routes()
+        population += self.__generate_seeded_routes()[:self.population_size - len(population)]
+        for i in range(self.population_size - len(population)):
+            route = self.__create_empty_route()
 
-            for j in range(self.days):
-                route_part = routes.RoutePart([self.depot, self.depot])
-                route.add_route_part(route_part)
-                to_process.append(route_part)
-                tries.append(0)
+            to_process = list(route.routes)
+            tries = [0] * len(to_process)
 
             current_index = 0
-            while to_process and route.available_vertices:
+            while to_process and route.available_vertices and not self.is_out_of_time():
                 current = to_process[current_index]
                 if tries[current_index] == self.generate_tries - 1:
                     del to_process[current_index]
@@ -224,7 +314,6 @@ class RouteOptimizer:
                         break
                     current_index = (current_index + 1) % len(to_process)
                     continue
-                #TODO: after first add, try to add the nearest hotel, then in the end, update the nearest hotels for whole route.
                 random_index = random.randint(
                     1, current.length - 2) if current.length > 2 else 1
                 self.__add_random_company_to_route(
@@ -238,15 +327,13 @@ class RouteOptimizer:
                 self.__add_random_nearest_company_to_route(
                     route, current, random_index, 5)
                 route.max_distance = self.max_distance
-                self.__add_nearest_hotel_to_route(route)
 
                 tries[current_index] += 1
                 current_index = (current_index + 1) % len(to_process)
+            self.__assign_hotels_to_route(route)
             population.append(route)
-            route.count_profit()
             self.observer.increment(self.complexity_vector["generating_routes"])
-        population.sort(key=lambda x: x.profit, reverse=True)
-        self.population.append(population)
+        self.population.set_initial(population)
 
         logger.info('Finished generating random routes for route')
 
@@ -262,15 +349,15 @@ class RouteOptimizer:
 
     def __do_elitism_operation(self, t_size: int = 5):
         elite_number = math.floor(self.elitsm_rate * self.population_size)
-        next_population = self.population[-1][:elite_number].copy()
+        self.population.next = self.population.current[:elite_number]
 
         for i in range(self.population_size - elite_number):
             route = self.__tournament_choose(
-                self.population[-1][elite_number:], t_size, 1)
-            next_population.append(route[0])
+                self.population.current[elite_number:], t_size, 1)
+            self.population.next.append(route[0])
             # self.observer.increment()
 
-        self.population.append(next_population)
+        self.population.advance()
         # self.observer.increment()
 
     def __couple_routes(self, population) -> List[List[routes.Route]]:
@@ -304,34 +391,120 @@ class RouteOptimizer:
 
         return profit_sum / len(population)
 
+    def __enter__(self) -> 'RouteOptimizer':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops publishing of progress, waiting messages are sent first. It has to be called also when generating
+        routes fails, otherwise the thread of publisher is left waiting for messages.
+        """
+        self.observer.close()
+
+    def get_best_route(self) -> routes.Route:
+        """
+        Gives the most profitable route of the current generation.
+
+        @return: route or None if routes have not been generated yet
+        """
+        return self.population.get_best()
+
+    def start_timer(self) -> None:
+        """
+        Starts counting time budget. It is started when optimizer is created, before distances are counted.
+        """
+        self.deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+
+    def is_out_of_time(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def publish_best_route(self, route: routes.Route) -> bool:
+        """
+        Publishes given route if it is more profitable than the last published one and publish interval passed.
+
+        @param route: the best route found so far
+        @return: True if route has been published
+        """
+        now = time.monotonic()
+        if self.published_profit is not None and (route.profit <= self.published_profit or
+                                                  now - self.last_published < self.publish_interval):
+            return False
+
+        self.published_profit = route.profit
+        self.last_published = now
+        self.observer.improve(self.serialize_route(route))
+        return True
+
+    def serialize_route(self, route: routes.Route) -> dict:
+        route_parts = list()
+        for route_part in route.routes:
+            profit = sum(vertex.profit for vertex in set(route_part.route))
+            route_parts.append(dict(route=route_part.route, distance=route_part.distance, profit=profit))
+
+        max_profit = sum(company.profit for company in self.companies)
+        return serializers.RouteSerializer(dict(routes=route_parts, max_profit=max_profit, distance=route.distance,
+                                                profit=route.profit)).data
+
     def run(self):
-        for i in range(1, self.iterations + 1):
-            self.population.append(self.population[-1].copy())
-            logger.info('Started processing %d iteration of %d' %
-                        (i, self.iterations))
-            # self.__do_elitism_operation(t_size=2)
-            elite_number = math.floor(self.elitsm_rate * self.population_size)
-            couples = self.__couple_routes(self.population[-1][elite_number:])
-            packed_to_crossover = self.__pack_to_crossover(couples)
-
-            self.population[-1] = self.population[-1][:elite_number]
-            # self.population[-1] = []
-
-            for packed in packed_to_crossover:
-                couple = utils.crossover(packed)
-                couple[0].count_profit()
-                couple[1].count_profit()
-                self.population[-1].append(couple[0])
-                self.population[-1].append(couple[1])
-
-            self.population[-1].sort(key=lambda x: x.profit, reverse=True)
-            entropy = self.__get_entropy(self.population[-1])
-
-            self.observer.increment(self.complexity_vector["iterations"])
-
-            if 0.9 * self.population[-1][0].profit <= entropy <= 1.1 * self.population[-1][0].profit:
-                logger.info('Finished processing iteration %d of %d' %
-                            (i, self.iterations))
-                break
-            logger.info('Finished processing iteration %d of %d' %
-                        (i, self.iterations))
+        self.publish_best_route(self.get_best_route())
+
+        try:
+            with breeding.get_breeder(self.distances, self.vertex_ids, [company.id for company in self.companies],
+                                      self.workers, self.seed) as breeder:
+                for i in range(1, self.iterations + 1):
+                    converged = self.step(breeder, i)
+                    self.publish_best_route(self.get_best_route())
+
+                    if converged:
+                        break
+
+                    if self.is_out_of_time():
+                        logger.info('Time budget of %.1f s exceeded after iteration %d' % (self.time_budget, i))
+                        break
+        finally:
+            self.close()
+
+    def step(self, breeder: breeding.SerialBreeder, generation: int) -> bool:
+        """
+        Breeds the next generation and replaces the current one with it.
+
+        @param breeder: breeder of couples
+        @param generation: number of generation being bred
+        @return: True if profits of routes in population converged
+        """
+        logger.info('Started processing %d iteration of %d' %
+                    (generation, self.iterations))
+        # self.__do_elitism_operation(t_size=2)
+        elite_number = math.floor(self.elitsm_rate * self.population_size)
+        couples = self.__couple_routes(self.population.current[elite_number:])
+        packed_to_crossover = self.__pack_to_crossover(couples)
+
+        self.population.next = self.population.current[:elite_number]
+        children = breeder.breed(packed_to_crossover, generation)
+        if self.local_search_time:
+            # the most profitable children are improved by local search before they are merged into the next
+            # generation, the elite is carried over as it is
+            best_children = sorted(children, key=lambda x: x.profit, reverse=True)[:max(elite_number, 1)]
+            local_search.improve_population(best_children, self.local_search_time)
+        self.population.next += children
+
+        self.population.advance()
+        best_route = self.population.get_best()
+        entropy = self.__get_entropy(self.population.current)
+
+        self.observer.increment(self.complexity_vector["iterations"])
+
+        logger.info('Finished processing iteration %d of %d' %
+                    (generation, self.iterations))
+        return 0.9 * best_route.profit <= entropy <= 1.1 * best_route.profit
+
+    def immigrate(self, immigrants: List[routes.Route]) -> None:
+        """
+        Replaces the least profitable routes of the current generation with given routes.
+
+        @param immigrants: list of routes, e.g. the best routes of another population
+        """
+        self.population.replace_worst(immigrants)
@@ -1,37 +1,148 @@
-from typing import List
+from typing import Iterable, List
 
 from genetic import vertices
+from genetic.availability import AvailableVertices
+from genetic.distances import DistanceMatrix
 
 
 class RoutePart:
+    """
+    Stops of one day of a route. When distances are known (after recount_route), cumulative distances of stops
+    are kept in cumulative: cumulative[i] is the distance from the first stop to i-th stop. They are updated
+    in place by every change of stops, so a distance of any segment of the route part takes O(1). An update
+    shifts the sums of all following stops, so it takes O(n) in the number of stops of one day (see
+    benchmarkroutes command).
+    """
+    __slots__ = ('distance', 'profit', '_route', 'distances', 'cumulative')
+
     def __init__(self, route: List[vertices.Vertex]) -> None:
         self.distance = 0
         self.profit = 0
-        self.route = route
+        self.distances = None
+        self.cumulative = None
+        self._route = route
+
+    @property
+    def route(self) -> List[vertices.Vertex]:
+        return self._route
+
+    @route.setter
+    def route(self, route: List[vertices.Vertex]) -> None:
+        self._route = route
+        self.__recount_cumulative(0)
 
     @property
     def length(self):
-        return len(self.route)
+        return len(self._route)
+
+    def __count_distance(self, v_from: vertices.Vertex, v_to: vertices.Vertex) -> float:
+        return self.distances.distances[v_from.id, v_to.id]
+
+    def __recount_cumulative(self, start_index: int) -> None:
+        if self.distances is None:
+            self.cumulative = None
+            return
+
+        route = self._route
+        cumulative = self.cumulative[:start_index] if start_index and self.cumulative else [0] * min(1, len(route))
+        for i in range(max(start_index, 1), len(route)):
+            cumulative.append(cumulative[-1] + self.__count_distance(route[i - 1], route[i]))
+        self.cumulative = cumulative
+
+    def __shift_cumulative(self, start_index: int, delta: float) -> None:
+        cumulative = self.cumulative
+        cumulative[start_index:] = [distance + delta for distance in cumulative[start_index:]]
 
     def add_stop(self, index, vertex: vertices.Vertex):
-        self.route.insert(index, vertex)
+        route = self._route
+        cumulative = self.cumulative
+        if cumulative is not None and route:
+            if index == 0:
+                cumulative.insert(0, 0)
+                self.__shift_cumulative(1, self.__count_distance(vertex, route[0]))
+            elif index >= len(route):
+                cumulative.append(cumulative[-1] + self.__count_distance(route[-1], vertex))
+            else:
+                distance_to_new = self.__count_distance(route[index - 1], vertex)
+                delta = distance_to_new + self.__count_distance(vertex, route[index]) - \
+                    (cumulative[index] - cumulative[index - 1])
+                cumulative.insert(index, cumulative[index - 1] + distance_to_new)
+                self.__shift_cumulative(index + 1, delta)
+        elif cumulative is not None:
+            self.cumulative = [0]
+
+        route.insert(index, vertex)
 
     def remove_stop(self, index: int) -> None:
-        del self.route[index]
+        route = self._route
+        cumulative = self.cumulative
+        index = index % len(route)
+        if cumulative is not None:
+            if len(route) == 1 or index == len(route) - 1:
+                del cumulative[-1]
+            elif index == 0:
+                del cumulative[0]
+                self.__shift_cumulative(0, -cumulative[0])
+            else:
+                delta = self.__count_distance(route[index - 1], route[index + 1]) - \
+                    (cumulative[index + 1] - cumulative[index - 1])
+                del cumulative[index]
+                self.__shift_cumulative(index, delta)
+
+        del route[index]
 
     def replace_stop(self, index: int, vertex: vertices.Vertex) -> None:
-        if index < len(self.route):
-            self.route[index] = vertex
+        route = self._route
+        if index >= len(route):
+            return
 
-    def recount_route(self, distances) -> None:
-        distance = 0
-        for i, vertex in enumerate(self.route[1:]):
-            distance += distances[self.route[i].id, vertex.id][1]
-        self.distance = distance
+        cumulative = self.cumulative
+        if cumulative is not None and len(route) > 1:
+            if index == 0:
+                self.__shift_cumulative(1, self.__count_distance(vertex, route[1]) - cumulative[1])
+            elif index == len(route) - 1:
+                cumulative[-1] = cumulative[-2] + self.__count_distance(route[-2], vertex)
+            else:
+                distance_to_new = self.__count_distance(route[index - 1], vertex)
+                delta = distance_to_new + self.__count_distance(vertex, route[index + 1]) - \
+                    (cumulative[index + 1] - cumulative[index - 1])
+                cumulative[index] = cumulative[index - 1] + distance_to_new
+                self.__shift_cumulative(index + 1, delta)
+
+        route[index] = vertex
+
+    def swap_stops(self, first_index: int, second_index: int) -> None:
+        route = self._route
+        route[first_index], route[second_index] = route[second_index], route[first_index]
+        self.__recount_cumulative(min(first_index, second_index))
+
+    def get_segment_distance(self, start_index: int, stop_index: int) -> float:
+        """
+        Gives distance between two stops of the route part.
+
+        @param start_index: index of the first stop of segment
+        @param stop_index: index of the last stop of segment
+        @return: distance of segment
+        """
+        if self.cumulative is None:
+            raise ValueError("distances of route part are not counted")
+
+        return self.cumulative[stop_index] - self.cumulative[start_index]
+
+    def recount_route(self, distances: 'DistanceMatrix') -> None:
+        self.distances = distances
+        self.__recount_cumulative(0)
+        self.distance = self.cumulative[-1] if self.cumulative else 0
 
 
 class Route:
-    def __init__(self, days, max_distance, distances) -> None:
+    __slots__ = ('distance', 'profit', 'routes', 'days', 'max_distance', 'distances', '_available_vertices',
+                 'vertices_ids', 'visits')
+
+    # Cross-checks incrementally tracked profit against full recount after every change of the route
+    debug = False
+
+    def __init__(self, days, max_distance, distances: DistanceMatrix) -> None:
         self.distance = 0
         self.profit = 0
         self.routes = list()
@@ -39,12 +150,36 @@ class Route:
         self.max_distance = max_distance
         self.distances = distances
         self.available_vertices = set()
+        self.vertices_ids = None
+        # number of occurrences of each vertex in the route, profit of vertex is counted only once
+        self.visits = dict()
+
+    @property
+    def available_vertices(self) -> AvailableVertices:
+        return self._available_vertices
+
+    @available_vertices.setter
+    def available_vertices(self, ids: Iterable[int]) -> None:
+        if not isinstance(ids, AvailableVertices):
+            ids = AvailableVertices(len(self.distances), ids)
+        self._available_vertices = ids
 
     def count_distance(self, v_from, v_to):
-        # return self.distances[v_from.uuid][v_to.uuid]
-        return self.distances[v_from.id, v_to.id][1]
+        return self.distances.distances[v_from.id, v_to.id]
 
     def count_profit(self):
+        """
+        Recounts profit of the route from scratch. Profit is tracked incrementally by methods changing the route,
+        so it is only needed when stops of route parts were changed directly.
+        """
+        self.visits = dict()
+        self.profit = 0
+
+        for part in self.routes:
+            for vertex in part.route:
+                self.__visit(vertex)
+
+    def __recount_profit(self) -> float:
         vertex_list = list()
 
         profit = 0
@@ -56,7 +191,35 @@ class Route:
         for vertex in vertex_list:
             profit += vertex.profit
 
-        self.profit = profit
+        return profit
+
+    def __visit(self, vertex: vertices.Vertex) -> None:
+        count = self.visits.get(vertex.id, 0)
+        if not count:
+            self.profit += vertex.profit
+        self.visits[vertex.id] = count + 1
+
+    def __leave(self, vertex: vertices.Vertex) -> None:
+        count = self.visits.get(vertex.id, 0)
+        if count == 1:
+            del self.visits[vertex.id]
+            self.profit -= vertex.profit
+        elif count > 1:
+            self.visits[vertex.id] = count - 1
+
+    def check_profit(self) -> None:
+        """
+        Cross-checks incrementally tracked profit against profit recounted from scratch.
+
+        Raises AssertionError when they differ.
+        """
+        profit = self.__recount_profit()
+        if abs(self.profit - profit) > 1e-6:
+            raise AssertionError("Tracked profit %f differs from recounted profit %f" % (self.profit, profit))
+
+    def __check_profit_in_debug(self) -> None:
+        if self.debug:
+            self.check_profit()
 
     def recount_route_part(self, route_part: RoutePart):
         route_part.recount_route(self.distances)
@@ -75,13 +238,10 @@ class Route:
         if stop_index > route_part.length - 1:
             raise ValueError("stop index is bigger than route length")
 
-        distance = 0
-
-        for i, vertex in enumerate(route_part.route[start_index + 1:stop_index + 1]):
-            distance += self.count_distance(
-                route_part.route[start_index + i], vertex)
+        if route_part.cumulative is None:
+            self.recount_route_part(route_part)
 
-        return distance
+        return route_part.get_segment_distance(start_index, stop_index)
 
     def add_route_part(self, route_part: RoutePart):
         if len(self.routes) < self.days:
@@ -92,6 +252,10 @@ class Route:
             for vertex in route_part.route[1:-1]:
                 self.available_vertices.discard(vertex.id)
 
+            for vertex in route_part.route:
+                self.__visit(vertex)
+            self.__check_profit_in_debug()
+
     def __increment_distance(self, route_part: RoutePart, value: float) -> None:
         route_part.distance += value
         self.distance += value
@@ -118,8 +282,8 @@ class Route:
     def __add_stop(self, route_part: RoutePart, index, vertex) -> bool:
         existing_distance = self.count_distance(
             route_part.route[index - 1], route_part.route[index])
-        distance_to_new = self.distances[route_part.route[index - 1].id][vertex.id][1]
-        distance_from_new = self.distances[route_part.route[index].id][vertex.id][1]
+        distance_to_new = self.count_distance(route_part.route[index - 1], vertex)
+        distance_from_new = self.count_distance(vertex, route_part.route[index])
 
         distance = distance_to_new + distance_from_new - existing_distance
 
@@ -130,8 +294,6 @@ class Route:
         return False
 
     def add_stop(self, route_part, index, vertex) -> bool:
-        add_method = self.__add_stop
-
         if index < 0 or index > route_part.length:
             raise ValueError(
                 "insertion index is bigger than route length or is negative")
@@ -139,22 +301,17 @@ class Route:
         if isinstance(vertex, vertices.Company) and vertex.id not in self.available_vertices:
             return False
 
-        added = False
-
         if index == 0:
-            add_method = self.__add_on_first_in_route_part
+            added = self.__add_on_first_in_route_part(route_part, vertex)
         elif index == route_part.length:
-            add_method = self.__add_on_last_in_route_part
+            added = self.__add_on_last_in_route_part(route_part, vertex)
         else:
-            added = add_method(route_part, index, vertex)
-            if added:
-                self.available_vertices.discard(vertex.id)
-            return added
-
-        added = add_method(route_part, vertex)
+            added = self.__add_stop(route_part, index, vertex)
 
         if added:
             self.available_vertices.discard(vertex.id)
+            self.__visit(vertex)
+            self.__check_profit_in_debug()
 
         return added
 
@@ -184,25 +341,23 @@ class Route:
         self.__increment_distance(route_part, new_distance)
 
     def remove_stop(self, route_part: RoutePart, index: int) -> None:
-        remove_method = self.__remove_stop
-
         if index < 0 or index > route_part.length - 1:
             raise ValueError(
                 "Deletion index is bigger than route length or is negative")
 
+        vertex = route_part.route[index]
+        if isinstance(vertex, vertices.Company):
+            self.available_vertices.add(vertex.id)
+
         if index == 0:
-            remove_method = self.__remove_on_first_in_route_part
+            self.__remove_on_first_in_route_part(route_part)
         elif index == route_part.length - 1:
-            remove_method = self.__remove_on_last_in_route_part
+            self.__remove_on_last_in_route_part(route_part)
         else:
-            if isinstance(route_part.route[index], vertices.Company):
-                self.available_vertices.add(route_part.route[index].id)
-            remove_method(route_part, index)
-            return
+            self.__remove_stop(route_part, index)
 
-        if isinstance(route_part.route[index], vertices.Company):
-            self.available_vertices.add(route_part.route[index].id)
-        remove_method(route_part)
+        self.__leave(vertex)
+        self.__check_profit_in_debug()
 
     def __replace_first_stop(self, route_part: RoutePart, vertex: vertices.Vertex) -> bool:
         existing_distance = self.count_distance(
@@ -257,40 +412,46 @@ class Route:
             raise ValueError(
                 "Replace index is bigger than route length or is negative")
 
-        replace_method = self.__replace_stop
+        replaced_vertex = route_part.route[index]
 
         if index == 0:
-            replace_method = self.__replace_first_stop
+            replaced = self.__replace_first_stop(route_part, vertex)
         elif index == route_part.length - 1:
-            replace_method = self.__replace_last_stop
+            replaced = self.__replace_last_stop(route_part, vertex)
         else:
-            replaced = replace_method(route_part, index, vertex)
-            if replaced:
-                if isinstance(vertex, vertices.Company):
-                    self.available_vertices.discard(vertex)
-            return replaced
+            replaced = self.__replace_stop(route_part, index, vertex)
 
-        replaced = replace_method(route_part, vertex)
         if replaced:
             if isinstance(vertex, vertices.Company):
-                self.available_vertices.discard(vertex)
+                self.available_vertices.discard(vertex.id)
+            self.__leave(replaced_vertex)
+            self.__visit(vertex)
+            self.__check_profit_in_debug()
         return replaced
 
+    def change_route_part(self, route_part: RoutePart, route: List[vertices.Vertex], distance: float) -> None:
+        """
+        Replaces all stops of given route part, e.g. with a result of crossover.
+
+        @param route_part: route part of this route
+        @param route: new list of stops
+        @param distance: distance of new list of stops
+        """
+        for vertex in route_part.route:
+            self.__leave(vertex)
+        for vertex in route:
+            self.__visit(vertex)
+
+        self.distance += distance - route_part.distance
+        route_part.route = route
+        route_part.distance = distance
+        self.__check_profit_in_debug()
+
     def crossover(self, origin: RoutePart, another: RoutePart, cross_index: int):
         if cross_index < 0 or cross_index > origin.length - 2 or cross_index > another.length - 2:
             return [None, None]
 
-        new_distance = 0
-
-        # origin part distance
-        if cross_index < origin.length / 2:
-            part_distance = self.__count_part_route_part(
-                origin, 0, cross_index)
-            new_distance += part_distance
-        else:
-            part_distance = self.__count_part_route_part(
-                origin, cross_index, origin.length - 1)
-            new_distance += origin.distance - part_distance
+        new_distance = self.__count_part_route_part(origin, 0, cross_index)
 
         for vertex in origin.route[cross_index + 1:]:
             if isinstance(vertex, vertices.Company):
@@ -299,12 +460,17 @@ class Route:
         # another part distance
         possible_to_add = [company for company in another.route[cross_index +
                                                                 1:-1] if company.id in self.available_vertices]
-        tmp_route_part = RoutePart(possible_to_add + [another.route[-1]])
-        self.recount_route_part(tmp_route_part)
+        if len(possible_to_add) == another.length - cross_index - 2:
+            # all stops of the tail are available, so its distance is already known
+            tail = another.route[cross_index + 1:]
+            new_distance += self.__count_part_route_part(another, cross_index + 1, another.length - 1)
+        else:
+            tmp_route_part = RoutePart(possible_to_add + [another.route[-1]])
+            self.recount_route_part(tmp_route_part)
+            tail = tmp_route_part.route
+            new_distance += tmp_route_part.distance
 
-        new_distance += tmp_route_part.distance
-        new_distance += self.count_distance(
-            origin.route[cross_index], tmp_route_part.route[0])
+        new_distance += self.count_distance(origin.route[cross_index], tail[0])
 
         if new_distance > self.max_distance:
             for vertex in origin.route[cross_index + 1:]:
@@ -315,7 +481,7 @@ class Route:
         for vertex in another.route[cross_index + 1:]:
             self.available_vertices.discard(vertex.id)
 
-        new_route = origin.route[:cross_index + 1] + tmp_route_part.route
+        new_route = origin.route[:cross_index + 1] + tail
 
         return new_route, new_distance
 
@@ -0,0 +1,70 @@
+import math
+from typing import List
+
+import numpy as np
+
+from genetic import local_search, routes, vertices
+
+
+def get_sweep_angles(depot: vertices.Vertex, companies: List[vertices.Vertex]) -> np.ndarray:
+    """
+    Counts polar angle of every company around the depot. Longitude differences are scaled by cosine
+    of latitude of the depot, so angles are not skewed far from the equator.
+
+    @param depot: depot
+    @param companies: list of companies
+    @return: array of angles in range [0, 2 * pi)
+    """
+    if not companies:
+        return np.empty(0, dtype=np.float64)
+
+    coords = np.array([company.get_coords() for company in companies], dtype=np.float64)
+    dlat = coords[:, 0] - depot.lat
+    dlng = (coords[:, 1] - depot.lng) * math.cos(math.radians(depot.lat))
+
+    return np.mod(np.arctan2(dlat, dlng), 2 * math.pi)
+
+
+def get_sweep_sectors(depot: vertices.Vertex, companies: List[vertices.Vertex], days: int,
+                      start_angle: float = 0) -> List[List[int]]:
+    """
+    Splits companies into days sectors around the depot. Companies are swept counterclockwise from start angle
+    and every sector gets the same number of consecutive companies.
+
+    @param depot: depot
+    @param companies: list of companies
+    @param days: number of sectors
+    @param start_angle: angle at which the sweep starts (default: 0)
+    @return: list of ids of companies of each sector
+    """
+    angles = np.mod(get_sweep_angles(depot, companies) - start_angle, 2 * math.pi)
+    order = np.argsort(angles, kind='stable')
+
+    return [[companies[int(i)].id for i in sector] for sector in np.array_split(order, days)]
+
+
+def insert_by_ratio(route: routes.Route) -> None:
+    """
+    Fills the route by inserting companies with the highest ratio of profit and insertion distance.
+    """
+    local_search.greedy_insertion(route)
+
+
+def insert_by_sweep(route: routes.Route, sectors: List[List[int]]) -> None:
+    """
+    Fills each day of the route with companies of its sector, companies with the highest ratio of profit
+    and insertion distance are inserted first.
+
+    @param route: route with empty days
+    @param sectors: list of ids of companies of each day
+    """
+    for route_part, sector in zip(route.routes, sectors):
+        local_search.greedy_insertion(route, route_parts=[route_part], candidates=sector)
+
+
+def get_seeding_size(days: int, size: int) -> int:
+    """
+    Gives number of distinct routes which can be seeded. For one day all sweeps give the same route as
+    ratio insertion.
+    """
+    return min(size, 1) if days == 1 else size
@@ -0,0 +1,155 @@
+import heapq
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from genetic.distances import EARTH_RADIUS
+
+
+def to_cartesian(coords: np.ndarray) -> np.ndarray:
+    """
+    Converts coordinates into points on a sphere of Earth radius. Euclidean (chord) distance between the points
+    grows with great-circle distance, so the nearest points are the same for both.
+
+    @param coords: array of shape (n, 2) with latitudes and longitudes in degrees
+    @return: array of shape (n, 3) with coordinates in kilometres
+    """
+    coords = np.radians(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+    lat = coords[:, 0]
+    lng = coords[:, 1]
+
+    return EARTH_RADIUS * np.stack((np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)), axis=1)
+
+
+def get_chord_length(distance: float) -> float:
+    """
+    Gives Euclidean distance between points on Earth sphere with given great-circle distance between them.
+    """
+    return 2 * EARTH_RADIUS * math.sin(min(distance / EARTH_RADIUS, math.pi) / 2)
+
+
+def get_bounding_box(coords: np.ndarray, distance: float) -> Tuple[float, float, float, float]:
+    """
+    Gives the smallest range of latitudes and longitudes containing all points within great-circle distance
+    from any of given coordinates.
+
+    @param coords: array of shape (n, 2) with latitudes and longitudes in degrees
+    @param distance: distance in kilometres
+    @return: tuple of minimal latitude, maximal latitude, minimal longitude and maximal longitude, the longitude
+        range is (-180, 180) if the box reaches a pole
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    delta_lat = math.degrees(distance / EARTH_RADIUS)
+    min_lat = float(coords[:, 0].min()) - delta_lat
+    max_lat = float(coords[:, 0].max()) + delta_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), -180, 180
+
+    # longitudes differ the most for the same distance at the latitude farthest from the equator
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    delta_lng = math.degrees(distance / (EARTH_RADIUS * cos_lat))
+    if delta_lng >= 180:
+        return min_lat, max_lat, -180, 180
+
+    return min_lat, max_lat, float(coords[:, 1].min()) - delta_lng, float(coords[:, 1].max()) + delta_lng
+
+
+class KDTree:
+    """
+    Static k-d tree of points for queries of the nearest neighbours within a radius. Points are split at median
+    along the axis of the biggest spread, leaves keep up to leaf_size points which are compared at once.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 16) -> None:
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        # indices of points ordered so every node covers a contiguous range of them
+        self.indices = np.arange(len(self.points))
+        self.root = self.__build(0, len(self.points)) if len(self.points) else None
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __build(self, start: int, stop: int) -> tuple:
+        if stop - start <= self.leaf_size:
+            return start, stop, None, None, None, None
+
+        points = self.points[self.indices[start:stop]]
+        axis = int(np.ptp(points, axis=0).argmax())
+        middle = (stop - start) // 2
+        order = np.argpartition(points[:, axis], middle)
+        self.indices[start:stop] = self.indices[start:stop][order]
+        split = float(self.points[self.indices[start + middle], axis])
+
+        return (start, stop, axis, split, self.__build(start, start + middle),
+                self.__build(start + middle, stop))
+
+    def query(self, point: np.ndarray, k: int, radius: float = math.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds up to k points nearest to given point which are not farther than radius.
+
+        @param point: array of shape (d,)
+        @param k: maximal number of found points
+        @param radius: maximal Euclidean distance of found points (default: inf)
+        @return: tuple of distances and indices of found points ordered by ascending distance
+        """
+        point = np.asarray(point, dtype=np.float64)
+        # max-heap of (-squared distance, index) of the best points found so far
+        best: List[Tuple[float, int]] = list()
+        if self.root is not None and k > 0:
+            self.__query(self.root, point, k, radius ** 2, best)
+
+        best.sort(reverse=True)
+        return (np.sqrt(np.array([-distance for distance, index in best], dtype=np.float64)),
+                np.array([index for distance, index in best], dtype=np.int64))
+
+    def __query(self, node: tuple, point: np.ndarray, k: int, bound: float, best: List[Tuple[float, int]]) -> None:
+        start, stop, axis, split, left, right = node
+
+        if axis is None:
+            indices = self.indices[start:stop]
+            distances = ((self.points[indices] - point) ** 2).sum(axis=1)
+            for distance, index in zip(distances, indices):
+                if distance > bound or (len(best) == k and -best[0][0] <= distance):
+                    continue
+                if len(best) == k:
+                    heapq.heapreplace(best, (-float(distance), int(index)))
+                else:
+                    heapq.heappush(best, (-float(distance), int(index)))
+            return
+
+        difference = point[axis] - split
+        near, far = (left, right) if difference < 0 else (right, left)
+        self.__query(near, point, k, bound, best)
+
+        worst = -best[0][0] if len(best) == k else bound
+        if difference ** 2 <= min(worst, bound):
+            self.__query(far, point, k, bound, best)
+
+
+def get_nearest_within(origins: np.ndarray, destinations: np.ndarray, distance: float, k: int) -> np.ndarray:
+    """
+    Selects destinations which are among k nearest destinations of any origin and not farther from it than given
+    great-circle distance.
+
+    @param origins: array of shape (n, 2) with latitudes and longitudes in degrees
+    @param destinations: array of shape (m, 2) with latitudes and longitudes in degrees
+    @param distance: maximal distance in kilometres
+    @param k: number of destinations kept for each origin
+    @return: sorted array of indices of selected destinations
+    """
+    destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+    if not len(destinations):
+        return np.empty(0, dtype=np.int64)
+
+    tree = KDTree(to_cartesian(destinations))
+    radius = get_chord_length(distance)
+    selected = set()
+
+    for point in to_cartesian(origins):
+        distances, indices = tree.query(point, k, radius)
+        selected.update(int(index) for index in indices)
+
+    return np.array(sorted(selected), dtype=np.int64)
@@ -1,15 +1,136 @@
 import datetime
+from typing import Dict, List, Tuple
 
 from celery import task
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 
 from data import models
-from genetic import route_optimizer, vertices, routes
+from genetic import distributed, islands, providers, route_optimizer, vertices, routes
 
 
 class RouteOptimizerException(Exception):
     pass
 
 
+def get_previous_days(business_trip_id: int, route_version: int, all_vertices: List[vertices.Vertex]) \
+        -> List[List[vertices.Vertex]]:
+    """
+    Loads stops of each day of given version of route of business trip. Stops which are not among given vertices,
+    e.g. companies of removed requisitions, are omitted.
+
+    @param business_trip_id: id of business trip
+    @param route_version: version of route
+    @param all_vertices: vertices of route being generated
+    @return: list of stops of each day
+    """
+    lookup = {(vertex.model, vertex.name): vertex for vertex in all_vertices}
+    previous_days = list()
+
+    segments = models.Route.objects.filter(business_trip_id=business_trip_id,
+                                           route_version=route_version).order_by('day', 'segment_order')
+    for segment in segments:
+        while len(previous_days) <= segment.day:
+            previous_days.append(list())
+
+        stops = previous_days[segment.day]
+        if not stops:
+            stops.append(lookup.get((ContentType.objects.get_for_id(segment.start_point_content_type_id).model_class(),
+                                     str(segment.start_point_object_id))))
+        stops.append(lookup.get((ContentType.objects.get_for_id(segment.end_point_content_type_id).model_class(),
+                                 str(segment.end_point_object_id))))
+
+    return [[stop for stop in stops if stop is not None] for stops in previous_days]
+
+
+def get_route_type(day: int, days: int, start_point_vertex: vertices.Vertex,
+                   end_point_vertex: vertices.Vertex) -> str:
+    route_type = models.Route.VISIT
+    if start_point_vertex.stop_type == 'depot' and end_point_vertex.stop_type == 'company':
+        route_type = models.Route.START if day == 0 else models.Route.START_FROM_DEPOT
+    if start_point_vertex.stop_type == 'hotel' and end_point_vertex.stop_type == 'company':
+        route_type = models.Route.START_FROM_HOTEL
+    if start_point_vertex.stop_type == 'company' and end_point_vertex.stop_type == 'hotel':
+        route_type = models.Route.FINISH_AT_HOTEL
+    if start_point_vertex.stop_type == 'company' and end_point_vertex.stop_type == 'depot':
+        route_type = models.Route.FINISH if day == days - 1 else models.Route.FINISH_AT_DEPOT
+
+    return route_type
+
+
+def get_points(all_vertices: List[vertices.Vertex]) -> Dict[Tuple[type, str], Tuple[ContentType, int]]:
+    """
+    Resolves database rows of given vertices with one query per model.
+
+    Raises DoesNotExist of the model when any of its rows does not exist.
+
+    @param all_vertices: vertices of route
+    @return: dictionary of content type and primary key by model and name of vertex
+    """
+    names_by_model = dict()
+    for vertex in all_vertices:
+        names_by_model.setdefault(vertex.model, set()).add(vertex.name)
+
+    points = dict()
+    for model, names in names_by_model.items():
+        content_type = ContentType.objects.get_for_model(model)
+        rows = model.objects.in_bulk([int(name) for name in names])
+        for name in names:
+            if int(name) not in rows:
+                raise model.DoesNotExist('%s matching query does not exist.' % model._meta.object_name)
+            points[(model, name)] = (content_type, int(name))
+
+    return points
+
+
+def get_route_segments(route: routes.Route, business_trip: models.BusinessTrip) -> List[models.Route]:
+    """
+    Builds unsaved segments of the route for current version of route of business trip.
+
+    @param route: optimized route
+    @param business_trip: business trip
+    @return: list of segments ordered by day and order of segment
+    """
+    points = get_points([vertex for route_part in route.routes for vertex in route_part.route])
+    segments = list()
+
+    route_part: routes.RoutePart
+    for day, route_part in enumerate(route.routes):
+        for index in range(1, route_part.length):
+            start_point_vertex = route_part.route[index - 1]
+            end_point_vertex = route_part.route[index]
+            start_point_content_type, start_point_id = points[(start_point_vertex.model, start_point_vertex.name)]
+            end_point_content_type, end_point_id = points[(end_point_vertex.model, end_point_vertex.name)]
+
+            segments.append(models.Route(start_point_content_type=start_point_content_type,
+                                         start_point_object_id=start_point_id,
+                                         end_point_content_type=end_point_content_type,
+                                         end_point_object_id=end_point_id,
+                                         distance=route.distances[end_point_vertex.id, start_point_vertex.id],
+                                         day=day,
+                                         segment_order=index - 1,
+                                         route_version=business_trip.route_version,
+                                         business_trip=business_trip,
+                                         route_type=get_route_type(day, route.days, start_point_vertex,
+                                                                   end_point_vertex)))
+
+    return segments
+
+
+def save_route(route: routes.Route, business_trip: models.BusinessTrip) -> List[models.Route]:
+    """
+    Saves all segments of the route with one insert in a single transaction.
+
+    @param route: optimized route
+    @param business_trip: business trip
+    @return: list of saved segments
+    """
+    segments = get_route_segments(route, business_trip)
+    with transaction.atomic():
+        return models.Route.objects.bulk_create(segments)
+
+
 @task(reject_on_worker_lost=True)
 def do_generate_route(data):
     business_trip_id = data['business_trip_id']
@@ -20,6 +141,8 @@ def do_generate_route(data):
     elitism_rate = data['elitism_rate']
     population_size = data['population_size']
     iterations = data['iterations']
+    time_budget = data.get('time_budget')
+    warm_start_version = data.get('warm_start_version')
 
     depot = vertices.Depot(data['depots']['name'], data['depots']['coords'])
     companies = [vertices.Company(company['name'], company['coords'], company['profit'])
@@ -28,52 +151,38 @@ def do_generate_route(data):
               for hotel in data['hotels']]
 
     data = dict(depot=depot, companies=companies, hotels=hotels)
+    previous_days = get_previous_days(business_trip_id, warm_start_version, [depot] + companies + hotels) \
+        if warm_start_version else None
 
-    ro = route_optimizer.RouteOptimizer(business_trip_id, data, tmax, days, crossover_probability=crossover_probability,
-                                        mutation_probability=mutation_probability, elitsm_rate=elitism_rate,
-                                        population_size=population_size, iterations=iterations)
+    options = dict(crossover_probability=crossover_probability, mutation_probability=mutation_probability,
+                   elitsm_rate=elitism_rate, population_size=population_size, iterations=iterations,
+                   time_budget=time_budget,
+                   local_search_time=getattr(settings, 'ROUTE_OPTIMIZER_LOCAL_SEARCH_TIME', 0),
+                   seeding_rate=getattr(settings, 'ROUTE_OPTIMIZER_SEEDING_RATE', 0), previous_days=previous_days)
+    if getattr(settings, 'ISLANDS', 0) and getattr(settings, 'ISLANDS_BACKEND', 'process') == 'ray':
+        ro = distributed.RayIslandModel(business_trip_id, data, tmax, days, islands=settings.ISLANDS,
+                                        migration_interval=getattr(settings, 'MIGRATION_INTERVAL', 10),
+                                        distance_provider=providers.get_distance_provider(),
+                                        address=getattr(settings, 'RAY_ADDRESS', None), **options)
+    elif getattr(settings, 'ISLANDS', 0):
+        ro = islands.IslandModel(business_trip_id, data, tmax, days, islands=settings.ISLANDS,
+                                 migration_interval=getattr(settings, 'MIGRATION_INTERVAL', 10),
+                                 distance_provider=providers.get_distance_provider(), **options)
+    else:
+        ro = route_optimizer.RouteOptimizer(business_trip_id, data, tmax, days,
+                                            distance_provider=providers.get_distance_provider(),
+                                            workers=getattr(settings, 'BREEDING_WORKERS', 0), **options)
     # TODO: Validate random routes, if there is a error, then return information back to response
     business_trip = models.BusinessTrip.objects.get(pk=business_trip_id)
     try:
-        ro.generate_random_routes()
-        ro.run()
+        # progress is not published after the task finishes, even if generating routes fails
+        with ro:
+            ro.generate_random_routes()
+            ro.run()
     except:
         raise RouteOptimizerException()
     else:
-        route = ro.population[-1][0]
-        route_part: routes.RoutePart
-        for day, route_part in enumerate(route.routes):
-            point: vertices.Vertex
-            for index, point in enumerate(route_part.route):
-                if index == 0:
-                    continue
-
-                start_point_vertex = route_part.route[index - 1]
-                start_point = start_point_vertex.model.objects.get(pk=int(start_point_vertex.name))
-                end_point_vertex = point
-                end_point = end_point_vertex.model.objects.get(pk=int(end_point_vertex.name))
-
-                distance = route.distances[end_point_vertex.id, start_point_vertex.id][1]
-
-                route_type = models.Route.VISIT
-                if start_point_vertex.stop_type == 'depot' and end_point_vertex.stop_type == 'company':
-                    route_type = models.Route.START if day == 0 else models.Route.START_FROM_DEPOT
-                if start_point_vertex.stop_type == 'hotel' and end_point_vertex.stop_type == 'company':
-                    route_type = models.Route.START_FROM_HOTEL
-                if start_point_vertex.stop_type == 'company' and end_point_vertex.stop_type == 'hotel':
-                    route_type = models.Route.FINISH_AT_HOTEL
-                if start_point_vertex.stop_type == 'company' and end_point_vertex.stop_type == 'depot':
-                    route_type = models.Route.FINISH if day == ro.population[-1][
-                        0].days - 1 else models.Route.FINISH_AT_DEPOT
-
-                models.Route.objects.create(start_point=start_point,
-                                            end_point=end_point,
-                                            distance=distance,
-                                            day=day,
-                                            segment_order=index - 1,
-                                            route_version=business_trip.route_version,
-                                            business_trip=business_trip,
-                                            route_type=route_type)
+        save_route(ro.get_best_route(), business_trip)
     finally:
         business_trip.task_finished = datetime.datetime.now()
         business_trip.save()
@@ -0,0 +1,84 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from genetic import distances
+
+# Roads are never straight, the stub makes them a bit longer than straight lines
+ROAD_FACTOR = 1.25
+SPEED = 60 / 3600  # km/s
+
+
+class OSRMStubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        coords = [tuple(map(float, point.split(','))) for point in url.path.split('/')[-1].split(';')]
+        coords = np.array([(lat, lng) for lng, lat in coords])
+
+        sources = [int(i) for i in params['sources'][0].split(';')]
+        destinations = [int(i) for i in params['destinations'][0].split(';')]
+        annotations = params.get('annotations', ['duration'])[0].split(',')
+
+        self.server.requests.append(self.path)
+
+        if len(coords) > self.server.max_table_size:
+            # like OSRM started with --max-table-size
+            status, result = 400, dict(code='TooBig', message='Too many table coordinates')
+        else:
+            table = distances.count_haversine_distances(coords[sources], coords[destinations]) * ROAD_FACTOR
+            status, result = 200, dict(code='Ok')
+            if 'distance' in annotations:
+                result['distances'] = self.__to_rows(table * 1000, table)
+            if 'duration' in annotations:
+                result['durations'] = self.__to_rows(table / SPEED, table)
+
+        body = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def __to_rows(self, values, table):
+        max_distance = self.server.max_distance
+        return [[None if max_distance is not None and distance > max_distance else value
+                 for value, distance in zip(values_row, row)] for values_row, row in zip(values.tolist(), table)]
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OSRMStubServer:
+    """
+    Local server answering /table requests like OSRM does, with distances of straight lines multiplied
+    by ROAD_FACTOR. Pairs of vertices farther than max_distance kilometres are unreachable. Requests with more
+    than max_table_size coordinates are refused like by OSRM with default options. Paths of all handled requests
+    are stored in requests.
+    """
+
+    def __init__(self, max_distance: float = None, max_table_size: int = 100) -> None:
+        self.server = HTTPServer(('127.0.0.1', 0), OSRMStubHandler)
+        self.server.requests = list()
+        self.server.max_distance = max_distance
+        self.server.max_table_size = max_table_size
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return 'http://%s:%d' % self.server.server_address
+
+    @property
+    def requests(self) -> list:
+        return self.server.requests
+
+    def __enter__(self) -> 'OSRMStubServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,87 @@
+import random
+import unittest
+
+import numpy as np
+
+from genetic.availability import AvailableVertices
+from genetic.routes import Route
+
+from .utils import TestData
+
+
+class AvailableVerticesTestCase(unittest.TestCase):
+    def test_init_adds_given_ids(self):
+        result = AvailableVertices(10, [1, 3, 5])
+
+        self.assertEqual(len(result), 3)
+        self.assertIn(3, result)
+        self.assertNotIn(2, result)
+        self.assertEqual(result, {1, 3, 5})
+
+    def test_contains_for_id_out_of_range_gives_false(self):
+        result = AvailableVertices(3, [0, 1, 2])
+
+        self.assertNotIn(3, result)
+        self.assertNotIn(-1, result)
+
+    def test_contains_for_numpy_integer_gives_correct_value(self):
+        result = AvailableVertices(3, [1])
+
+        self.assertIn(np.int32(1), result)
+
+    def test_add_the_same_id_twice_keeps_one_element(self):
+        result = AvailableVertices(10)
+
+        result.add(4)
+        result.add(4)
+
+        expected_length = 1
+        self.assertEqual(len(result), expected_length)
+
+    def test_add_id_out_of_range_raises_error(self):
+        result = AvailableVertices(3)
+
+        with self.assertRaises(IndexError):
+            result.add(3)
+
+    def test_discard_removes_id_and_keeps_others(self):
+        result = AvailableVertices(10, [1, 3, 5, 7])
+
+        result.discard(3)
+        result.discard(1)
+        result.discard(9)
+
+        self.assertEqual(result, {5, 7})
+        for id in result:
+            self.assertEqual(result.items[result.positions[id]], id)
+
+    def test_choice_gives_only_members(self):
+        result = AvailableVertices(10, [2, 4, 6])
+        rng = random.Random(1)
+
+        chosen = set(result.choice(rng) for _ in range(100))
+
+        self.assertSetEqual(chosen, {2, 4, 6})
+
+    def test_choice_on_empty_raises_error(self):
+        result = AvailableVertices(10)
+
+        with self.assertRaises(IndexError):
+            result.choice()
+
+    def test_copy_is_independent(self):
+        available_vertices = AvailableVertices(10, [1, 2])
+
+        result = available_vertices.copy()
+        result.discard(1)
+
+        self.assertIn(1, available_vertices)
+        self.assertNotIn(1, result)
+
+    def test_route_converts_assigned_set_to_available_vertices(self):
+        route = Route(1, 10000, TestData.distances)
+
+        route.available_vertices = set([company.id for company in TestData.companies])
+
+        self.assertIsInstance(route.available_vertices, AvailableVertices)
+        self.assertEqual(len(route.available_vertices), len(TestData.companies))
@@ -0,0 +1,115 @@
+import random
+import unittest
+
+import numpy as np
+
+from genetic.breeding import (SerialBreeder, attach_array, attach_distance_matrix, get_breeder, get_couple_seed,
+                              share_array, share_distance_matrix)
+from genetic.routes import Route, RoutePart
+
+from .utils import TestData
+
+
+class SharedMemoryTestCase(unittest.TestCase):
+    def test_share_array_gives_view_with_the_same_values(self):
+        array = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+        result = attach_array(*share_array(array))
+
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_array_equal(result, array)
+
+    def test_attach_array_does_not_copy_shared_buffer(self):
+        shared = share_array(np.zeros(4))
+
+        attach_array(*shared)[1] = 5
+
+        self.assertEqual(attach_array(*shared)[1], 5)
+
+    def test_attach_distance_matrix_gives_the_same_matrix(self):
+        result = attach_distance_matrix(share_distance_matrix(TestData.distances))
+
+        np.testing.assert_array_equal(result.distances, TestData.distances.distances)
+        np.testing.assert_array_equal(result.nearest, TestData.distances.nearest)
+        np.testing.assert_array_equal(result.most_profitable, TestData.distances.most_profitable)
+
+
+class CoupleSeedTestCase(unittest.TestCase):
+    def test_get_couple_seed_is_deterministic(self):
+        self.assertEqual(get_couple_seed(1, 2, 3), get_couple_seed(1, 2, 3))
+
+    def test_get_couple_seed_differs_for_different_couples(self):
+        seeds = set(get_couple_seed(1, generation, index) for generation in range(5) for index in range(5))
+
+        self.assertEqual(len(seeds), 25)
+
+
+class BreederTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.company_ids = [company.id for company in TestData.companies]
+
+    def __prepare_route(self, companies):
+        route = Route(1, 10000, TestData.distances)
+        route.available_vertices = set(self.company_ids)
+        route.vertices_ids = TestData.vertex_ids
+        route.add_route_part(RoutePart([TestData.depots[0]] + list(companies) + [TestData.depots[0]]))
+
+        return route
+
+    def __prepare_packed_couples(self):
+        random.seed(0)
+        packed = list()
+        for i in range(4):
+            first = random.sample(TestData.companies, 4)
+            second = random.sample(TestData.companies, 5)
+            packed.append([[self.__prepare_route(first), self.__prepare_route(second)], 1, 0.5])
+
+        return packed
+
+    def __breed(self, workers):
+        with get_breeder(TestData.distances, TestData.vertex_ids, self.company_ids, workers, seed=1) as breeder:
+            return breeder.breed(self.__prepare_packed_couples(), 1)
+
+    def test_get_breeder_without_workers_gives_serial_breeder(self):
+        breeder = get_breeder(TestData.distances, TestData.vertex_ids, self.company_ids)
+
+        self.assertIs(type(breeder), SerialBreeder)
+
+    def test_breed_gives_two_children_for_each_couple(self):
+        result = self.__breed(2)
+
+        expected_length = 8
+        self.assertEqual(len(result), expected_length)
+
+    def test_breed_gives_children_with_consistent_distance_and_profit(self):
+        for child in self.__breed(2):
+            route_part = child.get_route_part(0)
+            route_part_copy = RoutePart(list(route_part.route))
+            child.recount_route_part(route_part_copy)
+
+            self.assertAlmostEqual(route_part.distance, route_part_copy.distance)
+            self.assertLessEqual(child.distance, child.max_distance)
+            child.check_profit()
+
+    def test_breed_gives_the_same_children_for_different_number_of_workers(self):
+        result = [[[vertex.id for vertex in child.get_route_part(0).route] for child in self.__breed(workers)]
+                  for workers in (1, 3)]
+
+        self.assertListEqual(result[0], result[1])
+
+    def test_breed_with_seed_gives_the_same_children_in_serial_and_parallel_breeder(self):
+        result = [[[vertex.id for vertex in child.get_route_part(0).route] for child in self.__breed(workers)]
+                  for workers in (0, 2)]
+
+        self.assertListEqual(result[0], result[1])
+
+    def test_breed_with_seed_in_serial_breeder_keeps_state_of_random_generator(self):
+        packed = self.__prepare_packed_couples()
+        expected = random.random()
+        random.seed(0)
+        self.__prepare_packed_couples()
+
+        with get_breeder(TestData.distances, TestData.vertex_ids, self.company_ids, seed=1) as breeder:
+            breeder.breed(packed, 1)
+
+        self.assertEqual(random.random(), expected)
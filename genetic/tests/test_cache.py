@@ -0,0 +1,148 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import redis
+
+from genetic import distances
+from genetic.cache import DistanceCache, LocalDistanceCache, RedisDistanceCache, get_coords_key
+
+from .utils import TestData
+
+
+class LocalDistanceCacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.coords = distances.get_coords_array(list(TestData.depots + TestData.companies + TestData.hotels))
+        self.counted_cells = 0
+
+    def __count_distances(self, origins, destinations):
+        self.counted_cells += len(origins) * len(destinations)
+        return distances.count_haversine_distances(origins, destinations)
+
+    def test_get_distances_gives_the_same_matrix_as_counting_without_cache(self):
+        cache = LocalDistanceCache()
+
+        result = cache.get_distances(self.coords, self.__count_distances)
+
+        np.testing.assert_allclose(result, distances.count_haversine_distances(self.coords))
+
+    def test_get_distances_for_the_same_vertices_does_not_count_distances_again(self):
+        cache = LocalDistanceCache()
+        cache.get_distances(self.coords, self.__count_distances)
+        self.counted_cells = 0
+
+        result = cache.get_distances(self.coords, self.__count_distances)
+
+        self.assertEqual(self.counted_cells, 0)
+        self.assertEqual(cache.hits, len(self.coords))
+        self.assertEqual(cache.misses, len(self.coords))
+        np.testing.assert_allclose(result, distances.count_haversine_distances(self.coords))
+
+    def test_get_distances_with_new_vertex_counts_only_its_row_and_column(self):
+        cache = LocalDistanceCache()
+        cache.get_distances(self.coords[:-1], self.__count_distances)
+        self.counted_cells = 0
+
+        result = cache.get_distances(self.coords, self.__count_distances)
+
+        expected_counted_cells = len(self.coords) * 2
+        self.assertEqual(self.counted_cells, expected_counted_cells)
+        np.testing.assert_allclose(result, distances.count_haversine_distances(self.coords))
+
+    def test_get_distances_with_vertices_cached_separately_counts_only_missing_pairs(self):
+        cache = LocalDistanceCache()
+        cache.get_distances(self.coords[:5], self.__count_distances)
+        cache.get_distances(self.coords[5:], self.__count_distances)
+        self.counted_cells = 0
+
+        result = cache.get_distances(self.coords, self.__count_distances)
+
+        expected_counted_cells = len(self.coords) ** 2
+        self.assertEqual(self.counted_cells, expected_counted_cells)
+        np.testing.assert_allclose(result, distances.count_haversine_distances(self.coords))
+
+    def test_set_rows_evicts_least_recently_used_rows(self):
+        cache = LocalDistanceCache(max_rows=2)
+
+        cache.set_rows({'a': {'a': 0}, 'b': {'b': 0}})
+        cache.get_rows(['a'], ['a'])
+        cache.set_rows({'c': {'c': 0}})
+
+        self.assertListEqual(list(cache.rows.keys()), ['a', 'c'])
+
+    def test_cache_with_path_is_persisted_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'distances.sqlite3')
+            LocalDistanceCache(path).get_distances(self.coords, self.__count_distances)
+            self.counted_cells = 0
+
+            cache = LocalDistanceCache(path)
+            cache.get_distances(self.coords, self.__count_distances)
+
+            self.assertEqual(self.counted_cells, 0)
+            self.assertIn(get_coords_key(self.coords[0]), cache.rows)
+
+
+    def test_cache_with_path_merges_rows_saved_by_other_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'distances.sqlite3')
+            first, second = LocalDistanceCache(path), LocalDistanceCache(path)
+
+            first.set_rows({'a': {'a': 0, 'b': 1}})
+            second.set_rows({'a': {'c': 2}, 'b': {'b': 0}})
+
+            result = LocalDistanceCache(path).get_rows(['a', 'b'], ['a', 'b', 'c'])
+
+        self.assertListEqual(result, [[0, 1, 2], [None, 0, None]])
+
+    def test_cache_with_path_evicts_the_oldest_saved_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'distances.sqlite3')
+            cache = LocalDistanceCache(path, max_rows=2)
+
+            for key in ('a', 'b', 'c'):
+                cache.set_rows({key: {key: 0}})
+                time.sleep(0.01)
+
+            result = LocalDistanceCache(path).get_rows(['a', 'b', 'c'], ['a', 'b', 'c'])
+
+        self.assertListEqual(result, [[None, None, None], [None, 0, None], [None, None, 0]])
+
+class RedisDistanceCacheTestCase(unittest.TestCase):
+    def test_get_distances_when_redis_is_not_available_counts_all_distances(self):
+        coords = distances.get_coords_array(list(TestData.depots + TestData.companies))
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        cache = RedisDistanceCache(redis.Redis(port=port, socket_connect_timeout=1))
+
+        result = cache.get_distances(coords, distances.count_haversine_distances)
+
+        np.testing.assert_allclose(result, distances.count_haversine_distances(coords))
+
+
+    def test_set_rows_drops_rows_with_more_than_max_columns(self):
+        client = mock.MagicMock()
+        pipeline = client.pipeline.return_value
+        pipeline.execute.side_effect = [[3, True, 3, 1, True, 1, 2, 2], [1, 1]]
+        cache = RedisDistanceCache(client, prefix='test', max_columns=2, ttl=60)
+
+        cache.set_rows({'a': {'a': 0, 'b': 1, 'c': 2}, 'b': {'b': 0}})
+
+        pipeline.hset.assert_any_call('test:row:a', mapping={'a': 0, 'b': 1, 'c': 2})
+        pipeline.expire.assert_any_call('test:row:b', 60)
+        pipeline.delete.assert_called_once_with('test:row:a')
+        pipeline.zrem.assert_called_once_with('test:lru', b'a')
+
+class DistanceCacheTestCase(unittest.TestCase):
+    def test_cache_without_all_methods_cannot_be_created(self):
+        class IncompleteDistanceCache(DistanceCache):
+            def get_rows(self, keys, columns):
+                return [[None] * len(columns) for _ in keys]
+
+        with self.assertRaises(TypeError):
+            IncompleteDistanceCache()
@@ -0,0 +1,32 @@
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase
+
+from data import utils
+from genetic import routing
+from genetic.consumers import RouteConsumer
+
+
+class RouteConsumerTestCase(TestCase):
+    def test_update_business_trip_message_sends_rendered_text_without_queries(self):
+        consumer = RouteConsumer({'type': 'websocket', 'url_route': {'kwargs': {'business_trip_id': '1'}}})
+        text = utils.render_business_trip_message('SUCCEEDED', {'id': 1})
+        sent = list()
+
+        async def send(text_data=None, bytes_data=None, close=False):
+            sent.append(text_data)
+        consumer.send = send
+
+        with self.assertNumQueries(0):
+            async_to_sync(consumer.update_business_trip_message)({'type': 'update_business_trip_message',
+                                                                  'messageType': 'SUCCEEDED', 'text': text})
+
+        self.assertListEqual(sent, [text])
+
+    def test_connect_to_not_existing_business_trip_is_rejected(self):
+        communicator = WebsocketCommunicator(URLRouter(routing.websocket_urlpatterns), '/ws/business_trip/0/')
+
+        connected, subprotocol = async_to_sync(communicator.connect)()
+
+        self.assertFalse(connected)
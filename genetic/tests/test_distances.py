@@ -0,0 +1,90 @@
+import unittest
+
+import mpu
+import numpy as np
+
+from genetic import distances
+
+from .utils import TestData
+
+
+class DistancesTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.all_vertices = list(TestData.depots + TestData.companies + TestData.hotels)
+
+    def test_count_haversine_distances_gives_the_same_values_as_mpu(self):
+        coords = distances.get_coords_array(self.all_vertices)
+
+        result = distances.count_haversine_distances(coords)
+
+        for i, vertex in enumerate(self.all_vertices):
+            for j, another_vertex in enumerate(self.all_vertices):
+                expected_distance = mpu.haversine_distance(vertex.get_coords(), another_vertex.get_coords())
+                self.assertAlmostEqual(result[i, j], expected_distance, places=9)
+
+    def test_count_haversine_distances_for_different_destinations_gives_correct_shape(self):
+        coords = distances.get_coords_array(self.all_vertices)
+
+        result = distances.count_haversine_distances(coords[:3], coords)
+
+        expected_shape = (3, len(self.all_vertices))
+        self.assertEqual(result.shape, expected_shape)
+        np.testing.assert_allclose(result, distances.count_haversine_distances(coords)[:3])
+
+    def test_count_haversine_distances_gives_zero_on_diagonal(self):
+        coords = distances.get_coords_array(self.all_vertices)
+
+        result = distances.count_haversine_distances(coords)
+
+        np.testing.assert_array_equal(np.diag(result), np.zeros(len(self.all_vertices)))
+
+    def test_count_distances_gives_profits_by_distances_of_destination_vertex(self):
+        distances_matrix, profits_matrix = distances.count_distances(self.all_vertices)
+
+        for i in range(len(self.all_vertices)):
+            for j, another_vertex in enumerate(self.all_vertices):
+                expected_profit = another_vertex.profit / distances_matrix[i, j] if i != j else 0
+                self.assertAlmostEqual(profits_matrix[i, j], expected_profit)
+
+
+class DistanceMatrixTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.all_vertices = list(TestData.depots + TestData.companies + TestData.hotels)
+        self.distance_matrix = distances.DistanceMatrix.from_vertices(self.all_vertices)
+
+    def test_init_stores_contiguous_float_matrices(self):
+        for matrix in (self.distance_matrix.distances, self.distance_matrix.profits_by_distances):
+            self.assertTrue(matrix.flags['C_CONTIGUOUS'])
+            self.assertEqual(matrix.dtype, np.float64)
+
+    def test_init_with_float32_dtype_stores_float32_matrices(self):
+        distance_matrix = distances.DistanceMatrix.from_vertices(self.all_vertices, dtype=np.float32)
+
+        self.assertEqual(distance_matrix.distances.dtype, np.float32)
+        self.assertEqual(distance_matrix.profits_by_distances.dtype, np.float32)
+
+    def test_nearest_gives_vertices_ordered_by_ascending_distance(self):
+        for i, neighbours in enumerate(self.distance_matrix.nearest):
+            row = self.distance_matrix.distances[i, neighbours]
+            self.assertTrue(np.all(np.diff(row) >= 0))
+            self.assertEqual(neighbours[0], i)
+
+    def test_most_profitable_gives_vertices_ordered_by_descending_profit_by_distance(self):
+        for i, neighbours in enumerate(self.distance_matrix.most_profitable):
+            row = self.distance_matrix.profits_by_distances[i, neighbours]
+            self.assertTrue(np.all(np.diff(row) <= 0))
+
+    def test_get_nearest_among_gives_only_given_vertices_ordered_by_distance(self):
+        hotel_ids = list(range(len(TestData.depots + TestData.companies), len(self.all_vertices)))
+
+        result = self.distance_matrix.get_nearest_among(hotel_ids)
+
+        for i, neighbours in enumerate(result):
+            self.assertSetEqual(set(neighbours), set(hotel_ids))
+            self.assertTrue(np.all(np.diff(self.distance_matrix.distances[i, neighbours]) >= 0))
+
+    def test_get_nearest_among_for_no_vertices_gives_empty_rows(self):
+        result = self.distance_matrix.get_nearest_among([])
+
+        expected_shape = (len(self.all_vertices), 0)
+        self.assertEqual(result.shape, expected_shape)
@@ -0,0 +1,53 @@
+import unittest
+
+from genetic.routes import RoutePart
+
+from .utils import TestData
+
+try:
+    import ray
+except ImportError:
+    ray = None
+
+
+@unittest.skipIf(ray is None, 'ray is not installed')
+class RayIslandModelTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        from genetic.distributed import init_ray
+
+        init_ray(num_cpus=2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        ray.shutdown()
+
+    def __get_island_model(self, days):
+        from genetic.distributed import RayIslandModel
+
+        data = dict(depot=TestData.depots[0], companies=list(
+            TestData.companies), hotels=list(TestData.hotels))
+        return RayIslandModel(1, data, 10000, days, islands=2, migration_interval=2, migrants=2, seed=1,
+                              population_size=10, iterations=6)
+
+    def test_run_gives_route_with_consistent_distance_and_profit(self):
+        model = self.__get_island_model(2)
+
+        model.generate_random_routes()
+        model.run()
+
+        route = model.get_best_route()
+        self.assertIs(route.get_route_part(0).route[0], TestData.depots[0])
+        for route_part in route.routes:
+            route_part_copy = RoutePart(list(route_part.route))
+            route.recount_route_part(route_part_copy)
+            self.assertAlmostEqual(route_part.distance, route_part_copy.distance)
+        route.check_profit()
+
+    def test_run_releases_actors(self):
+        model = self.__get_island_model(1)
+
+        model.generate_random_routes()
+        model.run()
+
+        self.assertListEqual(model.actors, [])
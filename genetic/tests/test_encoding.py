@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from genetic.encoding import decode_generation, decode_route, encode_generation, encode_route
+from genetic.routes import Route, RoutePart
+
+from .utils import TestData
+
+
+class EncodingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.company_ids = [company.id for company in TestData.companies]
+
+    def __prepare_route(self, days_companies):
+        route = Route(len(days_companies), 10000, TestData.distances)
+        route.available_vertices = set(self.company_ids)
+
+        for day, companies in enumerate(days_companies):
+            first = TestData.depots[0] if day == 0 else TestData.hotels[0]
+            last = TestData.depots[0] if day == len(days_companies) - 1 else TestData.hotels[0]
+            route.add_route_part(RoutePart([first] + list(companies) + [last]))
+        route.count_profit()
+
+        return route
+
+    def test_encode_route_gives_vertex_ids_and_day_offsets(self):
+        route = self.__prepare_route([TestData.companies[:2], TestData.companies[2:3]])
+
+        result = encode_route(route)
+
+        expected_ids = [vertex.id for route_part in route.routes for vertex in route_part.route]
+        self.assertEqual(result.ids.dtype, np.int32)
+        self.assertListEqual(result.ids.tolist(), expected_ids)
+        self.assertListEqual(result.offsets.tolist(), [0, 4, 7])
+        self.assertEqual(result.days, 2)
+
+    def test_encode_route_caches_distance_and_profit_of_each_day(self):
+        route = self.__prepare_route([TestData.companies[:2], TestData.companies[2:3]])
+
+        result = encode_route(route)
+
+        self.assertListEqual(result.distances.tolist(), [route_part.distance for route_part in route.routes])
+        self.assertListEqual(result.profits.tolist(), [20, 10])
+        self.assertAlmostEqual(result.distance, route.distance)
+        self.assertEqual(result.profit, route.profit)
+
+    def test_decode_route_gives_the_same_route(self):
+        route = self.__prepare_route([TestData.companies[:2], TestData.companies[2:3]])
+
+        result = decode_route(encode_route(route), TestData.vertex_ids, TestData.distances, self.company_ids)
+
+        self.assertListEqual([route_part.route for route_part in result.routes],
+                             [route_part.route for route_part in route.routes])
+        self.assertAlmostEqual(result.distance, route.distance)
+        self.assertEqual(result.profit, route.profit)
+        self.assertSetEqual(set(result.available_vertices), set(route.available_vertices))
+
+    def test_decoded_route_allows_to_add_stops(self):
+        route = self.__prepare_route([TestData.companies[:2]])
+        result = decode_route(encode_route(route), TestData.vertex_ids, TestData.distances, self.company_ids)
+
+        added = result.add_stop(result.get_route_part(0), 1, TestData.companies[5])
+
+        self.assertTrue(added)
+        self.assertNotIn(TestData.companies[5].id, result.available_vertices)
+
+    def test_encode_generation_pads_routes_into_one_block(self):
+        population = [
+            self.__prepare_route([TestData.companies[:3], TestData.companies[3:4]]),
+            self.__prepare_route([TestData.companies[:1], TestData.companies[1:2]]),
+        ]
+
+        result = encode_generation(population)
+
+        self.assertEqual(result.ids.shape, (2, 8))
+        self.assertListEqual(result.ids[1, 6:].tolist(), [-1, -1])
+        self.assertListEqual(result.offsets.tolist(), [[0, 5, 8], [0, 3, 6]])
+
+    def test_decode_generation_gives_the_same_routes(self):
+        population = [
+            self.__prepare_route([TestData.companies[:3], TestData.companies[3:4]]),
+            self.__prepare_route([TestData.companies[:1], TestData.companies[1:2]]),
+        ]
+
+        result = decode_generation(encode_generation(population), TestData.vertex_ids, TestData.distances,
+                                   self.company_ids)
+
+        for decoded, route in zip(result, population):
+            self.assertListEqual([route_part.route for route_part in decoded.routes],
+                                 [route_part.route for route_part in route.routes])
+            self.assertAlmostEqual(decoded.distance, route.distance)
@@ -0,0 +1,62 @@
+import unittest
+from collections import namedtuple
+
+from genetic.generations import GenerationStore
+
+FakeRoute = namedtuple('FakeRoute', ['profit', 'distance'])
+
+
+class GenerationStoreTestCase(unittest.TestCase):
+    def __prepare_routes(self, profits):
+        return [FakeRoute(profit, profit * 10) for profit in profits]
+
+    def test_set_initial_sorts_current_generation_by_descending_profit(self):
+        store = GenerationStore()
+
+        store.set_initial(self.__prepare_routes([10, 30, 20]))
+
+        expected_profits = [30, 20, 10]
+        self.assertListEqual([route.profit for route in store.current], expected_profits)
+        self.assertEqual(store.get_best().profit, 30)
+
+    def test_advance_replaces_current_generation_with_next_one(self):
+        store = GenerationStore()
+        store.set_initial(self.__prepare_routes([10, 20]))
+        next_generation = self.__prepare_routes([5, 40])
+        store.next = list(next_generation)
+
+        store.advance()
+
+        self.assertListEqual(store.current, [next_generation[1], next_generation[0]])
+        self.assertListEqual(store.next, [])
+        self.assertEqual(store.generation, 1)
+
+    def test_history_is_disabled_by_default(self):
+        store = GenerationStore()
+
+        store.set_initial(self.__prepare_routes([10, 20]))
+
+        self.assertIsNone(store.history)
+
+    def test_history_keeps_only_given_number_of_summaries(self):
+        store = GenerationStore(history_size=2)
+        store.set_initial(self.__prepare_routes([10, 20]))
+
+        for profit in (30, 40):
+            store.next = self.__prepare_routes([profit, profit])
+            store.advance()
+
+        expected_generations = [1, 2]
+        self.assertListEqual([summary.generation for summary in store.history], expected_generations)
+        self.assertEqual(store.history[-1].best, 40)
+        self.assertEqual(store.history[-1].mean, 40)
+        self.assertEqual(store.history[-1].diversity, 0.5)
+
+    def test_replace_worst_replaces_the_least_profitable_routes(self):
+        store = GenerationStore()
+        store.set_initial(self.__prepare_routes([10, 20, 30, 40]))
+
+        store.replace_worst(self.__prepare_routes([25, 5]))
+
+        expected_profits = [40, 30, 25, 5]
+        self.assertListEqual([route.profit for route in store.current], expected_profits)
@@ -0,0 +1,119 @@
+import itertools
+import unittest
+
+from genetic import hotels
+from genetic.route_optimizer import RouteOptimizer
+from genetic.routes import Route, RoutePart
+
+from .utils import TestData
+
+
+class AssignHotelsTestCase(unittest.TestCase):
+    def __prepare_route(self, days_companies, max_distance=10000):
+        depot = TestData.depots[0]
+        route = Route(len(days_companies), max_distance, TestData.distances)
+        route.available_vertices = set()
+        route.vertices_ids = TestData.vertex_ids
+
+        for companies in days_companies:
+            route.add_route_part(RoutePart([depot] + list(companies) + [depot]))
+
+        return route
+
+    def __get_candidates(self, k=len(TestData.hotels)):
+        return TestData.distances.get_nearest_among([hotel.id for hotel in TestData.hotels])[:, :k]
+
+    def __count_distance(self, stops):
+        return sum(TestData.count_distance(stops[i], stops[i + 1]) for i in range(len(stops) - 1))
+
+    def __get_best_distance(self, days_companies, max_distance=10000):
+        depot = TestData.depots[0]
+        best = None
+
+        for chosen in itertools.product(TestData.hotels, repeat=len(days_companies) - 1):
+            ends = list(chosen) + [depot]
+            starts = [depot] + list(chosen)
+            distances = [self.__count_distance([start] + list(companies) + [end])
+                         for start, companies, end in zip(starts, days_companies, ends)]
+            if max(distances) <= max_distance and (best is None or sum(distances) < best):
+                best = sum(distances)
+
+        return best
+
+    def test_assign_hotels_gives_minimal_distance(self):
+        days_companies = [TestData.companies[:3], TestData.companies[3:6], TestData.companies[6:]]
+        route = self.__prepare_route(days_companies)
+
+        assigned = hotels.assign_hotels(route, self.__get_candidates(), TestData.depots[0])
+
+        self.assertTrue(assigned)
+        self.assertAlmostEqual(route.distance, self.__get_best_distance(days_companies))
+        route.check_profit()
+
+    def test_assign_hotels_ends_and_starts_consecutive_days_at_the_same_hotel(self):
+        route = self.__prepare_route([TestData.companies[:3], TestData.companies[3:6], TestData.companies[6:]])
+
+        hotels.assign_hotels(route, self.__get_candidates(2), TestData.depots[0])
+
+        self.assertIs(route.get_route_part(0).route[0], TestData.depots[0])
+        self.assertIs(route.get_route_part(0).route[-1], route.get_route_part(1).route[0])
+        self.assertIs(route.get_route_part(1).route[-1], route.get_route_part(2).route[0])
+        self.assertIs(route.get_route_part(2).route[-1], TestData.depots[0])
+        self.assertIn(route.get_route_part(1).route[0], TestData.hotels)
+
+    def test_assign_hotels_keeps_distance_counted_from_stops(self):
+        route = self.__prepare_route([TestData.companies[:4], [], TestData.companies[4:]])
+
+        hotels.assign_hotels(route, self.__get_candidates(2), TestData.depots[0])
+
+        for route_part in route.routes:
+            self.assertAlmostEqual(route_part.distance, self.__count_distance(route_part.route))
+            self.assertAlmostEqual(route_part.distance, route_part.get_segment_distance(0, route_part.length - 1))
+
+    def test_assign_hotels_keeps_distance_limit(self):
+        days_companies = [TestData.companies[:3], TestData.companies[3:6], TestData.companies[6:]]
+        max_distance = 450
+        route = self.__prepare_route(days_companies)
+        route.max_distance = max_distance
+
+        assigned = hotels.assign_hotels(route, self.__get_candidates(), TestData.depots[0])
+
+        best = self.__get_best_distance(days_companies, max_distance)
+        self.assertEqual(assigned, best is not None)
+        if assigned:
+            self.assertAlmostEqual(route.distance, best)
+            for route_part in route.routes:
+                self.assertLessEqual(route_part.distance, max_distance)
+
+    def test_assign_hotels_without_feasible_hotels_does_not_change_route(self):
+        route = self.__prepare_route([TestData.companies[:3], TestData.companies[3:6]])
+        stops = [list(route_part.route) for route_part in route.routes]
+        route.max_distance = 1
+
+        assigned = hotels.assign_hotels(route, self.__get_candidates(), TestData.depots[0])
+
+        self.assertFalse(assigned)
+        self.assertListEqual([route_part.route for route_part in route.routes], stops)
+
+    def test_assign_hotels_for_one_day_does_not_change_route(self):
+        route = self.__prepare_route([TestData.companies[:3]])
+        stops = list(route.get_route_part(0).route)
+
+        self.assertTrue(hotels.assign_hotels(route, self.__get_candidates(), TestData.depots[0]))
+        self.assertListEqual(route.get_route_part(0).route, stops)
+
+
+class GeneratedRoutesHotelsTestCase(unittest.TestCase):
+    def test_generate_random_routes_chains_days_by_hotels(self):
+        data = dict(depot=TestData.depots[0], companies=list(
+            TestData.companies), hotels=list(TestData.hotels))
+        ro = RouteOptimizer(1, data, 1000, 3, population_size=10, seeding_rate=0.2, hotel_candidates=2)
+
+        ro.generate_random_routes()
+
+        for route in ro.population.current:
+            for evening, morning in zip(route.routes[:-1], route.routes[1:]):
+                self.assertIs(evening.route[-1], morning.route[0])
+                self.assertIn(morning.route[0], TestData.hotels)
+            for route_part in route.routes:
+                self.assertLessEqual(route_part.distance, 1000)
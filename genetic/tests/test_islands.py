@@ -0,0 +1,49 @@
+import unittest
+
+from genetic.islands import IslandModel, get_island_seed
+from genetic.routes import RoutePart
+
+from .utils import TestData
+
+
+class IslandModelTestCase(unittest.TestCase):
+    def __get_island_model(self, days, islands=2):
+        data = dict(depot=TestData.depots[0], companies=list(
+            TestData.companies), hotels=list(TestData.hotels))
+        return IslandModel(1, data, 10000, days, islands=islands, migration_interval=2, migrants=2, seed=1,
+                           population_size=10, iterations=6)
+
+    def test_get_island_seed_differs_for_different_islands(self):
+        self.assertNotEqual(get_island_seed(1, 0), get_island_seed(1, 1))
+
+    def test_run_gives_route_starting_and_stopping_at_depot(self):
+        model = self.__get_island_model(2)
+
+        model.generate_random_routes()
+        model.run()
+
+        route = model.get_best_route()
+        self.assertIs(route.get_route_part(0).route[0], TestData.depots[0])
+        self.assertIs(route.get_route_part(1).route[-1], TestData.depots[0])
+
+    def test_run_gives_route_with_consistent_distance_and_profit(self):
+        model = self.__get_island_model(2)
+
+        model.generate_random_routes()
+        model.run()
+
+        route = model.get_best_route()
+        for route_part in route.routes:
+            route_part_copy = RoutePart(list(route_part.route))
+            route.recount_route_part(route_part_copy)
+            self.assertAlmostEqual(route_part.distance, route_part_copy.distance)
+            self.assertLessEqual(route_part.distance, route.max_distance)
+        route.check_profit()
+
+    def test_run_stops_all_islands(self):
+        model = self.__get_island_model(1, islands=3)
+
+        model.generate_random_routes()
+        model.run()
+
+        self.assertTrue(all(not process.is_alive() for process in model.processes))
@@ -0,0 +1,114 @@
+import time
+import unittest
+
+from genetic import local_search
+from genetic.routes import Route, RoutePart
+
+from .utils import TestData
+
+
+class LocalSearchTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        Route.debug = True
+
+    def tearDown(self) -> None:
+        Route.debug = False
+
+    def __prepare_route(self, days_companies, max_distance=10000):
+        route = Route(len(days_companies), max_distance, TestData.distances)
+        route.available_vertices = set([company.id for company in TestData.companies])
+        route.vertices_ids = TestData.vertex_ids
+
+        for day, companies in enumerate(days_companies):
+            first = TestData.depots[0] if day == 0 else TestData.hotels[0]
+            last = TestData.depots[0] if day == len(days_companies) - 1 else TestData.hotels[0]
+            route.add_route_part(RoutePart([first] + list(companies) + [last]))
+
+        return route
+
+    def __assert_route_is_consistent(self, route):
+        distance = 0
+        for route_part in route.routes:
+            route_part_copy = RoutePart(list(route_part.route))
+            route.recount_route_part(route_part_copy)
+            self.assertAlmostEqual(route_part.distance, route_part_copy.distance)
+            self.assertLessEqual(route_part.distance, route.max_distance + 1e-9)
+            distance += route_part_copy.distance
+        self.assertAlmostEqual(route.distance, distance)
+        route.check_profit()
+
+    def __get_crossing_companies(self):
+        # c1 and c4 lie on opposite sides of the depot, visiting c4 between them makes crossing edges
+        return [TestData.companies[0], TestData.companies[3], TestData.companies[2], TestData.companies[8]]
+
+    def test_two_opt_shortens_route_part_and_keeps_its_stops(self):
+        route = self.__prepare_route([self.__get_crossing_companies()])
+        route_part = route.get_route_part(0)
+        distance_before = route_part.distance
+        stops_before = set(route_part.route)
+
+        changed = local_search.two_opt(route, route_part)
+
+        self.assertTrue(changed)
+        self.assertLess(route_part.distance, distance_before)
+        self.assertSetEqual(set(route_part.route), stops_before)
+        self.assertIs(route_part.route[0], TestData.depots[0])
+        self.assertIs(route_part.route[-1], TestData.depots[0])
+        self.__assert_route_is_consistent(route)
+
+    def test_two_opt_does_not_change_optimal_route_part(self):
+        route = self.__prepare_route([TestData.companies[2:3]])
+
+        changed = local_search.two_opt(route, route.get_route_part(0))
+
+        self.assertFalse(changed)
+
+    def test_or_opt_does_not_lengthen_route_and_keeps_profit(self):
+        route = self.__prepare_route([TestData.companies[:4], TestData.companies[4:8]])
+        distance_before = route.distance
+        profit_before = route.profit
+
+        local_search.or_opt(route)
+
+        self.assertLessEqual(route.distance, distance_before + 1e-9)
+        self.assertEqual(route.profit, profit_before)
+        self.__assert_route_is_consistent(route)
+
+    def test_greedy_insertion_inserts_all_companies_without_distance_limit(self):
+        route = self.__prepare_route([TestData.companies[:1]])
+
+        changed = local_search.greedy_insertion(route)
+
+        self.assertTrue(changed)
+        self.assertEqual(len(route.available_vertices), 0)
+        self.__assert_route_is_consistent(route)
+
+    def test_greedy_insertion_keeps_distance_limit(self):
+        route = self.__prepare_route([TestData.companies[:1]])
+        route.max_distance = route.distance + 100
+
+        local_search.greedy_insertion(route)
+
+        self.assertLessEqual(route.distance, route.max_distance + 1e-9)
+        self.__assert_route_is_consistent(route)
+
+    def test_improve_population_with_exceeded_time_cap_does_not_change_routes(self):
+        route = self.__prepare_route([self.__get_crossing_companies()])
+        distance_before = route.distance
+
+        result = local_search.improve_population([route], time_cap=0)
+
+        expected_changed = 0
+        self.assertEqual(result, expected_changed)
+        self.assertEqual(route.distance, distance_before)
+
+    def test_improve_population_improves_all_routes(self):
+        routes = [self.__prepare_route([self.__get_crossing_companies()]) for i in range(2)]
+
+        start = time.monotonic()
+        result = local_search.improve_population(routes, time_cap=60)
+
+        self.assertEqual(result, 2)
+        self.assertLess(time.monotonic() - start, 60)
+        for route in routes:
+            self.__assert_route_is_consistent(route)
@@ -0,0 +1,125 @@
+import math
+import socket
+import unittest
+
+import numpy as np
+
+from genetic import distances
+from genetic.cache import LocalDistanceCache, get_coords_key
+from genetic.providers import DistanceProvider, HaversineDistanceProvider, OSRMDistanceProvider
+
+from .osrm_stub import ROAD_FACTOR, SPEED, OSRMStubServer
+from .utils import TestData
+
+
+class OSRMDistanceProviderTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.coords = distances.get_coords_array(list(TestData.depots + TestData.companies + TestData.hotels))
+        self.haversine = distances.count_haversine_distances(self.coords)
+
+    def __get_closed_port_url(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return 'http://127.0.0.1:%d' % sock.getsockname()[1]
+
+    def test_get_distances_gives_road_distances_in_kilometres(self):
+        with OSRMStubServer() as server:
+            provider = OSRMDistanceProvider(server.url)
+
+            result = provider.get_distances(self.coords)
+
+        np.testing.assert_allclose(result, self.haversine * ROAD_FACTOR, rtol=1e-6)
+
+    def test_get_distances_splits_matrix_into_tiles(self):
+        max_table_size = 8
+        with OSRMStubServer(max_table_size=max_table_size) as server:
+            provider = OSRMDistanceProvider(server.url, max_table_size=max_table_size)
+
+            result = provider.get_distances(self.coords)
+
+        expected_requests = math.ceil(len(self.coords) / (max_table_size // 2)) ** 2
+        self.assertEqual(len(server.requests), expected_requests)
+        np.testing.assert_allclose(result, self.haversine * ROAD_FACTOR, rtol=1e-6)
+
+    def test_get_distances_of_many_vertices_does_not_exceed_default_table_size_of_server(self):
+        random_state = np.random.RandomState(0)
+        coords = np.column_stack((random_state.uniform(49.0, 54.8, 120), random_state.uniform(14.1, 24.1, 120)))
+
+        with OSRMStubServer() as server:
+            result = OSRMDistanceProvider(server.url).get_distances(coords)
+
+        np.testing.assert_allclose(result, distances.count_haversine_distances(coords) * ROAD_FACTOR, rtol=1e-6)
+
+    def test_get_durations_when_server_is_not_available_gives_fallback_travel_times(self):
+        provider = OSRMDistanceProvider(self.__get_closed_port_url(), timeout=1, fallback_speed=60)
+
+        result = provider.get_durations(self.coords)
+
+        np.testing.assert_allclose(result, self.haversine * 60)
+
+    def test_get_durations_gives_travel_times_in_seconds(self):
+        with OSRMStubServer() as server:
+            provider = OSRMDistanceProvider(server.url, max_table_size=10)
+
+            result = provider.get_durations(self.coords)
+
+        np.testing.assert_allclose(result, self.haversine * ROAD_FACTOR / SPEED, rtol=1e-6)
+
+    def test_get_distances_with_cache_does_not_request_server_for_the_same_vertices_again(self):
+        with OSRMStubServer() as server:
+            provider = OSRMDistanceProvider(server.url, distance_cache=LocalDistanceCache())
+            provider.get_distances(self.coords)
+            requests_before = len(server.requests)
+
+            result = provider.get_distances(self.coords)
+
+        self.assertEqual(len(server.requests), requests_before)
+        np.testing.assert_allclose(result, self.haversine * ROAD_FACTOR, rtol=1e-6)
+
+    def test_get_distances_when_server_is_not_available_gives_fallback_distances(self):
+        provider = OSRMDistanceProvider(self.__get_closed_port_url(), timeout=1)
+
+        result = provider.get_distances(self.coords)
+
+        np.testing.assert_allclose(result, self.haversine)
+
+    def test_get_distances_when_server_is_not_available_does_not_cache_fallback_distances(self):
+        distance_cache = LocalDistanceCache()
+        provider = OSRMDistanceProvider(self.__get_closed_port_url(), distance_cache=distance_cache, timeout=1)
+
+        provider.get_distances(self.coords)
+
+        self.assertDictEqual(dict(distance_cache.rows), dict())
+
+    def test_get_distances_gives_fallback_distances_of_unreachable_pairs_without_caching_them(self):
+        max_distance = np.median(self.haversine * ROAD_FACTOR)
+        unreachable = self.haversine * ROAD_FACTOR > max_distance
+        distance_cache = LocalDistanceCache()
+
+        with OSRMStubServer(max_distance=max_distance) as server:
+            provider = OSRMDistanceProvider(server.url, distance_cache=distance_cache)
+            result = provider.get_distances(self.coords)
+
+        np.testing.assert_allclose(result, np.where(unreachable, self.haversine, self.haversine * ROAD_FACTOR),
+                                   rtol=1e-6)
+        cached = distance_cache.get_matrix([get_coords_key(vertex_coords) for vertex_coords in self.coords])
+        self.assertTrue(np.isinf(cached[unreachable]).all())
+
+
+class DistanceProviderTestCase(unittest.TestCase):
+    def test_provider_without_count_distances_cannot_be_created(self):
+        class IncompleteDistanceProvider(DistanceProvider):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteDistanceProvider()
+
+
+class HaversineDistanceProviderTestCase(unittest.TestCase):
+    def test_get_distances_gives_straight_line_distances(self):
+        coords = distances.get_coords_array(list(TestData.companies))
+        provider = HaversineDistanceProvider()
+
+        result = provider.get_distances(coords)
+
+        np.testing.assert_allclose(result, distances.count_haversine_distances(coords))
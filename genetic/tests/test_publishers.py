@@ -0,0 +1,106 @@
+import threading
+import time
+import unittest
+
+from genetic import publishers
+from genetic.route_optimizer import RouteObserver
+
+
+class ProgressPublisherTestCase(unittest.TestCase):
+    def __prepare_publisher(self, interval=0.05, delay=0, **kwargs):
+        sent = list()
+
+        def send(business_trip_id, message_type, message):
+            time.sleep(delay)
+            sent.append((business_trip_id, message_type, message))
+
+        return publishers.ProgressPublisher(1, interval=interval, send=send, **kwargs), sent
+
+    def test_close_sends_the_latest_message_of_each_type(self):
+        publisher, sent = self.__prepare_publisher(interval=10)
+
+        for i in range(100):
+            publisher.publish('PROCESSING', i)
+        publisher.publish('IMPROVED', 'route')
+        publisher.close()
+
+        self.assertEqual(sent[-1][1:], ('IMPROVED', 'route'))
+        self.assertIn((1, 'PROCESSING', 99), sent)
+        self.assertLessEqual(len(sent), 3)
+
+    def test_publish_does_not_wait_for_send(self):
+        publisher, sent = self.__prepare_publisher(delay=0.2)
+
+        start = time.perf_counter()
+        for i in range(1000):
+            publisher.publish('PROCESSING', i)
+        elapsed = time.perf_counter() - start
+        publisher.close()
+
+        self.assertLess(elapsed, 0.2)
+        self.assertEqual(sent[-1][2], 999)
+
+    def test_messages_are_sent_at_most_once_per_interval(self):
+        publisher, sent = self.__prepare_publisher(interval=0.1)
+
+        deadline = time.monotonic() + 0.35
+        i = 0
+        while time.monotonic() < deadline:
+            publisher.publish('PROCESSING', i)
+            i += 1
+        publisher.close()
+
+        # the first message is sent at once, then one per interval and the last one on close
+        self.assertLessEqual(len(sent), 6)
+        self.assertEqual(sent[-1][2], i - 1)
+
+    def test_full_queue_drops_the_oldest_type(self):
+        publisher, sent = self.__prepare_publisher(interval=10, queue_size=2)
+        blocked = threading.Event()
+
+        def send(*args):
+            blocked.wait()
+            sent.append(args)
+        publisher.send = send
+
+        publisher.publish('A', 1)
+        time.sleep(0.05)
+        for message_type in ('B', 'C', 'D'):
+            publisher.publish(message_type, 1)
+        blocked.set()
+        publisher.close()
+
+        self.assertListEqual([message_type for business_trip_id, message_type, message in sent], ['A', 'C', 'D'])
+        self.assertEqual(publisher.dropped, 1)
+
+    def test_close_without_messages_does_not_start_thread(self):
+        publisher, sent = self.__prepare_publisher()
+
+        publisher.close()
+
+        self.assertIsNone(publisher.thread)
+        self.assertListEqual(sent, [])
+
+
+    def test_close_twice_sends_waiting_messages_once(self):
+        publisher, sent = self.__prepare_publisher(interval=10)
+
+        publisher.publish('PROCESSING', 1)
+        publisher.close()
+        publisher.close()
+
+        self.assertListEqual(sent, [(1, 'PROCESSING', 1)])
+
+
+class RouteObserverTestCase(unittest.TestCase):
+    def test_increment_publishes_changed_progress(self):
+        sent = list()
+        publisher = publishers.ProgressPublisher(1, interval=10, send=lambda *args: sent.append(args))
+        observer = RouteObserver(1, 1000, publisher=publisher)
+
+        for _ in range(1000):
+            observer.increment()
+        observer.close()
+
+        self.assertEqual(publisher.published, 101)
+        self.assertEqual(sent[-1], (1, 'PROCESSING', {'value': 1.0}))
@@ -1,10 +1,28 @@
+import time
 import unittest
+from unittest import mock
 
-from genetic.route_optimizer import RouteOptimizer
+from genetic.breeding import SerialBreeder
+from genetic.route_optimizer import RouteOptimizer, SilentRouteObserver
 
 from .utils import TestData
 
 
+class RecordingRouteObserver(SilentRouteObserver):
+    def __init__(self, business_trip_id: int, total: int) -> None:
+        super().__init__(business_trip_id, total)
+        self.improved = list()
+
+    def improve(self, route: dict) -> None:
+        self.improved.append(route)
+
+
+class RecordingBreeder(SerialBreeder):
+    def breed(self, packed_couples, generation):
+        self.children = super().breed(packed_couples, generation)
+        return self.children
+
+
 class RouteOptimizerTestCase(unittest.TestCase):
     def setUp(self) -> None:
         pass
@@ -34,11 +52,11 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro = RouteOptimizer(1, data, 10000, days, population_size=1)
         return ro
 
-    def test_init_sets_population_as_a_empty_list(self):
+    def test_init_sets_current_population_as_a_empty_list(self):
         ro = self.__get_route_optimizer_default_object(1)
 
         expected_length = 0
-        self.assertEqual(len(ro.population), expected_length)
+        self.assertEqual(len(ro.population.current), expected_length)
 
     def test_init_distances_length_is_equal_to_sum_of_vertices(self):
         ro = self.__get_route_optimizer_default_object(1)
@@ -69,7 +87,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_distance = 0
-        self.assertLessEqual(ro.population[0][0].distance, expected_distance)
+        self.assertLessEqual(ro.get_best_route().distance, expected_distance)
 
     def test_generate_random_route_for_one_day_has_depot_on_first_element_of_route(self):
         ro = self.__get_route_optimizer_default_object(1)
@@ -77,7 +95,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_first_element = TestData.depots[0]
-        self.assertEqual(ro.population[0][0].get_route_part(
+        self.assertEqual(ro.get_best_route().get_route_part(
             0).route[0], expected_first_element)
 
     def test_generate_random_route_for_one_day_has_depot_on_last_element_of_route(self):
@@ -86,7 +104,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_last_element = TestData.depots[0]
-        self.assertEqual(ro.population[0][0].get_route_part(
+        self.assertEqual(ro.get_best_route().get_route_part(
             0).route[-1], expected_last_element)
 
     def test_generate_random_route_for_one_day_has_n_additional_companies_in_route(self):
@@ -97,7 +115,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         expected_route_length = min(
             3*ro.generate_tries, len(TestData.companies)) + 2
         self.assertEqual(
-            len(ro.population[0][0].get_route_part(0).route), expected_route_length)
+            len(ro.get_best_route().get_route_part(0).route), expected_route_length)
 
     def test_generate_random_route_for_one_day_creates_a_population_with_only_one_route(self):
         ro = self.__get_route_optimizer_default_object(1)
@@ -105,7 +123,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_population_length = 1
-        self.assertEqual(len(ro.population[0]), expected_population_length)
+        self.assertEqual(len(ro.population.current), expected_population_length)
 
     def test_generate_random_route_for_one_day_has_no_duplicated_companies_in_route(self):
         ro = self.__get_route_optimizer_default_object(1)
@@ -113,10 +131,10 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         route_set_length = len(
-            set(ro.population[0][0].get_route_part(0).route))
+            set(ro.get_best_route().get_route_part(0).route))
         expected_route_length = route_set_length + 1
         self.assertEqual(
-            len(ro.population[0][0].get_route_part(0).route), expected_route_length)
+            len(ro.get_best_route().get_route_part(0).route), expected_route_length)
 
     def test_generate_random_route_for_one_day_has_correct_profit(self):
         ro = self.__get_route_optimizer_with_only_one_possible_company(1)
@@ -124,7 +142,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_profit = TestData.companies[0].profit
-        self.assertEqual(ro.population[0][0].profit, expected_profit)
+        self.assertEqual(ro.get_best_route().profit, expected_profit)
 
     def test_generate_random_route_for_two_days_has_route_part_distances_less_than_equal_max_distance(self):
         ro = self.__get_route_optimizer_with_no_companies_possible(2)
@@ -132,7 +150,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         maximum_value = 0
-        for route_part in ro.population[0][0].routes:
+        for route_part in ro.get_best_route().routes:
             self.assertLessEqual(route_part.distance, maximum_value)
 
     def test_generate_random_route_for_two_days_has_depot_on_first_element_of_first_route_part(self):
@@ -141,7 +159,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_first_element = TestData.depots[0]
-        first_element_of_first_route_part = ro.population[0][0].get_route_part(
+        first_element_of_first_route_part = ro.get_best_route().get_route_part(
             0).route[0]
         self.assertEqual(first_element_of_first_route_part,
                          expected_first_element)
@@ -152,7 +170,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_last_element = TestData.depots[0]
-        last_element_of_second_route_part = ro.population[0][0].get_route_part(
+        last_element_of_second_route_part = ro.get_best_route().get_route_part(
             1).route[-1]
         self.assertEqual(last_element_of_second_route_part,
                          expected_last_element)
@@ -171,8 +189,8 @@ class RouteOptimizerTestCase(unittest.TestCase):
 
         ro.generate_random_routes()
 
-        first_route_part_route = ro.population[0][0].get_route_part(0).route
-        second_route_part_route = ro.population[0][0].get_route_part(1).route
+        first_route_part_route = ro.get_best_route().get_route_part(0).route
+        second_route_part_route = ro.get_best_route().get_route_part(1).route
         route_length = len(
             first_route_part_route[1:-1] + second_route_part_route[1:-1]) + 4
         expected_route_length = len(
@@ -185,7 +203,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         maximum_value = 0
-        for route_part in ro.population[0][0].routes:
+        for route_part in ro.get_best_route().routes:
             self.assertLessEqual(route_part.distance, maximum_value)
 
     # def test_generate_random_route_for_more_than_two_days_has_the_common_hotels_where_stopping_and_starting(self):
@@ -202,7 +220,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_start_element = TestData.depots[0]
-        self.assertEqual(ro.population[0][0].get_route_part(
+        self.assertEqual(ro.get_best_route().get_route_part(
             0).route[0], expected_start_element)
 
     def test_generate_random_route_for_more_than_two_days_stops_at_depot(self):
@@ -211,7 +229,7 @@ class RouteOptimizerTestCase(unittest.TestCase):
         ro.generate_random_routes()
 
         expected_stop_element = TestData.depots[0]
-        self.assertEqual(ro.population[0][0].get_route_part(
+        self.assertEqual(ro.get_best_route().get_route_part(
             2).route[-1], expected_stop_element)
 
     # run
@@ -251,3 +269,132 @@ class RouteOptimizerTestCase(unittest.TestCase):
     #     expected_population_length = 20
     #     for pop in ro.population:
     #         self.assertEqual(len(pop), expected_population_length)
+
+    def test_run_keeps_population_size_of_current_generation(self):
+        ro = self.__get_route_optimizer_default_object(1, pop_size=20)
+        ro.iterations = 2
+
+        ro.generate_random_routes()
+        ro.run()
+
+        expected_population_length = 20
+        self.assertEqual(len(ro.population.current), expected_population_length)
+        self.assertListEqual(ro.population.next, [])
+
+    def test_run_gives_the_most_profitable_route_as_best_route(self):
+        ro = self.__get_route_optimizer_default_object(1, pop_size=20)
+        ro.iterations = 2
+
+        ro.generate_random_routes()
+        ro.run()
+
+        expected_profit = max(route.profit for route in ro.population.current)
+        self.assertEqual(ro.get_best_route().profit, expected_profit)
+
+    def test_step_with_local_search_improves_the_most_profitable_children(self):
+        ro = self.__get_route_optimizer_default_object(1, pop_size=20)
+        ro.local_search_time = 1
+        ro.generate_random_routes()
+        breeder = RecordingBreeder()
+
+        with mock.patch('genetic.route_optimizer.local_search.improve_population') as improve_population:
+            ro.step(breeder, 1)
+
+        expected_routes = sorted(breeder.children, key=lambda x: x.profit, reverse=True)[:2]
+        self.assertListEqual(improve_population.call_args[0][0], expected_routes)
+
+    def test_init_closes_observer_when_counting_distances_fails(self):
+        data = dict(depot=TestData.depots[0], companies=list(TestData.companies), hotels=list(TestData.hotels))
+
+        with mock.patch('genetic.route_optimizer.publishers.ProgressPublisher') as publisher, \
+                mock.patch('genetic.route_optimizer.distances.DistanceMatrix.from_vertices', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                RouteOptimizer(1, data, 10000, 1)
+
+        publisher.return_value.close.assert_called_once_with()
+
+    def test_exit_closes_observer_when_generating_routes_fails(self):
+        with mock.patch('genetic.route_optimizer.publishers.ProgressPublisher') as publisher:
+            ro = self.__get_route_optimizer_default_object(1)
+
+            with self.assertRaises(ValueError), ro, \
+                    mock.patch.object(ro, 'generate_random_routes', side_effect=ValueError):
+                ro.generate_random_routes()
+
+        publisher.return_value.close.assert_called_once_with()
+
+    def test_run_with_workers_keeps_population_size_of_current_generation(self):
+        data = dict(depot=TestData.depots[0], companies=list(
+            TestData.companies), hotels=list(TestData.hotels))
+        ro = RouteOptimizer(1, data, 10000, 2, population_size=20, iterations=2, workers=2, seed=1)
+
+        ro.generate_random_routes()
+        ro.run()
+
+        expected_population_length = 20
+        self.assertEqual(len(ro.population.current), expected_population_length)
+
+
+class TimeBudgetTestCase(unittest.TestCase):
+    def __get_route_optimizer(self, **kwargs):
+        data = dict(depot=TestData.depots[0], companies=list(
+            TestData.companies), hotels=list(TestData.hotels))
+        return RouteOptimizer(1, data, 10000, 2, population_size=10, observer_class=RecordingRouteObserver, **kwargs)
+
+    def test_run_with_exceeded_time_budget_stops_after_first_iteration(self):
+        ro = self.__get_route_optimizer(iterations=100, time_budget=0)
+
+        ro.generate_random_routes()
+        ro.run()
+
+        expected_generation = 1
+        self.assertEqual(ro.population.generation, expected_generation)
+        self.assertIsNotNone(ro.get_best_route())
+
+    def test_time_budget_is_counted_from_creation_of_optimizer(self):
+        start = time.monotonic()
+        ro = self.__get_route_optimizer(time_budget=60)
+
+        self.assertLessEqual(ro.deadline, start + 60 + (time.monotonic() - start))
+        self.assertGreaterEqual(ro.deadline, start + 60)
+
+    def test_generate_random_routes_with_exceeded_time_budget_keeps_population_size(self):
+        ro = self.__get_route_optimizer(time_budget=0, seeding_rate=0.5)
+
+        ro.generate_random_routes()
+
+        expected_population_length = 10
+        self.assertEqual(len(ro.population.current), expected_population_length)
+        for route in ro.population.current:
+            self.assertEqual(route.profit, 0)
+
+    def test_run_publishes_the_best_route_of_initial_population(self):
+        ro = self.__get_route_optimizer(iterations=1, time_budget=0)
+
+        ro.generate_random_routes()
+        initial_profit = ro.get_best_route().profit
+        ro.run()
+
+        self.assertEqual(ro.observer.improved[0]['profit'], initial_profit)
+        self.assertEqual(len(ro.observer.improved[0]['routes']), 2)
+
+    def test_publish_best_route_skips_route_which_is_not_more_profitable(self):
+        ro = self.__get_route_optimizer(publish_interval=0)
+        ro.generate_random_routes()
+        route = ro.get_best_route()
+
+        published = [ro.publish_best_route(route), ro.publish_best_route(route)]
+
+        self.assertListEqual(published, [True, False])
+        self.assertEqual(len(ro.observer.improved), 1)
+
+    def test_publish_best_route_skips_improved_route_before_publish_interval(self):
+        ro = self.__get_route_optimizer(publish_interval=3600)
+        ro.generate_random_routes()
+        routes = sorted(ro.population.current, key=lambda x: x.profit)
+        ro.publish_best_route(routes[0])
+        ro.published_profit = -1
+
+        result = ro.publish_best_route(routes[-1])
+
+        self.assertFalse(result)
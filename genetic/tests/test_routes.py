@@ -828,3 +828,178 @@ class CrossoverTestCase(unittest.TestCase):
 #             route.remove_stop(route_part, random_index)
 #             expected_distance = self.__recount_route(route_part)
 #             self.assertAlmostEqual(route_part.distance, expected_distance)
+
+
+class ProfitTrackingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        Route.debug = True
+
+    def tearDown(self) -> None:
+        Route.debug = False
+
+    def __prepare_route(self, companies):
+        route = Route(1, 10000, TestData.distances)
+        route.available_vertices = set(
+            [company.id for company in TestData.companies])
+        route.add_route_part(RoutePart([TestData.depots[0]] + list(companies) + [TestData.depots[0]]))
+
+        return route
+
+    def test_add_route_part_tracks_profit(self):
+        route = self.__prepare_route(TestData.companies[:3])
+
+        expected_profit = 30
+        self.assertEqual(route.profit, expected_profit)
+
+    def test_add_stop_increases_profit(self):
+        route = self.__prepare_route(TestData.companies[:1])
+
+        route.add_stop(route.get_route_part(0), 1, TestData.companies[1])
+
+        expected_profit = 20
+        self.assertEqual(route.profit, expected_profit)
+
+    def test_remove_stop_decreases_profit(self):
+        route = self.__prepare_route(TestData.companies[:2])
+
+        route.remove_stop(route.get_route_part(0), 1)
+
+        expected_profit = 10
+        self.assertEqual(route.profit, expected_profit)
+
+    def test_remove_stop_of_duplicated_company_does_not_change_profit(self):
+        route = self.__prepare_route([TestData.companies[0], TestData.companies[0]])
+
+        route.remove_stop(route.get_route_part(0), 1)
+
+        expected_profit = 10
+        self.assertEqual(route.profit, expected_profit)
+
+    def test_replace_stop_changes_profit(self):
+        route = self.__prepare_route(TestData.companies[:2])
+
+        route.replace_stop(route.get_route_part(0), 1, TestData.hotels[0])
+
+        expected_profit = 10
+        self.assertEqual(route.profit, expected_profit)
+
+    def test_change_route_part_changes_profit_and_distance(self):
+        route = self.__prepare_route(TestData.companies[:1])
+        new_route = [TestData.depots[0], TestData.companies[1], TestData.companies[2], TestData.depots[0]]
+        new_route_part = RoutePart(list(new_route))
+        route.recount_route_part(new_route_part)
+
+        route.change_route_part(route.get_route_part(0), new_route, new_route_part.distance)
+
+        expected_profit = 20
+        self.assertEqual(route.profit, expected_profit)
+        self.assertAlmostEqual(route.distance, new_route_part.distance)
+
+    def test_check_profit_raises_error_when_stops_are_changed_directly(self):
+        route = self.__prepare_route(TestData.companies[:1])
+
+        route.get_route_part(0).route.insert(1, TestData.companies[1])
+
+        with self.assertRaises(AssertionError):
+            route.check_profit()
+
+    def test_count_profit_recounts_profit_when_stops_are_changed_directly(self):
+        route = self.__prepare_route(TestData.companies[:1])
+        route.get_route_part(0).route.insert(1, TestData.companies[1])
+
+        route.count_profit()
+
+        expected_profit = 20
+        self.assertEqual(route.profit, expected_profit)
+        route.check_profit()
+
+
+class CumulativeDistanceTestCase(unittest.TestCase):
+    def __prepare_route(self, companies):
+        route = Route(1, 10000, TestData.distances)
+        route.available_vertices = set(
+            [company.id for company in TestData.companies])
+        route.add_route_part(RoutePart([TestData.depots[0]] + list(companies) + [TestData.depots[0]]))
+
+        return route
+
+    def __assert_cumulative_is_recounted(self, route_part):
+        expected = [0]
+        for i, vertex in enumerate(route_part.route[1:]):
+            expected.append(expected[-1] + TestData.distances[route_part.route[i].id, vertex.id])
+
+        self.assertEqual(len(route_part.cumulative), len(expected))
+        for result, expected_distance in zip(route_part.cumulative, expected):
+            self.assertAlmostEqual(result, expected_distance)
+        self.assertAlmostEqual(route_part.cumulative[-1], route_part.distance)
+
+    def test_recount_route_counts_cumulative_distances(self):
+        route = self.__prepare_route(TestData.companies[:3])
+
+        self.__assert_cumulative_is_recounted(route.get_route_part(0))
+
+    def test_add_stop_updates_cumulative_distances(self):
+        route = self.__prepare_route(TestData.companies[:3])
+        route_part = route.get_route_part(0)
+
+        route.add_stop(route_part, 2, TestData.companies[4])
+        route.add_stop(route_part, 0, TestData.hotels[0])
+        route.add_stop(route_part, route_part.length, TestData.hotels[1])
+
+        self.__assert_cumulative_is_recounted(route_part)
+
+    def test_remove_stop_updates_cumulative_distances(self):
+        route = self.__prepare_route(TestData.companies[:4])
+        route_part = route.get_route_part(0)
+
+        route.remove_stop(route_part, 2)
+        route.remove_stop(route_part, 0)
+        route.remove_stop(route_part, route_part.length - 1)
+
+        self.__assert_cumulative_is_recounted(route_part)
+
+    def test_replace_stop_updates_cumulative_distances(self):
+        route = self.__prepare_route(TestData.companies[:3])
+        route_part = route.get_route_part(0)
+
+        route.replace_stop(route_part, 2, TestData.companies[5])
+        route.replace_stop(route_part, 0, TestData.hotels[0])
+        route.replace_stop(route_part, route_part.length - 1, TestData.hotels[1])
+
+        self.__assert_cumulative_is_recounted(route_part)
+
+    def test_swap_stops_updates_cumulative_distances(self):
+        route = self.__prepare_route(TestData.companies[:4])
+        route_part = route.get_route_part(0)
+
+        route_part.swap_stops(1, 3)
+
+        expected = RoutePart(list(route_part.route))
+        expected.recount_route(TestData.distances)
+        for result, expected_distance in zip(route_part.cumulative, expected.cumulative):
+            self.assertAlmostEqual(result, expected_distance)
+
+    def test_change_route_part_recounts_cumulative_distances(self):
+        route = self.__prepare_route(TestData.companies[:1])
+        new_route = [TestData.depots[0], TestData.companies[1], TestData.companies[2], TestData.depots[0]]
+        new_route_part = RoutePart(list(new_route))
+        route.recount_route_part(new_route_part)
+
+        route.change_route_part(route.get_route_part(0), new_route, new_route_part.distance)
+
+        self.__assert_cumulative_is_recounted(route.get_route_part(0))
+
+    def test_get_segment_distance_gives_distance_between_stops(self):
+        route = self.__prepare_route(TestData.companies[:4])
+        route_part = route.get_route_part(0)
+
+        result = route_part.get_segment_distance(1, 4)
+
+        expected = sum(TestData.distances[route_part.route[i].id, route_part.route[i + 1].id] for i in range(1, 4))
+        self.assertAlmostEqual(result, expected)
+
+    def test_get_segment_distance_when_distances_are_not_counted_raises_error(self):
+        route_part = RoutePart([TestData.depots[0], TestData.companies[0], TestData.depots[0]])
+
+        with self.assertRaises(ValueError):
+            route_part.get_segment_distance(0, 2)
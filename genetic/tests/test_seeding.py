@@ -0,0 +1,85 @@
+import math
+import unittest
+
+from genetic import seeding
+from genetic.route_optimizer import RouteOptimizer
+from genetic.routes import Route, RoutePart
+
+from .utils import TestData
+
+
+class SweepTestCase(unittest.TestCase):
+    def test_get_sweep_angles_gives_angles_in_full_turn(self):
+        result = seeding.get_sweep_angles(TestData.depots[0], list(TestData.companies))
+
+        self.assertEqual(len(result), len(TestData.companies))
+        self.assertTrue(all(0 <= angle < 2 * math.pi for angle in result))
+
+    def test_get_sweep_sectors_splits_all_companies_into_days(self):
+        result = seeding.get_sweep_sectors(TestData.depots[0], list(TestData.companies), 3)
+
+        self.assertEqual(len(result), 3)
+        self.assertListEqual([len(sector) for sector in result], [3, 3, 3])
+        self.assertSetEqual(set(id for sector in result for id in sector),
+                            set(company.id for company in TestData.companies))
+
+    def test_get_sweep_sectors_from_different_angles_gives_different_sectors(self):
+        result = [seeding.get_sweep_sectors(TestData.depots[0], list(TestData.companies), 3, angle)
+                  for angle in (0, math.pi / 2)]
+
+        self.assertNotEqual(result[0], result[1])
+
+
+class InsertionTestCase(unittest.TestCase):
+    def __prepare_route(self, days, max_distance):
+        route = Route(days, max_distance, TestData.distances)
+        route.available_vertices = set([company.id for company in TestData.companies])
+        route.vertices_ids = TestData.vertex_ids
+        for day in range(days):
+            route.add_route_part(RoutePart([TestData.depots[0], TestData.depots[0]]))
+
+        return route
+
+    def test_insert_by_ratio_keeps_distance_limit(self):
+        route = self.__prepare_route(1, 500)
+
+        seeding.insert_by_ratio(route)
+
+        self.assertGreater(route.get_route_part(0).length, 2)
+        self.assertLessEqual(route.distance, 500)
+
+    def test_insert_by_sweep_inserts_only_companies_of_sector_of_each_day(self):
+        route = self.__prepare_route(2, 10000)
+        sectors = seeding.get_sweep_sectors(TestData.depots[0], list(TestData.companies), 2)
+
+        seeding.insert_by_sweep(route, sectors)
+
+        for route_part, sector in zip(route.routes, sectors):
+            self.assertSetEqual(set(vertex.id for vertex in route_part.route[1:-1]), set(sector))
+
+
+class SeededPopulationTestCase(unittest.TestCase):
+    def __get_route_optimizer(self, days, seeding_rate):
+        data = dict(depot=TestData.depots[0], companies=list(
+            TestData.companies), hotels=list(TestData.hotels))
+        return RouteOptimizer(1, data, 1000, days, population_size=10, seeding_rate=seeding_rate)
+
+    def test_generate_random_routes_with_seeding_keeps_population_size(self):
+        ro = self.__get_route_optimizer(2, 0.5)
+
+        ro.generate_random_routes()
+
+        expected_length = 10
+        self.assertEqual(len(ro.population.current), expected_length)
+
+    def test_generate_random_routes_with_seeding_keeps_distance_limit_and_hotels(self):
+        ro = self.__get_route_optimizer(2, 1)
+
+        ro.generate_random_routes()
+
+        for route in ro.population.current:
+            self.assertIs(route.get_route_part(0).route[0], TestData.depots[0])
+            self.assertIs(route.get_route_part(1).route[-1], TestData.depots[0])
+            self.assertIn(route.get_route_part(0).route[-1], TestData.hotels)
+            for route_part in route.routes:
+                self.assertLessEqual(route_part.distance, 1000)
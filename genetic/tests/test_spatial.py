@@ -0,0 +1,72 @@
+import random
+import unittest
+
+import numpy as np
+
+from genetic import distances, spatial
+
+
+class KDTreeTestCase(unittest.TestCase):
+    def __prepare_points(self, n, dimensions=3):
+        random.seed(0)
+        return np.array([[random.uniform(-100, 100) for _ in range(dimensions)] for _ in range(n)])
+
+    def __get_nearest(self, points, point, k, radius=np.inf):
+        distances = np.sqrt(((points - point) ** 2).sum(axis=1))
+        order = [int(i) for i in np.argsort(distances, kind='stable') if distances[i] <= radius]
+        return order[:k]
+
+    def test_query_gives_k_nearest_points(self):
+        points = self.__prepare_points(500)
+        tree = spatial.KDTree(points, leaf_size=8)
+
+        for point in self.__prepare_points(20):
+            found_distances, found = tree.query(point, 7)
+            self.assertListEqual(list(found), self.__get_nearest(points, point, 7))
+            self.assertTrue(np.all(np.diff(found_distances) >= 0))
+
+    def test_query_gives_only_points_within_radius(self):
+        points = self.__prepare_points(300)
+        tree = spatial.KDTree(points, leaf_size=4)
+
+        for point in self.__prepare_points(20):
+            found_distances, found = tree.query(point, 50, radius=30)
+            self.assertListEqual(list(found), self.__get_nearest(points, point, 50, radius=30))
+            self.assertTrue(np.all(found_distances <= 30))
+
+    def test_query_of_empty_tree_gives_nothing(self):
+        tree = spatial.KDTree(np.empty((0, 3)))
+
+        found_distances, found = tree.query(np.zeros(3), 5)
+
+        self.assertEqual(len(found), 0)
+
+
+class NearestWithinTestCase(unittest.TestCase):
+    def __prepare_coords(self, n):
+        return np.array([(random.uniform(49.0, 54.8), random.uniform(14.1, 24.1)) for _ in range(n)])
+
+    def test_get_nearest_within_keeps_k_nearest_destinations_of_each_origin(self):
+        random.seed(1)
+        origins = self.__prepare_coords(10)
+        destinations = self.__prepare_coords(200)
+        great_circle = distances.count_haversine_distances(origins, destinations)
+
+        selected = spatial.get_nearest_within(origins, destinations, 100, 3)
+
+        expected = set()
+        for row in great_circle:
+            expected.update(int(i) for i in np.argsort(row, kind='stable')[:3] if row[i] <= 100)
+        self.assertListEqual(list(selected), sorted(expected))
+
+    def test_bounding_box_contains_destinations_within_distance(self):
+        random.seed(2)
+        origins = self.__prepare_coords(5)
+        destinations = self.__prepare_coords(500)
+        great_circle = distances.count_haversine_distances(origins, destinations)
+
+        min_lat, max_lat, min_lng, max_lng = spatial.get_bounding_box(origins, 150)
+
+        for lat, lng in destinations[(great_circle <= 150).any(axis=0)]:
+            self.assertTrue(min_lat <= lat <= max_lat)
+            self.assertTrue(min_lng <= lng <= max_lng)
@@ -0,0 +1,77 @@
+import datetime
+
+from django.test import TestCase
+
+from data import models
+from data.tests import factories
+from genetic import tasks, vertices
+from genetic.distances import DistanceMatrix
+from genetic.routes import Route, RoutePart
+
+
+class SaveRouteTestCase(TestCase):
+    def __prepare_business_trip(self):
+        department = models.Department.objects.create(name='Department', nip='1', house_no='1', postcode='00-000',
+                                                       city='City', voivodeship='podlaskie', latitude=53.13,
+                                                       longitude=23.16)
+        return models.BusinessTrip.objects.create(start_date=datetime.datetime.now(),
+                                                  finish_date=datetime.datetime.now() + datetime.timedelta(days=1),
+                                                  distance_constraint=1000, department=department)
+
+    def __prepare_route(self, business_trip, companies_per_day=5):
+        depot_model = business_trip.department
+        depot = vertices.Depot(str(depot_model.pk), (depot_model.latitude, depot_model.longitude))
+        hotel_model = factories.HotelFactory()
+        hotel = vertices.Hotel(str(hotel_model.pk), (hotel_model.latitude, hotel_model.longitude))
+        companies = [vertices.Company(str(company.pk), (company.latitude, company.longitude), 10)
+                     for company in factories.CompanyFactory.create_batch(2 * companies_per_day)]
+
+        all_vertices = [depot] + companies + [hotel]
+        for i, vertex in enumerate(all_vertices):
+            vertex.id = i
+
+        route = Route(2, 10000, DistanceMatrix.from_vertices(all_vertices))
+        route.available_vertices = set()
+        route.add_route_part(RoutePart([depot] + companies[:companies_per_day] + [hotel]))
+        route.add_route_part(RoutePart([hotel] + companies[companies_per_day:] + [depot]))
+
+        return route
+
+    def test_save_route_saves_every_segment(self):
+        business_trip = self.__prepare_business_trip()
+        route = self.__prepare_route(business_trip)
+
+        tasks.save_route(route, business_trip)
+
+        segments = list(business_trip.get_routes_for_version().order_by('day', 'segment_order'))
+        self.assertEqual(len(segments), 12)
+        for segment, (day, index) in zip(segments, [(0, i) for i in range(6)] + [(1, i) for i in range(6)]):
+            route_part = route.get_route_part(day)
+            self.assertEqual(segment.day, day)
+            self.assertEqual(segment.segment_order, index)
+            self.assertEqual(segment.start_point.pk, int(route_part.route[index].name))
+            self.assertEqual(segment.end_point.pk, int(route_part.route[index + 1].name))
+            self.assertIsInstance(segment.start_point, route_part.route[index].model)
+        self.assertEqual(segments[0].route_type, models.Route.START)
+        self.assertEqual(segments[5].route_type, models.Route.FINISH_AT_HOTEL)
+        self.assertEqual(segments[6].route_type, models.Route.START_FROM_HOTEL)
+        self.assertEqual(segments[-1].route_type, models.Route.FINISH)
+
+    def test_save_route_does_not_depend_on_route_length(self):
+        business_trip = self.__prepare_business_trip()
+        short_route = self.__prepare_route(business_trip, companies_per_day=2)
+        long_route = self.__prepare_route(business_trip, companies_per_day=20)
+        tasks.save_route(short_route, business_trip)
+
+        # resolving each of three models, saving in a transaction
+        with self.assertNumQueries(6):
+            tasks.save_route(long_route, business_trip)
+
+    def test_save_route_with_removed_company_raises_exception(self):
+        business_trip = self.__prepare_business_trip()
+        route = self.__prepare_route(business_trip)
+        models.Company.objects.filter(pk=int(route.get_route_part(0).route[1].name)).delete()
+
+        with self.assertRaises(models.Company.DoesNotExist):
+            tasks.save_route(route, business_trip)
+        self.assertFalse(business_trip.routes.exists())
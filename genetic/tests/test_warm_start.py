@@ -0,0 +1,105 @@
+import unittest
+
+from genetic import warm_start
+from genetic.route_optimizer import RouteOptimizer
+from genetic.routes import Route
+
+from .utils import TestData
+
+
+class RepairRouteTestCase(unittest.TestCase):
+    def __prepare_route(self, days, max_distance=10000, companies=TestData.companies):
+        route = Route(days, max_distance, TestData.distances)
+        route.available_vertices = set([company.id for company in companies])
+        route.vertices_ids = TestData.vertex_ids
+
+        return route
+
+    def __get_previous_days(self):
+        return [
+            [TestData.depots[0], TestData.companies[0], TestData.companies[1], TestData.hotels[1]],
+            [TestData.hotels[1], TestData.companies[2], TestData.depots[0]],
+        ]
+
+    def test_repair_route_keeps_previous_order_of_companies_and_hotels(self):
+        route = self.__prepare_route(2, companies=TestData.companies[:3])
+
+        warm_start.repair_route(route, self.__get_previous_days(), TestData.depots[0], TestData.hotels[0])
+
+        self.assertListEqual(route.get_route_part(0).route, self.__get_previous_days()[0])
+        self.assertListEqual(route.get_route_part(1).route, self.__get_previous_days()[1])
+
+    def test_repair_route_with_more_days_starts_new_day_at_default_hotel(self):
+        route = self.__prepare_route(3, companies=TestData.companies[:3])
+
+        warm_start.repair_route(route, self.__get_previous_days(), TestData.depots[0], TestData.hotels[0])
+
+        self.assertIs(route.get_route_part(1).route[-1], TestData.hotels[0])
+        self.assertIs(route.get_route_part(2).route[0], TestData.hotels[0])
+        self.assertIs(route.get_route_part(2).route[-1], TestData.depots[0])
+
+    def test_repair_route_with_fewer_days_inserts_companies_of_removed_days(self):
+        route = self.__prepare_route(1, companies=TestData.companies[:3])
+
+        warm_start.repair_route(route, self.__get_previous_days(), TestData.depots[0], TestData.hotels[0])
+
+        self.assertSetEqual(set(route.get_route_part(0).route[1:-1]), set(TestData.companies[:3]))
+        self.assertIs(route.get_route_part(0).route[-1], TestData.depots[0])
+
+    def test_repair_route_with_smaller_distance_limit_keeps_it(self):
+        route = self.__prepare_route(2, max_distance=300)
+
+        warm_start.repair_route(route, self.__get_previous_days(), TestData.depots[0], TestData.hotels[0])
+
+        for route_part in route.routes:
+            self.assertLessEqual(route_part.distance, 300)
+        route.check_profit()
+
+    def test_repair_route_with_kept_hotel_out_of_distance_limit_uses_default_hotel(self):
+        route = self.__prepare_route(2, max_distance=100, companies=())
+        previous_days = [[TestData.depots[0], TestData.hotels[3]], [TestData.hotels[3], TestData.depots[0]]]
+
+        warm_start.repair_route(route, previous_days, TestData.depots[0], TestData.hotels[1])
+
+        self.assertIs(route.get_route_part(0).route[-1], TestData.hotels[1])
+        self.assertIs(route.get_route_part(1).route[0], TestData.hotels[1])
+        for route_part in route.routes:
+            self.assertLessEqual(route_part.distance, 100)
+
+
+class WarmStartedPopulationTestCase(unittest.TestCase):
+    def __get_route_optimizer(self, previous_days, pop_size=10, max_distance=10000):
+        data = dict(depot=TestData.depots[0], companies=list(
+            TestData.companies), hotels=list(TestData.hotels))
+        return RouteOptimizer(1, data, max_distance, 2, population_size=pop_size, previous_days=previous_days,
+                              warm_start_rate=0.3)
+
+    def test_generate_random_routes_puts_repaired_previous_route_into_population(self):
+        previous_days = [[TestData.depots[0]] + list(TestData.companies[:5]) + [TestData.hotels[1]],
+                         [TestData.hotels[1]] + list(TestData.companies[5:]) + [TestData.depots[0]]]
+        ro = self.__get_route_optimizer(previous_days)
+
+        ro.generate_random_routes()
+
+        expected_stops = [route_part for route_part in previous_days]
+        self.assertIn(expected_stops, [[route_part.route for route_part in route.routes]
+                                       for route in ro.population.current])
+        self.assertEqual(len(ro.population.current), 10)
+
+    def test_generate_random_routes_without_previous_route_generates_whole_population(self):
+        ro = self.__get_route_optimizer(None)
+
+        ro.generate_random_routes()
+
+        self.assertEqual(len(ro.population.current), 10)
+
+    def test_generate_random_routes_with_kept_hotel_out_of_distance_limit_keeps_distance_limit(self):
+        previous_days = [[TestData.depots[0], TestData.companies[0], TestData.hotels[3]],
+                         [TestData.hotels[3], TestData.companies[1], TestData.depots[0]]]
+        ro = self.__get_route_optimizer(previous_days, max_distance=120)
+
+        ro.generate_random_routes()
+
+        for route in ro.population.current:
+            for route_part in route.routes:
+                self.assertLessEqual(route_part.distance, 120)
@@ -1,9 +1,4 @@
-import random
-
-import mpu
-import numpy as np
-
-from genetic import vertices
+from genetic import distances, vertices
 
 
 def initializestatic(cls):
@@ -36,9 +31,6 @@ class TestData:
 
     @classmethod
     def init_static(self):
-        all_vertices_length = len(self.depots + self.companies + self.hotels)
-        distances_array = np.zeros((all_vertices_length, all_vertices_length), dtype=[
-                                   ('id', int), ('distance', float)])
         self.vertex_uuids = dict()
         self.vertex_ids = dict()
 
@@ -46,17 +38,10 @@ class TestData:
 
         for i, vertex in enumerate(all_vertices):
             vertex.id = i
-
-        for i, vertex in enumerate(all_vertices):
             self.vertex_ids[i] = vertex
-            for j, another_vertex in enumerate(all_vertices):
-                distance = mpu.haversine_distance(
-                    vertex.get_coords(), another_vertex.get_coords())
-                distances_array[i, j] = (another_vertex.id, distance)
-                distances_array[j, i] = (vertex.id, distance)
 
-        self.distances = distances_array
+        self.distances = distances.DistanceMatrix.from_vertices(list(all_vertices))
 
     @classmethod
     def count_distance(cls, v_from, v_to):
-        return cls.distances[v_from.id, v_to.id][1]
+        return cls.distances[v_from.id, v_to.id]
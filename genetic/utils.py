@@ -35,16 +35,10 @@ def crossover(options):
                 parent_b_route_part, parent_a_route_part, random_cross_index)
 
             if new_first_route:
-                parent_a_route_part.route = new_first_route
-                distance_diff = new_first_distance - parent_a_route_part.distance
-                parent_a_route_part.distance += distance_diff
-                parents[0].distance += distance_diff
+                parents[0].change_route_part(parent_a_route_part, new_first_route, new_first_distance)
 
             if new_second_route:
-                parent_b_route_part.route = new_second_route
-                distance_diff = new_second_distance - parent_b_route_part.distance
-                parent_b_route_part.distance += distance_diff
-                parents[1].distance += distance_diff
+                parents[1].change_route_part(parent_b_route_part, new_second_route, new_second_distance)
 
     return [mutate([parents[0], mutation_probability]), mutate([parents[1], mutation_probability])]
 
@@ -114,9 +108,7 @@ def mutate_by_swap_within_the_same_route_part(route: routes.Route, route_part: r
     distance = new_distance - existing_distance
 
     if route_part.distance + distance <= route.max_distance:
-        tmp = route_part.route[first_index]
-        route_part.route[first_index] = route_part.route[second_index]
-        route_part.route[second_index] = tmp
+        route_part.swap_stops(first_index, second_index)
         route.distance += distance
         route_part.distance += distance
 
@@ -153,9 +145,9 @@ def mutate_by_swap_within_different_route_parts(route: routes.Route, first_route
     distance_for_second = new_distance_for_second - existing_distance_for_second
 
     if first_route_part.distance + distance_for_first <= route.max_distance and second_route_part.distance + distance_for_second <= route.max_distance:
-        tmp = first_route_part.route[first_index]
-        first_route_part.route[first_index] = second_route_part.route[second_index]
-        second_route_part.route[second_index] = tmp
+        first_vertex = first_route_part.route[first_index]
+        first_route_part.replace_stop(first_index, second_route_part.route[second_index])
+        second_route_part.replace_stop(second_index, first_vertex)
         route.distance += (distance_for_first + distance_for_second)
         first_route_part.distance += distance_for_first
         second_route_part.distance += distance_for_second
@@ -175,11 +167,7 @@ def mutate_by_swap(route: routes.Route, first_route_part_index: int,  first_vert
 
 def mutate_by_insert_company(route: routes.Route, route_part: routes.RoutePart, insert_index: int):
     if route.available_vertices:
-        random_index = int(random.random() *
-                           (len(route.available_vertices) - 1))
-        random_company_index = list(route.available_vertices)[random_index]
-
-        random_company = route.vertices_ids[random_company_index]
+        random_company = route.vertices_ids[route.available_vertices.choice()]
 
         route.add_stop(route_part, insert_index, random_company)
 
@@ -0,0 +1,54 @@
+from typing import List
+
+from genetic import local_search, routes, vertices
+
+
+def _get_hotel(stop: vertices.Vertex, default: vertices.Vertex) -> vertices.Vertex:
+    return stop if isinstance(stop, vertices.Hotel) else default
+
+
+def _get_hotels(route: routes.Route, previous_days: List[List[vertices.Vertex]], depot: vertices.Vertex,
+                default_hotel: vertices.Vertex) -> List[vertices.Vertex]:
+    hotels = [depot] + [_get_hotel(previous_days[day][-1] if day < len(previous_days) and previous_days[day]
+                                   else None, default_hotel) for day in range(route.days - 1)] + [depot]
+
+    # a day without companies has to keep distance limit, otherwise its hotels are replaced by the default one
+    changed = True
+    while changed:
+        changed = False
+        for day in range(1, len(hotels) - 1):
+            if hotels[day] is not default_hotel and (
+                    route.count_distance(hotels[day - 1], hotels[day]) > route.max_distance or
+                    route.count_distance(hotels[day], hotels[day + 1]) > route.max_distance):
+                hotels[day] = default_hotel
+                changed = True
+
+    return hotels
+
+
+def repair_route(route: routes.Route, previous_days: List[List[vertices.Vertex]], depot: vertices.Vertex,
+                 default_hotel: vertices.Vertex) -> routes.Route:
+    """
+    Rebuilds a previous version of route for current constraints. Days keep their hotels if they are still
+    available and a day between them keeps distance limit, otherwise the default hotel is used. Companies are
+    inserted in the previous order while they fit into distance limit of a day. Companies of removed days and
+    new companies are inserted greedily afterwards.
+
+    @param route: route with available vertices and without route parts
+    @param previous_days: list of stops of each day of previous route, stops which no longer exist are omitted
+    @param depot: depot of current route
+    @param default_hotel: hotel used when the previous one is not available or out of distance limit
+    @return: given route
+    """
+    hotels = _get_hotels(route, previous_days, depot, default_hotel)
+    for day in range(route.days):
+        route.add_route_part(routes.RoutePart([hotels[day], hotels[day + 1]]))
+
+    for route_part, stops in zip(route.routes, previous_days):
+        for vertex in stops:
+            if isinstance(vertex, vertices.Company) and vertex.id in route.available_vertices:
+                route.add_stop(route_part, route_part.length - 1, vertex)
+
+    local_search.greedy_insertion(route)
+
+    return route
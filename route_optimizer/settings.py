@@ -241,3 +241,58 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Europe/Warsaw'
 CELERY_TASK_TRACK_STARTED = True
+
+# Maximal number of iterations of route optimization and its time budget in seconds. When the budget is exceeded,
+# the best route found so far is saved. Improved routes are published by websocket while processing.
+ROUTE_OPTIMIZER_ITERATIONS = int(os.environ.get('ROUTE_OPTIMIZER_ITERATIONS', 1000))
+ROUTE_OPTIMIZER_TIME_BUDGET = float(os.environ['ROUTE_OPTIMIZER_TIME_BUDGET']) \
+    if os.environ.get('ROUTE_OPTIMIZER_TIME_BUDGET') else None
+# Time in seconds spent in each generation by local search (2-opt, or-opt, greedy insertion) of elite routes,
+# local search is disabled if 0
+ROUTE_OPTIMIZER_LOCAL_SEARCH_TIME = float(os.environ.get('ROUTE_OPTIMIZER_LOCAL_SEARCH_TIME', 0))
+# Share of initial population built by greedy heuristics (profit by distance insertion, sweep around the depot),
+# disabled by default, its gain on given data may be measured by benchmarkseeding command
+ROUTE_OPTIMIZER_SEEDING_RATE = float(os.environ.get('ROUTE_OPTIMIZER_SEEDING_RATE', 0))
+# Whether optimization of an updated business trip starts from the previous version of its route, disabled
+# by default
+ROUTE_OPTIMIZER_WARM_START = bool(int(os.environ.get('ROUTE_OPTIMIZER_WARM_START', 0)))
+# Number of the nearest hotels of each company (within daily distance limit) passed to route optimization
+ROUTE_OPTIMIZER_HOTELS_PER_COMPANY = int(os.environ.get('ROUTE_OPTIMIZER_HOTELS_PER_COMPANY', 10))
+# Minimal time in seconds between two websocket messages with progress of route optimization
+PROGRESS_PUBLISH_INTERVAL = float(os.environ.get('PROGRESS_PUBLISH_INTERVAL', 0.5))
+
+# Source of distances between vertices, BACKEND is either 'haversine' (straight-line) or 'osrm' (road network)
+DISTANCE_PROVIDER = {
+    'BACKEND': os.environ.get('DISTANCE_PROVIDER_BACKEND', 'haversine'),
+    'URL': os.environ.get('OSRM_URL', 'http://osrm:5000'),
+    # --max-table-size of the server, maximal number of coordinates of one request
+    'MAX_TABLE_SIZE': int(os.environ.get('OSRM_MAX_TABLE_SIZE', 100)),
+}
+
+# Rows of distance matrix shared between route optimizations, BACKEND is either 'redis' or 'local' (a file on disk).
+# LOCATION is URL of Redis or path of the cache file, the local cache is kept only in memory if the path is empty.
+distance_cache_backend = os.environ.get('DISTANCE_CACHE_BACKEND', 'redis')
+DISTANCE_CACHE = {
+    'BACKEND': distance_cache_backend,
+    'LOCATION': os.environ.get('DISTANCE_CACHE_LOCATION', {
+        'redis': 'redis://redis:6379/1',
+        'local': os.path.join(BASE_DIR, 'distances.sqlite3'),
+    }.get(distance_cache_backend)),
+    'MAX_ROWS': int(os.environ.get('DISTANCE_CACHE_MAX_ROWS', 20000)),
+    # Redis only: rows with more destinations are counted again, rows not used for TTL seconds expire
+    'MAX_COLUMNS': int(os.environ.get('DISTANCE_CACHE_MAX_COLUMNS', 20000)),
+    'TTL': int(os.environ.get('DISTANCE_CACHE_TTL', 30 * 24 * 3600)),
+}
+
+# Number of processes breeding couples of one route optimization in parallel, 0 breeds them in the task process.
+# Daemonic processes cannot have children, so Celery workers have to run with a non-prefork pool (e.g. -P solo).
+BREEDING_WORKERS = int(os.environ.get('BREEDING_WORKERS', 0))
+
+# Number of populations of one route optimization evolved in separate processes with migrations between them,
+# 0 evolves one population. Islands are started as children of the task process, the same as BREEDING_WORKERS.
+ISLANDS = int(os.environ.get('ISLANDS', 0))
+MIGRATION_INTERVAL = int(os.environ.get('MIGRATION_INTERVAL', 10))
+# Islands are run either by local processes ('process') or by actors of a ray cluster ('ray'), a local ray
+# instance is started if RAY_ADDRESS is not set
+ISLANDS_BACKEND = os.environ.get('ISLANDS_BACKEND', 'process')
+RAY_ADDRESS = os.environ.get('RAY_ADDRESS') or None